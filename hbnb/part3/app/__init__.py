@@ -1,17 +1,24 @@
 from flask_restx import Api
 from flask import Flask
-from app.extensions import db, jwt
+from app.extensions import db, jwt, cache, hasher, replicas, compressor
+from app.api.v1.encoding import output_json
+from app.persistence import storage, unit_of_work
+from app.services.place_filters import amenity_sets
 
 def create_app(config_name='default'):
     from config import config
 
     app = Flask(__name__)
     app.config.from_object(config[config_name])
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///hbnb.db'
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
-    db.init_app(app)
+    storage.init_app(app, db)
+    replicas.init_app(app, db)
     jwt.init_app(app)
+    cache.init_app(app)
+    hasher.init_app(app)
+    unit_of_work.init_app(app)
+    amenity_sets.init_app(app)
+    compressor.init_app(app)
 
     authorizations = {
         'Bearer Auth': {
@@ -31,6 +38,7 @@ def create_app(config_name='default'):
         authorizations=authorizations,
         security='Bearer Auth'
     )
+    api.representations['application/json'] = output_json
 
     # Import et ajout des namespaces Flask-RESTX
     from app.api.v1.users import api as users_ns
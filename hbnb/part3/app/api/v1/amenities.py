@@ -1,6 +1,12 @@
 from flask_restx import Namespace, Resource, fields
 from app.services.facade import HBnBFacade
 from flask_jwt_extended import jwt_required
+from app.api.v1.pagination import pagination_parser, page_model, page_to_dict
+from app.api.v1.conditional import conditional, entity_version, collection_version
+from app.api.v1.bulk import import_report_model, import_ndjson
+from app.persistence.unit_of_work import own_transactions
+from app.api.v1.export import ndjson_response
+from app.api.v1.serializers import serialize_with, serializer_for
 
 api = Namespace('amenities', description='Amenity operations')
 
@@ -13,11 +19,15 @@ amenity_output_model = api.model('AmenityOut', {
     'name': fields.String()
 })
 
-def amenity_to_dict(amenity):
-    return {
-        'id': amenity.id,
-        'name': amenity.name
-    }
+amenity_page_model = page_model(api, 'AmenityPage', amenity_output_model)
+
+amenity_to_dict = serializer_for(amenity_output_model)
+
+def amenity_version(amenity_id):
+    return entity_version(HBnBFacade().get_entity_version('amenity', amenity_id))
+
+def amenities_version():
+    return collection_version(*HBnBFacade().get_collection_version('amenity'))
 
 @api.route('/')
 class AmenityList(Resource):
@@ -33,19 +43,45 @@ class AmenityList(Resource):
             return {'error': str(e)}, 400
         return amenity_to_dict(amenity), 201
 
-    @api.marshal_list_with(amenity_output_model)
+    @api.expect(pagination_parser)
+    @conditional(amenities_version)
+    @serialize_with(api, amenity_page_model)
+    def get(self):
+        args = pagination_parser.parse_args()
+        try:
+            amenities, next_cursor = HBnBFacade().get_amenities_page(
+                args['limit'], args['cursor'], shape='amenity.rows')
+        except ValueError as e:
+            api.abort(400, str(e))
+        return page_to_dict(amenities, next_cursor), 200
+
+@api.route('/export')
+class AmenityExport(Resource):
+    @api.produces(['application/x-ndjson'])
     def get(self):
-        amenities = HBnBFacade().get_all_amenities()
-        return [amenity_to_dict(a) for a in amenities], 200
+        """Stream every amenity as NDJSON (one JSON object per line)"""
+        return ndjson_response(HBnBFacade().iter_all('amenity'), amenity_to_dict, 'amenities')
+
+@api.route('/import')
+class AmenityImport(Resource):
+    @api.doc(consumes=['application/x-ndjson'])
+    @api.response(403, 'Admin only')
+    @serialize_with(api, import_report_model(api))
+    @jwt_required()
+    @own_transactions
+    def post(self):
+        """Bulk import amenities from an NDJSON body (one JSON object per line)"""
+        return import_ndjson(api, 'amenities')
 
 @api.route('/<amenity_id>')
 class AmenityResource(Resource):
-    @api.marshal_with(amenity_output_model)
+    @conditional(amenity_version)
+    @serialize_with(api, amenity_output_model)
     def get(self, amenity_id):
-        amenity = HBnBFacade().get_amenity(amenity_id)
+        amenity = HBnBFacade().get_amenity_view(amenity_id, amenity_to_dict)
         if not amenity:
             return {'error': 'Amenity not found'}, 404
-        return amenity_to_dict(amenity), 200
+        return amenity, 200
 
     @api.expect(amenity_model, validate=True)
     @jwt_required()
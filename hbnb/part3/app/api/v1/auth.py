@@ -1,7 +1,10 @@
 from flask_restx import Namespace, Resource, fields
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
+from app.extensions import hasher
 from app.services.auth import login_user  # ← appel au service
-from flask_jwt_extended import create_access_token
 from app.services.facade import HBnBFacade
+from app.services.passwords import HashingBusy
+from app.api.v1.serializers import serialize_with
 
 api = Namespace('auth', description='Auth operations')
 
@@ -18,24 +21,50 @@ error_model = api.model('Error', {
     'error': fields.String()
 })
 
+hashing_stats_model = api.model('HashingStats', {
+    'in_flight': fields.Integer(description="Hachages en cours"),
+    'waiting': fields.Integer(description="Requêtes en attente d'une place"),
+    'completed': fields.Integer(),
+    'rejected': fields.Integer(description="Requêtes rejetées (503) après QUEUE_TIMEOUT"),
+    'total_wait_ms': fields.Float(),
+    'max_wait_ms': fields.Float(),
+    'max_concurrency': fields.Integer(),
+    'workers': fields.Integer()
+})
+
 @api.route('/login')
 class Login(Resource):
     @api.expect(login_model, validate=True)
-    @api.marshal_with(token_model)
+    @serialize_with(api, token_model)
     @api.response(200, 'Success', token_model)
     @api.response(401, 'Invalid credentials', error_model)
+    @api.response(503, 'Too many concurrent logins', error_model)
     def post(self):
         data = api.payload
-        data = api.payload
-        user = HBnBFacade().get_user_by_email(data['email'])
-        if not user or not user.check_password(data['password']):
-            api.abort(401, "Invalid credentials")
-        token = create_access_token(identity=str(user.id))
-        email = data.get('email')
-        password = data.get('password')
-        if not email or not password:
-            return {'error': 'Email and password are required'}, 400
-        token = login_user(email, password)
+        try:
+            token = login_user(data['email'], data['password'])
+        except HashingBusy:
+            api.abort(503, "Too many concurrent logins, retry later")
         if not token:
-            return {'error': 'Invalid credentials'}, 401
+            api.abort(401, "Invalid credentials")
         return {'access_token': token}, 200
+
+@api.route('/revoke')
+class Revoke(Resource):
+    @jwt_required()
+    @api.response(204, 'All tokens of the current user revoked')
+    def post(self):
+        """Revoke every token issued to the current user (log out everywhere)"""
+        HBnBFacade().revoke_tokens(get_jwt_identity())
+        return '', 204
+
+@api.route('/hashing-stats')
+class HashingStats(Resource):
+    @jwt_required()
+    @serialize_with(api, hashing_stats_model)
+    @api.response(403, 'Admin only', error_model)
+    def get(self):
+        """Métriques de la file de hachage des mots de passe (admin)"""
+        if not get_jwt().get('is_admin'):
+            api.abort(403, 'Admin only')
+        return hasher.stats()
@@ -0,0 +1,27 @@
+from flask import request
+from flask_restx import fields
+from flask_jwt_extended import get_jwt
+from app.services.bulk_import import BulkImporter, parse_ndjson
+
+
+def import_report_model(api):
+    error = api.model('ImportError', {
+        'line': fields.Integer(description='1-based line number in the NDJSON body'),
+        'error': fields.String()
+    })
+    return api.model('ImportReport', {
+        'inserted': fields.Integer(),
+        'errors': fields.List(fields.Nested(error))
+    })
+
+
+def import_ndjson(api, kind):
+    """Corps NDJSON (une entité JSON par ligne) lu en flux, importé par lots.
+
+    Réservé aux admins ; retourne le rapport {inserted, errors}.
+    """
+    if not get_jwt().get('is_admin'):
+        api.abort(403, 'Admin only')
+    importer = BulkImporter()
+    rows = parse_ndjson(request.stream)
+    return getattr(importer, f'import_{kind}')(rows), 200
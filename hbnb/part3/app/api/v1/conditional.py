@@ -0,0 +1,70 @@
+import hashlib
+from datetime import timezone
+from functools import wraps
+from flask import Response, request
+from flask_restx.utils import unpack
+from werkzeug.http import http_date
+
+
+def make_etag(token):
+    # L'URL complète fait partie de l'ETag : deux pages (ou deux jeux de
+    # paramètres) d'une même collection n'ont jamais le même validateur.
+    raw = f'{request.full_path}|{token}'
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def not_modified(etag, last_modified):
+    # If-None-Match prime sur If-Modified-Since (RFC 9110, 13.2.2) ;
+    # comparaison faible : une réponse compressée porte W/"etag"
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    since = request.if_modified_since
+    if since and last_modified:
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def conditional(version_fn):
+    """Gère ETag / Last-Modified et répond 304 sans exécuter le handler.
+
+    version_fn(**kwargs de la route) retourne (last_modified, token), ou
+    None si la ressource n'existe pas (le handler produit alors le 404).
+    À placer au-dessus de marshal_with pour que le 304 court-circuite
+    aussi la sérialisation.
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            version = version_fn(**kwargs)
+            if version is None:
+                return f(*args, **kwargs)
+            last_modified, token = version
+            if last_modified is not None:
+                last_modified = last_modified.replace(tzinfo=timezone.utc)
+            etag = make_etag(token)
+            if not_modified(etag, last_modified):
+                response = Response(status=304)
+                response.set_etag(etag)
+                if last_modified is not None:
+                    response.last_modified = last_modified
+                return response
+            data, code, headers = unpack(f(*args, **kwargs))
+            if code == 200:
+                headers = dict(headers or {})
+                headers['ETag'] = f'"{etag}"'
+                if last_modified is not None:
+                    headers['Last-Modified'] = http_date(last_modified)
+            return data, code, headers
+        return wrapper
+    return decorator
+
+
+def entity_version(updated_at):
+    if updated_at is None:
+        return None
+    return updated_at, updated_at.isoformat()
+
+
+def collection_version(max_updated_at, count):
+    token = f'{max_updated_at.isoformat() if max_updated_at else ""}:{count}'
+    return max_updated_at, token
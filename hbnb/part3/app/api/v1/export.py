@@ -0,0 +1,19 @@
+from flask import Response, stream_with_context
+from app.api.v1.encoding import dumps
+
+
+def ndjson_response(rows, serializer, name):
+    """Réponse NDJSON streamée : chaque ligne est sérialisée au fil de la lecture.
+
+    rows est un itérateur (curseur yield_per du facade) : ni la liste des
+    objets ni le document complet ne sont jamais construits en mémoire.
+    """
+    def generate():
+        for row in rows:
+            yield dumps(serializer(row)) + b'\n'
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': f'attachment; filename={name}.ndjson'}
+    )
@@ -0,0 +1,33 @@
+# Sparse fieldsets : ?fields=id,price,latitude&include=owner
+#
+# fields  : champs retournés (id l'est toujours) ; sans fields, tous les champs simples.
+# include : relations imbriquées ; sans fields ni include, toutes les relations.
+
+
+def add_fieldset_arguments(parser, relations):
+    parser.add_argument('fields', type=str, location='args',
+                        help='Comma-separated fields to return (id is always returned)')
+    parser.add_argument('include', type=str, location='args',
+                        help=f'Comma-separated relations to embed: {",".join(relations)}')
+
+
+def _names(value):
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+def parse_fieldset(args, scalars, relations):
+    """frozenset des champs demandés, ou None pour le document complet.
+
+    Lève ValueError pour un champ ou une relation inconnus.
+    """
+    fields, include = _names(args.get('fields')), _names(args.get('include'))
+    if not fields and not include:
+        return None
+    unknown = [name for name in fields if name not in scalars and name not in relations]
+    unknown += [name for name in include if name not in relations]
+    if unknown:
+        raise ValueError(f"Unknown field: {', '.join(unknown)}")
+    selected = set(fields) if fields else set(scalars)
+    selected.update(include)
+    selected.add('id')
+    return frozenset(selected)
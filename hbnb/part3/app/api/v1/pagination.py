@@ -0,0 +1,24 @@
+from flask_restx import fields, reqparse
+
+# Paramètres communs à toutes les collections : ?limit=&cursor=
+pagination_parser = reqparse.RequestParser()
+pagination_parser.add_argument('limit', type=int, location='args',
+                               help='Page size (capped server-side)')
+pagination_parser.add_argument('cursor', type=str, location='args',
+                               help='Opaque cursor returned as next_cursor by the previous page')
+
+
+def page_model(api, name, item_model):
+    return api.model(name, {
+        'items': fields.List(fields.Nested(item_model)),
+        'next_cursor': fields.String(description='Cursor of the next page, null on the last page')
+    })
+
+
+def page_to_dict(items, next_cursor):
+    # Les éléments restent des objets : le serializer compilé du modèle de
+    # page les lit directement (voir serializers.py)
+    return {
+        'items': items,
+        'next_cursor': next_cursor
+    }
@@ -1,6 +1,16 @@
-from flask_restx import Namespace, Resource, fields
+from flask import url_for
+from flask_restx import Namespace, Resource, fields, reqparse
 from app.services.facade import HBnBFacade
 from flask_jwt_extended import jwt_required
+from app.api.v1.pagination import pagination_parser, page_model, page_to_dict
+from app.api.v1.conditional import conditional, entity_version, collection_version
+from app.api.v1.bulk import import_report_model, import_ndjson
+from app.persistence.unit_of_work import own_transactions
+from app.api.v1.export import ndjson_response
+from app.api.v1.fieldsets import add_fieldset_arguments, parse_fieldset
+from app.api.v1.serializers import serialize, serialize_with, serializer_for
+from app.services.query_plans import PLACE_COLUMNS
+from app.services.place_filters import PlaceFilter
 
 api = Namespace('places', description='Place operations')
 
@@ -33,6 +43,13 @@ place_model = api.model('Place', {
     'amenities': fields.List(fields.String, required=True)
 })
 
+def place_reviews_next(place):
+    cursor = getattr(place, 'reviews_cursor', None)
+    if not cursor:
+        return None
+    return url_for('reviews_place_review_list', place_id=place.id,
+                   limit=len(place.embedded_reviews), cursor=cursor)
+
 place_output_model = api.model('PlaceOut', {
     'id': fields.String(),
     'title': fields.String(),
@@ -41,55 +58,93 @@ place_output_model = api.model('PlaceOut', {
     'latitude': fields.Float(),
     'longitude': fields.Float(),
     'owner_id': fields.String(),  # <-- Ajout explicite pour les tests
+    'review_count': fields.Integer(),
+    'rating_avg': fields.Float(),
     'owner': fields.Nested(user_model),
-    'amenities': fields.List(fields.Nested(amenity_model)),
-    'reviews': fields.List(fields.Nested(review_model))
+    'amenities': fields.List(fields.Nested(amenity_model), attribute='amenity_list'),
+    'reviews': fields.List(fields.Nested(review_model), attribute='embedded_reviews',
+                           description='Latest reviews, most recent first (see review_count)'),
+    'reviews_next': fields.String(attribute=place_reviews_next,
+                                  description='Link to the following reviews, null when all are embedded')
+})
+
+place_page_model = page_model(api, 'PlacePage', place_output_model)
+
+place_list_parser = pagination_parser.copy()
+place_list_parser.add_argument('q', type=str, location='args',
+                               help='Full-text search on title and description (words are prefix-matched)')
+place_list_parser.add_argument('sort', type=str, location='args',
+                               choices=('created_at', 'rating', 'relevance'),
+                               help='created_at (oldest first, default), rating (best first) '
+                                    'or relevance (best match first, default when q is given)')
+place_list_parser.add_argument('min_rating', type=float, location='args',
+                               help='Only places with an average rating >= min_rating')
+place_list_parser.add_argument('min_price', type=float, location='args', help='Minimum price')
+place_list_parser.add_argument('max_price', type=float, location='args', help='Maximum price')
+place_list_parser.add_argument('amenities', type=str, location='args',
+                               help='Comma-separated amenity ids; only places offering all of them')
+place_list_parser.add_argument('owner_id', type=str, location='args', help='Only places of this owner')
+place_list_parser.add_argument('filter', type=str, location='args',
+                               help='Composite filter, clauses separated by ";", e.g. '
+                                    'price<120;amenities=Wifi,Pool;rating>=4;owner=<user id>')
+
+PLACE_RELATIONS = ('owner', 'amenities', 'reviews')
+PLACE_SUMMARY = frozenset(PLACE_COLUMNS)
+
+add_fieldset_arguments(place_list_parser, PLACE_RELATIONS)
+
+place_fieldset_parser = reqparse.RequestParser()
+add_fieldset_arguments(place_fieldset_parser, PLACE_RELATIONS)
+
+place_search_result_model = api.model('PlaceSearchResult', {
+    'id': fields.String(),
+    'title': fields.String(),
+    'description': fields.String(),
+    'price': fields.Float(),
+    'latitude': fields.Float(),
+    'longitude': fields.Float(),
+    'owner_id': fields.String(),
+    'review_count': fields.Integer(),
+    'rating_avg': fields.Float(),
+    'distance_km': fields.Float()
+})
+
+place_search_model = api.model('PlaceSearch', {
+    'items': fields.List(fields.Nested(place_search_result_model))
 })
 
-def place_to_dict(place, details=True):
-    data = {
-        'id': str(place.id),
-        'title': place.title,
-        'description': place.description,
-        'price': place.price,
-        'latitude': place.latitude,
-        'longitude': place.longitude,
-        'owner_id': str(place.owner_id),  # <-- Ajout explicite pour les tests
-    }
-    if details:
-        # Owner (si chargé)
-        if hasattr(place, 'owner') and place.owner:
-            data['owner'] = {
-                'id': str(place.owner.id),
-                'first_name': place.owner.first_name,
-                'last_name': place.owner.last_name,
-                'email': place.owner.email
-            }
-        else:
-            data['owner'] = None
-        # Amenities (via table d'association)
-        if hasattr(place, 'amenities'):
-            data['amenities'] = [
-                {'id': str(pa.amenity.id), 'name': pa.amenity.name}
-                for pa in getattr(place, 'amenities', [])
-                if hasattr(pa, 'amenity') and pa.amenity
-            ]
-        else:
-            data['amenities'] = []
-        # Reviews
-        if hasattr(place, 'reviews'):
-            data['reviews'] = [
-                {
-                    'id': str(r.id),
-                    'text': r.text,
-                    'rating': r.rating,
-                    'user_id': str(r.user_id)
-                }
-                for r in place.reviews
-            ]
-        else:
-            data['reviews'] = []
-    return data
+search_parser = reqparse.RequestParser()
+search_parser.add_argument('lat', type=float, location='args', help='Center latitude (radius search)')
+search_parser.add_argument('lon', type=float, location='args', help='Center longitude (radius search)')
+search_parser.add_argument('radius_km', type=float, location='args', help='Search radius in km')
+search_parser.add_argument('min_lat', type=float, location='args', help='Bounding box south edge')
+search_parser.add_argument('min_lon', type=float, location='args', help='Bounding box west edge')
+search_parser.add_argument('max_lat', type=float, location='args', help='Bounding box north edge')
+search_parser.add_argument('max_lon', type=float, location='args', help='Bounding box east edge')
+search_parser.add_argument('limit', type=int, location='args', help='Maximum number of results')
+
+def place_to_dict(place, details=True, fieldset=None):
+    # Avec un fieldset, seuls ses champs sont lus : les autres colonnes et
+    # relations n'ont pas été chargées (voir place_fieldset_options)
+    if fieldset is None and not details:
+        fieldset = PLACE_SUMMARY
+    return serializer_for(place_output_model, fieldset)(place)
+
+def place_fieldset(args):
+    try:
+        fieldset = parse_fieldset(args, PLACE_COLUMNS, PLACE_RELATIONS)
+    except ValueError as e:
+        api.abort(400, str(e))
+    if fieldset is not None and 'reviews' in fieldset:
+        # Le lien vers la suite accompagne les reviews imbriquées
+        fieldset |= {'reviews_next'}
+    return fieldset
+
+def place_version(place_id):
+    return entity_version(HBnBFacade().get_entity_version('place', place_id))
+
+def places_version():
+    return collection_version(*HBnBFacade().get_collection_version('place'))
 
 @api.route('/')
 class PlaceList(Resource):
@@ -106,19 +161,81 @@ class PlaceList(Resource):
         # Retourne tous les champs attendus par les tests
         return place_to_dict(place, details=False), 201
 
-    @api.marshal_list_with(place_output_model)
+    @api.expect(place_list_parser)
+    @api.response(200, 'Success', place_page_model)
+    @conditional(places_version)
+    def get(self):
+        args = place_list_parser.parse_args()
+        fieldset = place_fieldset(args)
+        try:
+            criteria = PlaceFilter.parse(args['filter'])
+            places, next_cursor = HBnBFacade().get_places_page(
+                args['limit'], args['cursor'], shape='place.rows',
+                sort=args['sort'], min_rating=args['min_rating'], q=args['q'],
+                min_price=args['min_price'], max_price=args['max_price'],
+                amenity_ids=[a for a in (args['amenities'] or '').split(',') if a],
+                fields=fieldset, owner_id=args['owner_id'], criteria=criteria)
+        except ValueError as e:
+            api.abort(400, str(e))
+        return serialize(page_to_dict(places, next_cursor), place_page_model, fieldset, items='items'), 200
+
+@api.route('/export')
+class PlaceExport(Resource):
+    @api.produces(['application/x-ndjson'])
     def get(self):
-        places = HBnBFacade().get_all_places()
-        return [place_to_dict(p) for p in places], 200
+        """Stream every place, with owner, amenities and reviews, as NDJSON"""
+        places = HBnBFacade().iter_all('place', shape='place.details')
+        return ndjson_response(places, place_to_dict, 'places')
+
+@api.route('/import')
+class PlaceImport(Resource):
+    @api.doc(consumes=['application/x-ndjson'])
+    @api.response(403, 'Admin only')
+    @serialize_with(api, import_report_model(api))
+    @jwt_required()
+    @own_transactions
+    def post(self):
+        """Bulk import places from an NDJSON body (one JSON object per line)"""
+        return import_ndjson(api, 'places')
+
+@api.route('/search')
+class PlaceSearch(Resource):
+    @api.expect(search_parser)
+    @serialize_with(api, place_search_model)
+    @api.response(400, 'Invalid search parameters')
+    def get(self):
+        """Search places around a point (lat, lon, radius_km) or in a bounding box"""
+        args = search_parser.parse_args()
+        radius = (args['lat'], args['lon'], args['radius_km'])
+        bbox = (args['min_lat'], args['min_lon'], args['max_lat'], args['max_lon'])
+        facade = HBnBFacade()
+        try:
+            if all(v is not None for v in radius):
+                results = facade.search_places_near(*radius, limit=args['limit'])
+            elif all(v is not None for v in bbox):
+                results = facade.search_places_in_bbox(*bbox, limit=args['limit'])
+            else:
+                raise ValueError("Provide lat, lon and radius_km, or min_lat, min_lon, max_lat and max_lon")
+        except ValueError as e:
+            api.abort(400, str(e))
+        items = []
+        for place, distance in results:
+            place.distance_km = round(distance, 3)
+            items.append(place)
+        return {'items': items}, 200
 
 @api.route('/<place_id>')
 class PlaceResource(Resource):
-    @api.marshal_with(place_output_model)
+    @api.expect(place_fieldset_parser)
+    @api.response(200, 'Success', place_output_model)
+    @conditional(place_version)
     def get(self, place_id):
-        place = HBnBFacade().get_place(place_id)
+        fieldset = place_fieldset(place_fieldset_parser.parse_args())
+        # Document complet en cache, réduit ensuite au fieldset
+        place = HBnBFacade().get_place_view(place_id, place_to_dict)
         if not place:
             return {'error': 'Place not found'}, 404
-        return place_to_dict(place), 200
+        return serialize(place, place_output_model, fieldset), 200
 
     @api.expect(place_model, validate=True)
     @jwt_required()
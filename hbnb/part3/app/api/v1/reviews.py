@@ -1,6 +1,12 @@
 from flask_restx import Namespace, Resource, fields
 from app.services.facade import HBnBFacade
 from flask_jwt_extended import jwt_required
+from app.api.v1.pagination import pagination_parser, page_model, page_to_dict
+from app.api.v1.conditional import conditional, entity_version, collection_version
+from app.api.v1.bulk import import_report_model, import_ndjson
+from app.persistence.unit_of_work import own_transactions
+from app.api.v1.export import ndjson_response
+from app.api.v1.serializers import serialize_with, serializer_for
 
 api = Namespace('reviews', description='Review operations')
 
@@ -19,14 +25,26 @@ review_output_model = api.model('ReviewOut', {
     'place_id': fields.String()
 })
 
-def review_to_dict(review):
-    return {
-        'id': review.id,
-        'text': review.text,
-        'rating': review.rating,
-        'user_id': review.user_id,
-        'place_id': review.place_id
-    }
+review_page_model = page_model(api, 'ReviewPage', review_output_model)
+
+place_reviews_parser = pagination_parser.copy()
+place_reviews_parser.add_argument('sort', type=str, location='args', default='recent',
+                                  choices=('recent', 'rating'),
+                                  help='recent (most recent first, default) or rating (best rated first)')
+
+review_to_dict = serializer_for(review_output_model)
+
+def review_version(review_id):
+    return entity_version(HBnBFacade().get_entity_version('review', review_id))
+
+def reviews_version():
+    return collection_version(*HBnBFacade().get_collection_version('review'))
+
+def place_reviews_version(place_id):
+    facade = HBnBFacade()
+    if facade.get_entity_version('place', place_id) is None:
+        return None
+    return collection_version(*facade.get_collection_version('review', place_id=place_id))
 
 @api.route('/')
 class ReviewList(Resource):
@@ -42,19 +60,45 @@ class ReviewList(Resource):
             return {'error': str(e)}, 400
         return review_to_dict(review), 201
 
-    @api.marshal_list_with(review_output_model)
+    @api.expect(pagination_parser)
+    @conditional(reviews_version)
+    @serialize_with(api, review_page_model)
     def get(self):
-        reviews = HBnBFacade().get_all_reviews()
-        return [review_to_dict(r) for r in reviews], 200
+        args = pagination_parser.parse_args()
+        try:
+            reviews, next_cursor = HBnBFacade().get_reviews_page(
+                args['limit'], args['cursor'], shape='review.rows')
+        except ValueError as e:
+            api.abort(400, str(e))
+        return page_to_dict(reviews, next_cursor), 200
+
+@api.route('/export')
+class ReviewExport(Resource):
+    @api.produces(['application/x-ndjson'])
+    def get(self):
+        """Stream every review as NDJSON (one JSON object per line)"""
+        return ndjson_response(HBnBFacade().iter_all('review'), review_to_dict, 'reviews')
+
+@api.route('/import')
+class ReviewImport(Resource):
+    @api.doc(consumes=['application/x-ndjson'])
+    @api.response(403, 'Admin only')
+    @serialize_with(api, import_report_model(api))
+    @jwt_required()
+    @own_transactions
+    def post(self):
+        """Bulk import reviews from an NDJSON body (one JSON object per line)"""
+        return import_ndjson(api, 'reviews')
 
 @api.route('/<review_id>')
 class ReviewResource(Resource):
-    @api.marshal_with(review_output_model)
+    @conditional(review_version)
+    @serialize_with(api, review_output_model)
     def get(self, review_id):
-        review = HBnBFacade().get_review(review_id)
+        review = HBnBFacade().get_review_view(review_id, review_to_dict)
         if not review:
             return {'error': 'Review not found'}, 404
-        return review_to_dict(review), 200
+        return review, 200
 
     @api.expect(review_model, validate=True)
     @jwt_required()
@@ -77,9 +121,18 @@ class ReviewResource(Resource):
 
 @api.route('/places/<place_id>/reviews')
 class PlaceReviewList(Resource):
-    @api.marshal_list_with(review_output_model)
+    @api.expect(place_reviews_parser)
+    @api.response(404, 'Place not found')
+    @conditional(place_reviews_version)
+    @serialize_with(api, review_page_model)
     def get(self, place_id):
-        reviews = HBnBFacade().get_reviews_by_place(place_id)
-        if reviews is None:
-            return {'error': 'Place not found'}, 404
-        return [review_to_dict(r) for r in reviews], 200
+        args = place_reviews_parser.parse_args()
+        try:
+            page = HBnBFacade().get_place_reviews_page(
+                place_id, args['limit'], args['cursor'], sort=args['sort'], shape='review.rows')
+        except ValueError as e:
+            api.abort(400, str(e))
+        if page is None:
+            api.abort(404, 'Place not found')
+        reviews, next_cursor = page
+        return page_to_dict(reviews, next_cursor), 200
@@ -0,0 +1,183 @@
+from functools import partial, wraps
+from http import HTTPStatus
+from flask import current_app, request
+from flask_restx import fields
+from flask_restx.fields import get_value
+from flask_restx.mask import apply as apply_mask
+from flask_restx.utils import merge, unpack
+from app.services.cache import LRUCache
+
+# Serializers compilés depuis les modèles Flask-RESTX.
+#
+# marshal() parcourt, pour chaque objet, les objets fields.* du modèle et
+# leurs attributs. Ici le modèle est lu une seule fois et traduit en source
+# Python (une fonction par modèle et par jeu de champs), puis compilé : un
+# objet sérialisé ne coûte plus que ses lectures d'attributs et ses
+# conversions (str, int, float...). Les mêmes modèles continuent de
+# documenter l'API dans Swagger.
+#
+# Sources acceptées :
+#   objet (ORM, row...) : valeur lue via l'attribut du champ (attribute=,
+#                         nom, chemin pointé ou fonction), sinon son nom ;
+#   dict                : déjà à la forme de sortie (document en cache,
+#                         page {items, next_cursor}...), lu par nom de champ.
+# Valeurs produites identiques à marshal() pour String, Integer, Float,
+# Boolean, Nested et List ; les autres champs passent par leur format().
+
+SCALARS = {fields.String: 'str', fields.Integer: 'int', fields.Float: 'float', fields.Boolean: 'bool'}
+
+# Serializers compilés par (modèle, fieldset, items). Les fieldsets viennent
+# des clients (?fields=, ?include=) : cache borné, le moins récemment
+# utilisé est écarté
+COMPILED_CACHE_SIZE = 256
+
+_compiled = LRUCache(COMPILED_CACHE_SIZE, ttl=0)
+
+
+def _canonical(model, fieldset, items):
+    # Réduit aux champs du modèle visé : un même rendu, une même clé
+    if fieldset is None:
+        return None
+    target = model
+    if items is not None:
+        field = model[items]
+        target = getattr(field, 'container', field).nested
+    return frozenset(fieldset).intersection(target)
+
+
+def serializer_for(model, fieldset=None, items=None):
+    """Serializer compilé du modèle (mis en cache).
+
+    fieldset : seuls ces champs sont lus et produits ; avec items, il
+    s'applique aux éléments de la liste items (page) et non au modèle
+    lui-même.
+    """
+    fieldset = _canonical(model, fieldset, items)
+    key = (id(model), fieldset, items)
+    entry = _compiled.get(key)
+    # Le modèle est gardé avec sa fonction : une entrée d'un modèle disparu
+    # dont l'id aurait été réutilisé n'est pas prise pour celle-ci
+    if entry is None or entry[0] is not model:
+        entry = (model, compile_serializer(model, fieldset, items))
+        _compiled.set(key, entry)
+    return entry[1]
+
+
+def _format_other(field, value):
+    # Comme Raw.output, pour les types de champs non spécialisés
+    if value is None:
+        default = field._v('default')
+        return field.format(default) if default else default
+    return field.format(value)
+
+
+class _Compiler:
+    def __init__(self):
+        self.env = {'_get_value': get_value}
+        self.count = 0
+
+    def bind(self, prefix, value):
+        self.count += 1
+        name = f'{prefix}{self.count}'
+        self.env[name] = value
+        return name
+
+    def default(self, field, formatter):
+        # Comme Raw.output : un défaut « faux » (0, '') est rendu tel quel
+        default = field.default
+        if default is None:
+            return 'None'
+        return self.bind('_d', formatter(default) if default else default)
+
+    def expression(self, field, var, fieldset=None):
+        """Expression Python qui formate la valeur var selon field."""
+        if isinstance(field, fields.Nested):
+            nested = self.bind('_n', serializer_for(field.nested, fieldset))
+            if field.allow_null:
+                return f'None if {var} is None else {nested}({var})'
+            if field.default is not None:
+                return f'{self.bind("_d", field.default)} if {var} is None else {nested}({var})'
+            return f'{nested}({var})'
+        if type(field) is fields.List:
+            item = f'x{self.count}'
+            self.count += 1
+            inner = self.expression(field.container, item, fieldset)
+            return f'None if {var} is None else [{inner} for {item} in {var}]'
+        if type(field) in SCALARS:
+            convert = SCALARS[type(field)]
+            return f'{self.default(field, field.format)} if {var} is None else {convert}({var})'
+        return f'{self.bind("_f", partial(_format_other, field))}({var})'
+
+    def getter(self, name, field):
+        attribute = field.attribute
+        if attribute is None:
+            return f'getattr(obj, {name!r}, None)'
+        if callable(attribute):
+            return f'{self.bind("_a", attribute)}(obj)'
+        if isinstance(attribute, str) and '.' not in attribute:
+            return f'getattr(obj, {attribute!r}, None)'
+        return f'_get_value({attribute!r}, obj)'
+
+
+def compile_serializer(model, fieldset=None, items=None):
+    """Fonction obj -> dict de sortie du modèle, générée et compilée."""
+    compiler = _Compiler()
+    names = [name for name in model if fieldset is None or items is not None or name in fieldset]
+    from_object, from_dict, output = [], [], []
+    for i, name in enumerate(names):
+        field = model[name]
+        from_object.append(f'    v{i} = {compiler.getter(name, field)}')
+        from_dict.append(f'    v{i} = obj.get({name!r})')
+        expression = compiler.expression(field, f'v{i}', fieldset if name == items else None)
+        output.append(f'{name!r}: {expression}')
+    result = '    return {' + ', '.join(output) + '}'
+    source = '\n'.join([
+        'def from_object(obj):', *from_object, result,
+        'def from_dict(obj):', *from_dict, result,
+        'def serialize(obj):',
+        '    if obj is None:',
+        '        return from_dict({})',
+        '    if isinstance(obj, dict):',
+        '        return from_dict(obj)',
+        '    return from_object(obj)',
+    ])
+    code = compile(source, f'<serializer {getattr(model, "name", "model")}>', 'exec')
+    exec(code, compiler.env)
+    serialize = compiler.env['serialize']
+    serialize.__source__ = source
+    return serialize
+
+
+def mask_header():
+    return request.headers.get(current_app.config.get('RESTX_MASK_HEADER', 'X-Fields'))
+
+
+def serialize(data, model, fieldset=None, items=None):
+    """Sortie du modèle pour data, réduite par un masque X-Fields éventuel."""
+    output = serializer_for(model, fieldset, items)(data)
+    if fieldset is None:
+        mask = mask_header()
+        if mask:
+            return apply_mask(output, mask)
+    return output
+
+
+def serialize_with(api, model, code=HTTPStatus.OK, description=None):
+    """Comme api.marshal_with(model) (même documentation Swagger), avec le
+    serializer compilé ; seules les réponses de statut code sont sérialisées,
+    les autres (erreurs) sont renvoyées telles quelles.
+    """
+    def decorator(f):
+        f.__apidoc__ = merge(getattr(f, '__apidoc__', {}), {
+            'responses': {str(int(code)): (description, model, {})},
+            '__mask__': True,
+        })
+
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            data, status, headers = unpack(f(*args, **kwargs))
+            if status != code:
+                return data, status, headers
+            return serialize(data, model), status, headers
+        return wrapper
+    return decorator
@@ -1,6 +1,10 @@
 from flask_restx import Namespace, Resource, fields
 from app.services.facade import HBnBFacade
 from flask_jwt_extended import jwt_required, get_jwt
+from app.api.v1.pagination import pagination_parser, page_model, page_to_dict
+from app.api.v1.conditional import conditional, entity_version, collection_version
+from app.api.v1.export import ndjson_response
+from app.api.v1.serializers import serialize_with, serializer_for
 
 api = Namespace('users', description='User operations')
 
@@ -18,26 +22,37 @@ user_output_model = api.model('UserOut', {
     'email': fields.String()
 })
 
-def user_to_dict(user):
-    return {
-        'id': str(user.id),
-        'first_name': user.first_name,
-        'last_name': user.last_name,
-        'email': user.email
-    }
+user_page_model = page_model(api, 'UserPage', user_output_model)
+
+user_to_dict = serializer_for(user_output_model)
+
+def user_version(user_id):
+    return entity_version(HBnBFacade().get_entity_version('user', user_id))
+
+def users_version():
+    # Pas de validateur pour un non-admin : le handler répond 403
+    if not get_jwt().get('is_admin'):
+        return None
+    return collection_version(*HBnBFacade().get_collection_version('user'))
 
 @api.route('/')
 class UserList(Resource):
     @api.doc('list_users')
-    @api.marshal_list_with(user_output_model)
+    @api.expect(pagination_parser)
     @jwt_required()
+    @conditional(users_version)
+    @serialize_with(api, user_page_model)
     def get(self):
-        """List all users (admin only)"""
+        """List users, one page at a time (admin only)"""
         claims = get_jwt()
         if not claims.get('is_admin'):
             api.abort(403, 'Admin only')
-        users = HBnBFacade().get_all_users()
-        return [user_to_dict(u) for u in users]
+        args = pagination_parser.parse_args()
+        try:
+            users, next_cursor = HBnBFacade().get_users_page(args['limit'], args['cursor'])
+        except ValueError as e:
+            api.abort(400, str(e))
+        return page_to_dict(users, next_cursor)
 
     @api.doc('create_user')
     @api.expect(user_input_model, validate=True)
@@ -52,22 +67,34 @@ class UserList(Resource):
         except Exception as e:
             return {'error': str(e)}, 400
 
+@api.route('/export')
+class UserExport(Resource):
+    @api.doc('export_users')
+    @api.produces(['application/x-ndjson'])
+    @jwt_required()
+    def get(self):
+        """Stream every user as NDJSON (admin only)"""
+        if not get_jwt().get('is_admin'):
+            api.abort(403, 'Admin only')
+        return ndjson_response(HBnBFacade().iter_all('user'), user_to_dict, 'users')
+
 @api.route('/<string:user_id>')
 @api.param('user_id', 'The user identifier')
 class UserResource(Resource):
     @api.doc('get_user')
-    @api.marshal_with(user_output_model)
     @jwt_required()
+    @conditional(user_version)
+    @serialize_with(api, user_output_model)
     def get(self, user_id):
         """Get a user by ID"""
-        user = HBnBFacade().get_user(user_id)
+        user = HBnBFacade().get_user_view(user_id, user_to_dict)
         if not user:
             api.abort(404, 'User not found')
-        return user_to_dict(user), 200
+        return user, 200
 
     @api.doc('update_user')
     @api.expect(user_input_model, validate=True)
-    @api.marshal_with(user_output_model)
+    @serialize_with(api, user_output_model)
     @jwt_required()
     def put(self, user_id):
         """Update a user"""
@@ -76,6 +103,6 @@ class UserResource(Resource):
             user = HBnBFacade().update_user(user_id, data)
             if not user:
                 api.abort(404, 'User not found')
-            return user_to_dict(user), 200
+            return user, 200
         except Exception as e:
             api.abort(400, str(e))
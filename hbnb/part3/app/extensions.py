@@ -1,5 +1,13 @@
 from flask_sqlalchemy import SQLAlchemy
-from flask_jwt_extended import JWTManager
+from app.persistence.replicas import ReplicaRouter, RoutingSession
+from app.services.cache import Cache
+from app.services.compression import ResponseCompressor
+from app.services.passwords import PasswordHasher
+from app.services.tokens import CachingJWTManager
 
-db = SQLAlchemy()
-jwt = JWTManager()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+replicas = ReplicaRouter()
+jwt = CachingJWTManager()
+cache = Cache()
+hasher = PasswordHasher()
+compressor = ResponseCompressor()
@@ -1,5 +1,6 @@
 import uuid
 from datetime import datetime
+from sqlalchemy.orm import declared_attr
 from app import db
 
 class BaseModel(db.Model):
@@ -7,3 +8,12 @@ class BaseModel(db.Model):
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @declared_attr
+    def __table_args__(cls):
+        # Index de la pagination par curseur (created_at, id)
+        return (db.Index(f'ix_{cls.__tablename__}_created_at_id', 'created_at', 'id'),)
+
+    @classmethod
+    def page_keys(cls):
+        return [cls.created_at, cls.id]
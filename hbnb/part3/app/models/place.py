@@ -1,6 +1,8 @@
 import uuid
 from app.extensions import db
 from app.models.base_model import BaseModel
+from app.services import fulltext
+from app.services.geo import encode_geohash
 
 class Place(BaseModel, db.Model):
     __tablename__ = 'places'
@@ -10,12 +12,30 @@ class Place(BaseModel, db.Model):
     price = db.Column(db.Float, nullable=False)
     latitude = db.Column(db.Float, nullable=False)
     longitude = db.Column(db.Float, nullable=False)
-    owner_id = db.Column(db.String(60), db.ForeignKey('users.id'), nullable=False)
+    owner_id = db.Column(db.String(60), db.ForeignKey('users.id'), nullable=False, index=True)
+    # Cellule geohash de (latitude, longitude), indexée pour la recherche géographique
+    geohash = db.Column(db.String(12), index=True)
+    # Agrégats des reviews, maintenus par le facade dans la même transaction
+    review_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_avg = db.Column(db.Float, nullable=False, default=0.0, server_default='0')
 
     # Relations
     reviews = db.relationship('Review', back_populates='place', cascade="all, delete-orphan")
     amenities = db.relationship('PlaceAmenity', back_populates='place', cascade="all, delete-orphan")
 
+    @property
+    def amenity_list(self):
+        """Amenities de la place (via la table d'association)."""
+        return [link.amenity for link in self.amenities if link.amenity]
+
+    @property
+    def embedded_reviews(self):
+        """Reviews imbriquées dans le document de la place : les dernières
+        si le facade les a chargées (forme place.document), sinon toutes."""
+        latest = self.__dict__.get('latest_reviews')
+        return self.reviews if latest is None else latest
+
     @staticmethod
     def validate_data(data):
         if not data.get('title') or len(data['title']) > 100:
@@ -29,9 +49,31 @@ class Place(BaseModel, db.Model):
         if not data.get('owner_id'):
             raise ValueError("Owner (owner_id) is required")
 
+# Tri / filtre par note moyenne (et pagination par curseur sur ce tri)
+db.Index('ix_places_rating_avg_id', Place.rating_avg, Place.id)
+# Filtre par prix (voir app/services/place_filters.py)
+db.Index('ix_places_price_id', Place.price, Place.id)
+
+@db.event.listens_for(Place, 'before_insert')
+@db.event.listens_for(Place, 'before_update')
+def set_geohash(mapper, connection, place):
+    if place.latitude is not None and place.longitude is not None:
+        place.geohash = encode_geohash(float(place.latitude), float(place.longitude))
+
+# Index plein texte (FTS5) créé / supprimé avec la table places
+@db.event.listens_for(Place.__table__, 'after_create')
+def create_fulltext_index(table, connection, **kw):
+    fulltext.install(connection)
+
+@db.event.listens_for(Place.__table__, 'before_drop')
+def drop_fulltext_index(table, connection, **kw):
+    fulltext.uninstall(connection)
+
 class PlaceAmenity(db.Model):
     __tablename__ = 'place_amenity'
     place_id = db.Column(db.String(60), db.ForeignKey('places.id'), primary_key=True)
-    amenity_id = db.Column(db.String(60), db.ForeignKey('amenities.id'), primary_key=True)
+    # La clé primaire (place_id, amenity_id) couvre les recherches par place ;
+    # cet index sert les recherches inverses (places d'une amenity).
+    amenity_id = db.Column(db.String(60), db.ForeignKey('amenities.id'), primary_key=True, index=True)
     place = db.relationship('Place', back_populates='amenities')
     amenity = db.relationship('Amenity', back_populates='places')
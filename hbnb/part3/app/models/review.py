@@ -8,7 +8,7 @@ class Review(BaseModel, db.Model):
     text = db.Column(db.Text, nullable=False)
     rating = db.Column(db.Integer, nullable=False)
     place_id = db.Column(db.String(60), db.ForeignKey('places.id'), nullable=False)
-    user_id = db.Column(db.String(60), db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.String(60), db.ForeignKey('users.id'), nullable=False, index=True)
 
     # Relations (optionnelles, mais utiles pour navigation ORM)
     place = db.relationship('Place', back_populates='reviews')
@@ -31,3 +31,8 @@ class Review(BaseModel, db.Model):
         if not data.get('user_id'):
             raise ValueError("User ID is required")
 
+# Reviews d'une place (get_by_place) et leur chronologie ; sert aussi
+# d'index sur place_id seul (préfixe), d'où l'absence d'index dédié.
+db.Index('ix_reviews_place_id_created_at', Review.place_id, Review.created_at)
+# Reviews d'une place les mieux notées d'abord (tri 'rating')
+db.Index('ix_reviews_place_id_rating_created_at', Review.place_id, Review.rating, Review.created_at)
@@ -1,7 +1,6 @@
 import uuid
 import re
-from app.extensions import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.extensions import db, hasher
 from app.models.base_model import BaseModel
 
 class User(BaseModel, db.Model):
@@ -12,6 +11,8 @@ class User(BaseModel, db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(128))
     is_admin = db.Column(db.Boolean, default=False)
+    # Incrémenté pour révoquer tous les tokens émis (claim 'tv')
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     places = db.relationship('Place', backref='owner', lazy=True)
     reviews = db.relationship('Review', back_populates='user', cascade="all, delete-orphan")
@@ -19,10 +20,10 @@ class User(BaseModel, db.Model):
     EMAIL_REGEX = re.compile(r"[^@]+@[^@]+\.[^@]+")
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return hasher.verify(self.password_hash, password)
 
     @staticmethod
     def validate_data(data):
@@ -0,0 +1,89 @@
+import copy
+import threading
+import uuid
+
+
+class _Shard:
+    __slots__ = ('lock', 'storage')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.storage = {}
+
+
+class ConcurrentMemoryRepository:
+    """Variante thread-safe du MemoryRepository pour les serveurs WSGI multi-threads.
+
+    - Les objets sont répartis sur `shards` dictionnaires, chacun avec son
+      verrou : deux écritures sur des shards différents ne s'attendent pas.
+    - Les lectures ne prennent aucun verrou : une lecture de dict est atomique.
+    - update() est en copie sur écriture : l'objet est copié, modifié, puis
+      publié d'un coup à la place de l'ancien. Un lecteur voit donc l'état
+      d'avant ou d'après, jamais un objet à moitié modifié. En contrepartie,
+      un objet obtenu par get() n'est pas modifié par un update() ultérieur :
+      relire par get() pour voir la nouvelle version.
+
+    Pas d'index secondaires : get_by_attribute / filter_by_attribute parcourent
+    les shards.
+    """
+
+    def __init__(self, shards=16):
+        if shards < 1:
+            raise ValueError("shards must be >= 1")
+        self._shards = [_Shard() for _ in range(shards)]
+
+    def _shard(self, obj_id):
+        return self._shards[hash(obj_id) % len(self._shards)]
+
+    def add(self, obj):
+        # On suppose que l'objet a un attribut 'id' (string, UUID)
+        if not hasattr(obj, 'id') or not obj.id:
+            obj.id = str(uuid.uuid4())
+        shard = self._shard(obj.id)
+        with shard.lock:
+            shard.storage[obj.id] = obj
+        return obj
+
+    def get(self, obj_id):
+        return self._shard(obj_id).storage.get(obj_id)
+
+    def get_all(self):
+        return list(self._iter_all())
+
+    def _iter_all(self):
+        # Chaque shard est figé (list() est atomique) puis parcouru sans verrou
+        for shard in self._shards:
+            yield from list(shard.storage.values())
+
+    def update(self, obj_id, data):
+        shard = self._shard(obj_id)
+        with shard.lock:
+            current = shard.storage.get(obj_id)
+            if not current:
+                return None
+            updated = copy.copy(current)
+            for key, value in data.items():
+                if hasattr(updated, key):
+                    setattr(updated, key, value)
+            shard.storage[obj_id] = updated
+        return updated
+
+    def delete(self, obj_id):
+        shard = self._shard(obj_id)
+        with shard.lock:
+            return shard.storage.pop(obj_id, None) is not None
+
+    def get_by_attribute(self, attr_name, attr_value):
+        for obj in self._iter_all():
+            if hasattr(obj, attr_name) and getattr(obj, attr_name) == attr_value:
+                return obj
+        return None
+
+    def filter_by_attribute(self, attr_name, attr_value):
+        return [
+            obj for obj in self._iter_all()
+            if hasattr(obj, attr_name) and getattr(obj, attr_name) == attr_value
+        ]
+
+    def __len__(self):
+        return sum(len(shard.storage) for shard in self._shards)
@@ -0,0 +1,275 @@
+import gc
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+from app.persistence.memory_repository import MemoryRepository
+
+# Persistance du MemoryRepository : journal d'opérations + snapshots.
+#
+# Chaque écriture est ajoutée au journal (ops.log) après avoir été validée
+# en mémoire, avec un numéro de séquence (LSN) croissant. Un snapshot
+# (snapshot.bin) contient l'état complet et le LSN de la dernière opération
+# qu'il inclut ; après son écriture le journal est vidé. Au démarrage :
+# chargement du snapshot puis rejeu des seuls enregistrements de LSN
+# supérieur. Un journal déjà inclus dans le snapshot (arrêt entre les deux
+# étapes) n'est donc pas rejoué : il pourrait violer un index unique (titre
+# libéré puis repris) en réappliquant des états intermédiaires.
+
+LOG_NAME = 'ops.log'
+SNAPSHOT_NAME = 'snapshot.bin'
+SNAPSHOT_MAGIC = b'HBNBSNP2'
+
+# Enregistrement du journal : longueur, crc32, puis le pickle de (lsn, op, id, données)
+RECORD_HEADER = struct.Struct('<II')
+
+PUT, UPDATE, DELETE = 'put', 'update', 'delete'
+
+
+class OperationLog:
+    """Journal en ajout seul, fsync groupé.
+
+    fsync_every : fsync tous les N enregistrements (1 = chaque écriture est
+    durable ; 0 = jamais, le système écrit quand il veut).
+    fsync_interval : fsync aussi dès que le dernier date de plus de N secondes.
+    Entre deux fsync, un arrêt brutal du système peut perdre les dernières
+    opérations, jamais corrompre les précédentes.
+    """
+
+    def __init__(self, path, fsync_every=1, fsync_interval=None, clock=time.monotonic, lsn=0):
+        self.path = path
+        self.lsn = lsn
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._clock = clock
+        self._file = open(path, 'ab')
+        self._unsynced = 0
+        self._last_sync = clock()
+        self.records = 0
+
+    def append(self, op, obj_id, data=None):
+        self.lsn += 1
+        payload = pickle.dumps((self.lsn, op, obj_id, data), protocol=pickle.HIGHEST_PROTOCOL)
+        self._file.write(RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+        self._file.flush()
+        self.records += 1
+        self._unsynced += 1
+        if self._should_sync():
+            self.sync()
+
+    def _should_sync(self):
+        if self.fsync_every and self._unsynced >= self.fsync_every:
+            return True
+        return self.fsync_interval is not None and self._clock() - self._last_sync >= self.fsync_interval
+
+    def sync(self):
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_sync = self._clock()
+
+    def truncate(self):
+        self._file.truncate(0)
+        self._file.seek(0)
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self.records = 0
+
+    def close(self):
+        self.sync()
+        self._file.close()
+
+    @staticmethod
+    def replay(path, after=0):
+        """Itère les (lsn, op, id, données) de LSN supérieur à after : les
+        opérations à rejouer sur un snapshot de LSN after."""
+        for record in OperationLog.records(path):
+            if record[0] > after:
+                yield record
+
+    @staticmethod
+    def records(path):
+        """Itère les (lsn, op, id, données) valides ; coupe le journal au
+        premier illisible.
+
+        Un enregistrement tronqué ou corrompu ne peut être que la fin d'une
+        écriture interrompue : tout ce qui suit est abandonné.
+        """
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return
+        with open(path, 'r+b') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            pos, end = 0, len(data)
+            while pos + RECORD_HEADER.size <= end:
+                length, crc = RECORD_HEADER.unpack_from(data, pos)
+                start = pos + RECORD_HEADER.size
+                payload = data[start:start + length]
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    break
+                yield pickle.loads(payload)
+                pos = start + length
+            valid = pos
+        if valid < end:
+            with open(path, 'r+b') as f:
+                f.truncate(valid)
+
+
+def _snapshot_groups(objects):
+    # Objets regroupés par classe : la classe n'est référencée qu'une fois,
+    # chaque objet n'est que son __dict__ (noms d'attributs mémoïsés par pickle)
+    groups = {}
+    opaque = []
+    for obj in objects:
+        attrs = getattr(obj, '__dict__', None)
+        if attrs is None:
+            opaque.append(obj)
+        else:
+            groups.setdefault(type(obj), []).append(attrs)
+    return list(groups.items()), opaque
+
+
+def write_snapshot(path, objects, lsn=0):
+    """Écrit l'état complet de façon atomique (fichier temporaire, fsync, rename).
+
+    lsn : dernière opération du journal incluse dans cet état.
+    """
+    groups, opaque = _snapshot_groups(objects)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(SNAPSHOT_MAGIC)
+        pickle.dump((lsn, groups, opaque), f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    # Le rename n'est durable qu'une fois le dossier lui-même synchronisé
+    _fsync_directory(os.path.dirname(os.path.abspath(path)))
+
+
+def _fsync_directory(directory):
+    if not hasattr(os, 'O_DIRECTORY'):
+        return  # Windows : un dossier ne s'ouvre pas
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def read_snapshot(path):
+    """({id: objet}, lsn) du snapshot ({}, 0 s'il n'existe pas), lu via mmap."""
+    if not os.path.exists(path):
+        return {}, 0
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if data[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError(f"Not a repository snapshot: {path}")
+        # Décodé directement depuis la projection mémoire, sans copie du fichier
+        with memoryview(data) as view, view[len(SNAPSHOT_MAGIC):] as payload:
+            lsn, groups, opaque = pickle.loads(payload)
+    objects = {obj.id: obj for obj in opaque}
+    for cls, states in groups:
+        new = cls.__new__
+        try:
+            for state in states:
+                obj = new(cls)
+                obj.__dict__ = state
+                objects[state['id']] = obj
+        except AttributeError:
+            # __dict__ non réassignable (SimpleNamespace...) : copie
+            for state in states:
+                obj = new(cls)
+                obj.__dict__.update(state)
+                objects[state['id']] = obj
+    return objects, lsn
+
+
+class DurableMemoryRepository(MemoryRepository):
+    """MemoryRepository qui survit aux redémarrages.
+
+    directory      : dossier du snapshot et du journal
+    fsync_every / fsync_interval : voir OperationLog
+    snapshot_every : snapshot automatique (et journal vidé) tous les N
+                     enregistrements ; None = seulement via snapshot()
+
+    Les objets stockés doivent être picklables.
+    """
+
+    def __init__(self, directory, indexes=None, fsync_every=1, fsync_interval=None,
+                 snapshot_every=100000):
+        super().__init__(indexes=indexes)
+        os.makedirs(directory, exist_ok=True)
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_NAME)
+        self.log_path = os.path.join(directory, LOG_NAME)
+        self.snapshot_every = snapshot_every
+        self._lock = threading.RLock()
+        replayed, lsn = self._recover()
+        self._log = OperationLog(self.log_path, fsync_every, fsync_interval, lsn=lsn)
+        self._log.records = replayed
+
+    def _recover(self):
+        """Charge le snapshot puis rejoue le journal au-delà de son LSN.
+
+        Retourne (enregistrements rejoués, dernier LSN connu).
+        """
+        # Le ramasse-miettes cyclique, déclenché par les millions d'allocations
+        # du chargement, en coûterait plus que le chargement lui-même ; l'état
+        # chargé est ensuite gelé pour que les collectes suivantes l'ignorent
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            self._storage, lsn = read_snapshot(self.snapshot_path)
+            self._rebuild_indexes()
+            replayed = 0
+            for lsn, op, obj_id, data in OperationLog.replay(self.log_path, after=lsn):
+                replayed += 1
+                if op == PUT:
+                    super().add(data)
+                elif op == UPDATE:
+                    super().update(obj_id, data)
+                elif op == DELETE:
+                    super().delete(obj_id)
+            gc.freeze()
+            return replayed, lsn
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def add(self, obj):
+        with self._lock:
+            obj = super().add(obj)
+            self._append(PUT, obj.id, obj)
+            return obj
+
+    def update(self, obj_id, data):
+        with self._lock:
+            obj = super().update(obj_id, data)
+            if obj is not None:
+                self._append(UPDATE, obj_id, {key: value for key, value in data.items() if hasattr(obj, key)})
+            return obj
+
+    def delete(self, obj_id):
+        with self._lock:
+            deleted = super().delete(obj_id)
+            if deleted:
+                self._append(DELETE, obj_id)
+            return deleted
+
+    def _append(self, op, obj_id, data=None):
+        self._log.append(op, obj_id, data)
+        if self.snapshot_every and self._log.records >= self.snapshot_every:
+            self.snapshot()
+
+    def snapshot(self):
+        """Snapshot compacté de l'état courant, puis journal vidé."""
+        with self._lock:
+            write_snapshot(self.snapshot_path, self._storage.values(), self._log.lsn)
+            self._log.truncate()
+
+    def sync(self):
+        with self._lock:
+            self._log.sync()
+
+    def close(self):
+        with self._lock:
+            self._log.close()
@@ -1,47 +1,227 @@
 import uuid
+from bisect import bisect_left, bisect_right, insort
+
+_MISSING = object()
+
+
+class UniqueIndex:
+    """Index de hachage valeur -> id ; une valeur au plus par objet (None non indexé)."""
+
+    def __init__(self, attr_name):
+        self.attr_name = attr_name
+        self._ids = {}
+
+    def check(self, obj_id, value):
+        if value is not None and self._ids.get(value, obj_id) != obj_id:
+            raise ValueError(f"Duplicate value for {self.attr_name}: {value!r}")
+
+    def add(self, obj_id, value):
+        if value is not None:
+            self._ids[value] = obj_id
+
+    def remove(self, obj_id, value):
+        if value is not None and self._ids.get(value) == obj_id:
+            del self._ids[value]
+
+    def lookup(self, value):
+        obj_id = self._ids.get(value)
+        return () if obj_id is None else (obj_id,)
+
+    def build(self, items):
+        for obj_id, value in items:
+            self.check(obj_id, value)
+            self.add(obj_id, value)
+
+
+class MultiIndex:
+    """Index de hachage valeur -> ids (dans l'ordre d'insertion)."""
+
+    def __init__(self, attr_name):
+        self.attr_name = attr_name
+        self._ids = {}
+
+    def check(self, obj_id, value):
+        pass
+
+    def add(self, obj_id, value):
+        self._ids.setdefault(value, {})[obj_id] = None
+
+    def remove(self, obj_id, value):
+        ids = self._ids.get(value)
+        if ids is not None:
+            ids.pop(obj_id, None)
+            if not ids:
+                del self._ids[value]
+
+    def lookup(self, value):
+        return self._ids.get(value, ())
+
+    def build(self, items):
+        for obj_id, value in items:
+            self.add(obj_id, value)
+
+
+class SortedIndex:
+    """Liste triée de (valeur, id) pour les recherches par intervalle (None non indexé)."""
+
+    def __init__(self, attr_name):
+        self.attr_name = attr_name
+        self._entries = []
+
+    def check(self, obj_id, value):
+        pass
+
+    def add(self, obj_id, value):
+        if value is not None:
+            insort(self._entries, (value, obj_id))
+
+    def remove(self, obj_id, value):
+        if value is None:
+            return
+        i = bisect_left(self._entries, (value, obj_id))
+        if i < len(self._entries) and self._entries[i] == (value, obj_id):
+            del self._entries[i]
+
+    def lookup(self, value):
+        return self.range(value, value)
+
+    def build(self, items):
+        # Un tri global plutôt que n insertions
+        self._entries = sorted((value, obj_id) for obj_id, value in items if value is not None)
+
+    def range(self, low=None, high=None, reverse=False):
+        """Ids dont la valeur est dans [low, high], dans l'ordre des valeurs."""
+        # Comparaison sur la valeur seule : bisect avec une clé
+        start = 0 if low is None else bisect_left(self._entries, low, key=lambda e: e[0])
+        stop = len(self._entries) if high is None else bisect_right(self._entries, high, key=lambda e: e[0])
+        entries = self._entries[start:stop]
+        if reverse:
+            entries.reverse()
+        return [obj_id for _, obj_id in entries]
+
+
+INDEX_TYPES = {'unique': UniqueIndex, 'multi': MultiIndex, 'sorted': SortedIndex}
+
 
 class MemoryRepository:
-    """Un repository générique en mémoire pour toutes les entités."""
+    """Un repository générique en mémoire pour toutes les entités.
+
+    Index secondaires déclarables, tenus à jour par add / update / delete :
+        MemoryRepository(indexes={'email': 'unique', 'owner_id': 'multi', 'price': 'sorted'})
+    Un objet modifié hors du repository (setattr direct) n'est pas réindexé :
+    passer par update().
+    """
 
-    def __init__(self):
+    def __init__(self, indexes=None):
         self._storage = {}
+        self._indexes = {}
+        for attr_name, kind in (indexes or {}).items():
+            self.add_index(attr_name, kind)
+
+    def add_index(self, attr_name, kind='multi'):
+        if kind not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type: {kind}")
+        index = INDEX_TYPES[kind](attr_name)
+        index.build(
+            (obj_id, value) for obj_id, value in
+            ((obj_id, getattr(obj, attr_name, _MISSING)) for obj_id, obj in self._storage.items())
+            if value is not _MISSING
+        )
+        self._indexes[attr_name] = index
+        return index
+
+    def _rebuild_indexes(self):
+        for attr_name, index in list(self._indexes.items()):
+            kind = next(k for k, cls in INDEX_TYPES.items() if isinstance(index, cls))
+            self.add_index(attr_name, kind)
+
+    def _indexed_values(self, obj):
+        return {name: getattr(obj, name, _MISSING) for name in self._indexes}
+
+    def _check(self, obj_id, values):
+        for name, value in values.items():
+            if value is not _MISSING:
+                self._indexes[name].check(obj_id, value)
+
+    def _index(self, obj_id, values):
+        for name, value in values.items():
+            if value is not _MISSING:
+                self._indexes[name].add(obj_id, value)
+
+    def _unindex(self, obj_id, values):
+        for name, value in values.items():
+            if value is not _MISSING:
+                self._indexes[name].remove(obj_id, value)
 
     def add(self, obj):
         # On suppose que l'objet a un attribut 'id' (string, UUID)
         if not hasattr(obj, 'id') or not obj.id:
             obj.id = str(uuid.uuid4())
+        values = self._indexed_values(obj)
+        previous = self._storage.get(obj.id)
+        old_values = self._indexed_values(previous) if previous is not None else {}
+        self._check(obj.id, values)
+        self._unindex(obj.id, old_values)
         self._storage[obj.id] = obj
+        self._index(obj.id, values)
         return obj
 
     def get(self, obj_id):
         return self._storage.get(obj_id)
 
     def get_all(self):
+        # Copie des références seulement (voir Repository.get_all)
         return list(self._storage.values())
 
     def update(self, obj_id, data):
         obj = self.get(obj_id)
         if not obj:
             return None
+        data = {key: value for key, value in data.items() if hasattr(obj, key)}
+        old_values = self._indexed_values(obj)
+        new_values = {name: data.get(name, value) for name, value in old_values.items()}
+        # Contrôle d'unicité avant toute modification
+        self._check(obj_id, new_values)
+        self._unindex(obj_id, old_values)
         for key, value in data.items():
-            if hasattr(obj, key):
-                setattr(obj, key, value)
+            setattr(obj, key, value)
+        self._index(obj_id, new_values)
         return obj
 
     def delete(self, obj_id):
         if obj_id in self._storage:
+            self._unindex(obj_id, self._indexed_values(self._storage[obj_id]))
             del self._storage[obj_id]
             return True
         return False
 
+    def _lookup(self, attr_name, attr_value):
+        index = self._indexes.get(attr_name)
+        if index is None or (attr_value is None and not isinstance(index, MultiIndex)):
+            return None
+        return [self._storage[obj_id] for obj_id in index.lookup(attr_value)]
+
     def get_by_attribute(self, attr_name, attr_value):
+        found = self._lookup(attr_name, attr_value)
+        if found is not None:
+            return found[0] if found else None
         for obj in self._storage.values():
             if hasattr(obj, attr_name) and getattr(obj, attr_name) == attr_value:
                 return obj
         return None
 
     def filter_by_attribute(self, attr_name, attr_value):
+        found = self._lookup(attr_name, attr_value)
+        if found is not None:
+            return found
         return [
             obj for obj in self._storage.values()
             if hasattr(obj, attr_name) and getattr(obj, attr_name) == attr_value
         ]
+
+    def range_by_attribute(self, attr_name, low=None, high=None, reverse=False):
+        """Objets dont attr_name est dans [low, high], triés ; index 'sorted' requis."""
+        index = self._indexes.get(attr_name)
+        if not isinstance(index, SortedIndex):
+            raise ValueError(f"No sorted index on {attr_name}")
+        return [self._storage[obj_id] for obj_id in index.range(low, high, reverse)]
@@ -0,0 +1,186 @@
+from datetime import datetime
+from sqlalchemy import inspect, text
+from app.extensions import db
+from app.persistence import replicas
+from app.services import fulltext, place_filters
+from app.services.geo import encode_geohash
+
+# Migrations versionnées du schéma.
+#
+# Une base neuve est créée directement au dernier schéma (db.create_all)
+# puis marquée à jour. Une base existante reçoit, dans l'ordre, chaque
+# migration non appliquée, chacune dans sa propre transaction : un échec
+# laisse la base dans l'état de la dernière migration réussie.
+#
+# Chaque migration est idempotente (colonnes / index ajoutés seulement
+# s'ils manquent), ce qui permet aussi d'adopter une base créée par un
+# ancien db.create_all() sans table de versions.
+
+VERSION_TABLE = 'schema_migrations'
+
+
+def _columns(conn, table):
+    return {col['name'] for col in inspect(conn).get_columns(table)}
+
+
+def _add_column(conn, table, ddl):
+    name = ddl.split()[0]
+    if name not in _columns(conn, table):
+        conn.execute(text(f'ALTER TABLE {table} ADD COLUMN {ddl}'))
+
+
+def _create_index(conn, name, table, columns):
+    conn.execute(text(f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({", ".join(columns)})'))
+
+
+def _0001_baseline(conn):
+    # Tables de départ (users, amenities, places, place_amenity, reviews)
+    db.metadata.create_all(conn, checkfirst=True)
+
+
+def _0002_pagination_indexes(conn):
+    for table in ('users', 'amenities', 'places', 'reviews'):
+        _create_index(conn, f'ix_{table}_created_at_id', table, ['created_at', 'id'])
+
+
+def _0003_place_geohash(conn):
+    _add_column(conn, 'places', 'geohash VARCHAR(12)')
+    _create_index(conn, 'ix_places_geohash', 'places', ['geohash'])
+    rows = conn.execute(text(
+        'SELECT id, latitude, longitude FROM places WHERE geohash IS NULL')).fetchall()
+    if rows:
+        conn.execute(
+            text('UPDATE places SET geohash = :geohash WHERE id = :id'),
+            [{'id': row.id, 'geohash': encode_geohash(row.latitude, row.longitude)} for row in rows]
+        )
+
+
+def _0004_place_rating_aggregates(conn):
+    _add_column(conn, 'places', "review_count INTEGER DEFAULT '0' NOT NULL")
+    _add_column(conn, 'places', "rating_sum INTEGER DEFAULT '0' NOT NULL")
+    _add_column(conn, 'places', "rating_avg FLOAT DEFAULT '0' NOT NULL")
+    _create_index(conn, 'ix_places_rating_avg_id', 'places', ['rating_avg', 'id'])
+    conn.execute(text(
+        'UPDATE places SET '
+        'review_count = (SELECT count(*) FROM reviews WHERE reviews.place_id = places.id), '
+        'rating_sum = (SELECT coalesce(sum(rating), 0) FROM reviews WHERE reviews.place_id = places.id), '
+        'rating_avg = coalesce((SELECT avg(rating) FROM reviews WHERE reviews.place_id = places.id), 0)'
+    ))
+
+
+def _0005_foreign_key_indexes(conn):
+    _create_index(conn, 'ix_places_owner_id', 'places', ['owner_id'])
+    _create_index(conn, 'ix_reviews_user_id', 'reviews', ['user_id'])
+    _create_index(conn, 'ix_reviews_place_id_created_at', 'reviews', ['place_id', 'created_at'])
+    _create_index(conn, 'ix_place_amenity_amenity_id', 'place_amenity', ['amenity_id'])
+    conn.execute(text('ANALYZE'))
+
+
+def _0006_user_token_version(conn):
+    _add_column(conn, 'users', "token_version INTEGER DEFAULT '0' NOT NULL")
+
+
+def _0007_place_fulltext(conn):
+    # Table FTS5 + triggers, puis indexation des places existantes
+    fulltext.install(conn, rebuild=True)
+
+
+def _0008_replica_heartbeats(conn):
+    # Battements lus sur les réplicas pour mesurer leur retard
+    replicas.heartbeats.create(conn, checkfirst=True)
+
+
+def _0009_place_price_index(conn):
+    _create_index(conn, 'ix_places_price_id', 'places', ['price', 'id'])
+
+
+def _0010_review_rating_index(conn):
+    _create_index(conn, 'ix_reviews_place_id_rating_created_at', 'reviews', ['place_id', 'rating', 'created_at'])
+
+
+def _0011_place_amenity_version(conn):
+    # Compteur des écritures sur les liens place-amenity (voir place_filters)
+    place_filters.install(conn)
+
+
+MIGRATIONS = [
+    (1, 'baseline', _0001_baseline),
+    (2, 'pagination_indexes', _0002_pagination_indexes),
+    (3, 'place_geohash', _0003_place_geohash),
+    (4, 'place_rating_aggregates', _0004_place_rating_aggregates),
+    (5, 'foreign_key_indexes', _0005_foreign_key_indexes),
+    (6, 'user_token_version', _0006_user_token_version),
+    (7, 'place_fulltext', _0007_place_fulltext),
+    (8, 'replica_heartbeats', _0008_replica_heartbeats),
+    (9, 'place_price_index', _0009_place_price_index),
+    (10, 'review_rating_index', _0010_review_rating_index),
+    (11, 'place_amenity_version', _0011_place_amenity_version),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def _ensure_version_table(conn):
+    conn.execute(text(
+        f'CREATE TABLE IF NOT EXISTS {VERSION_TABLE} ('
+        'version INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, applied_at DATETIME NOT NULL)'
+    ))
+
+
+def _record(conn, version, name):
+    conn.execute(
+        text(f'INSERT INTO {VERSION_TABLE} (version, name, applied_at) VALUES (:v, :n, :at)'),
+        {'v': version, 'n': name, 'at': datetime.utcnow()}
+    )
+
+
+def applied_versions(engine):
+    with engine.begin() as conn:
+        _ensure_version_table(conn)
+        return {row[0] for row in conn.execute(text(f'SELECT version FROM {VERSION_TABLE}'))}
+
+
+def pending_migrations(engine):
+    applied = applied_versions(engine)
+    return [m for m in MIGRATIONS if m[0] not in applied]
+
+
+def migrate(engine, log=None):
+    """Amène la base au dernier schéma ; retourne les migrations appliquées."""
+    log = log or (lambda message: None)
+    is_new = not inspect(engine).has_table('users')
+    if is_new:
+        with engine.begin() as conn:
+            db.metadata.create_all(conn)
+            replicas.heartbeats.create(conn)
+            _ensure_version_table(conn)
+            for version, name, _ in MIGRATIONS:
+                _record(conn, version, name)
+        log(f"Base créée au schéma {LATEST_VERSION}.")
+        return list(MIGRATIONS)
+    applied = []
+    for version, name, upgrade in pending_migrations(engine):
+        with engine.begin() as conn:
+            upgrade(conn)
+            _record(conn, version, name)
+        log(f"Migration {version:04d}_{name} appliquée.")
+        applied.append((version, name, upgrade))
+    return applied
+
+
+def backup_sqlite(engine, suffix=None):
+    """Copie à chaud d'une base SQLite fichier avant migration (API backup)."""
+    path = engine.url.database
+    if engine.url.get_backend_name() != 'sqlite' or not path or path == ':memory:':
+        return None
+    import sqlite3
+    target = f"{path}.{suffix or datetime.utcnow().strftime('%Y%m%d%H%M%S')}.bak"
+    raw = engine.raw_connection()
+    try:
+        dest = sqlite3.connect(target)
+        with dest:
+            raw.driver_connection.backup(dest)
+        dest.close()
+    finally:
+        raw.close()
+    return target
@@ -0,0 +1,324 @@
+import itertools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from inspect import isgeneratorfunction
+from flask import has_request_context, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import (Column, Float, Integer, MetaData, Table, create_engine, delete, event, exists, func,
+                        insert, literal, select)
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError
+from app.persistence import storage
+from app.services.cache import LRUCache
+
+# Routage des lectures vers des réplicas (fichiers SQLite recopiés, serveurs
+# secondaires...) configurés dans SQLALCHEMY_REPLICA_URIS.
+#
+# Les méthodes de lecture du facade (get_*, search_*, iter_*) lisent sur un
+# réplica ; toutes les autres, et toute écriture, passent par la base
+# principale. Le choix est fait une fois par appel du facade, par l'appel
+# le plus externe : un get_user() appelé par update_user() lit donc sur la
+# principale. Dans une transaction qui a déjà écrit, toutes les lectures
+# vont aussi sur la principale.
+#
+# Lecture de ses propres écritures : après un commit contenant des
+# écritures, l'utilisateur de la requête (identité JWT) lit sur la
+# principale pendant REPLICA_STICKY_SECONDS.
+#
+# Retard : un thread de fond écrit un battement (heure courante) sur la
+# principale toutes les REPLICA_LAG_CHECK_INTERVAL secondes, qu'il y ait des
+# lectures ou non, puis mesure chaque réplica : son retard est l'âge du plus
+# ancien battement qu'il n'a pas encore reçu. Les requêtes ne font que lire
+# le dernier verdict, vieilli du temps écoulé depuis la mesure : au-delà de
+# REPLICA_MAX_LAG_SECONDS, ou s'il est illisible, le réplica est écarté ;
+# sans réplica disponible, les lectures vont sur la principale.
+#
+# Le thread est démarré à la première lecture routée de chaque processus
+# (pid vérifié) : un worker forké après create_app (gunicorn --preload) a
+# donc le sien. Chaque worker mesure, mais le battement n'est écrit que si
+# la principale n'en a pas reçu depuis une demi-période : à plusieurs
+# workers, la principale reçoit toujours un battement par période environ.
+# REPLICA_LAG_MONITOR = False : pas de thread, check() appelé par l'hôte
+# (tests, tâche planifiée).
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_TABLE = 'replica_heartbeats'
+
+# Table hors de db.metadata : créée par la migration 0008 ou par init_app
+heartbeats = Table(
+    HEARTBEAT_TABLE, MetaData(),
+    Column('id', Integer, primary_key=True),
+    Column('beat', Float, nullable=False, index=True),
+)
+
+READ_PREFIXES = ('get_', 'search_', 'iter_')
+
+# Clés de session.info
+_READ_BIND = 'replica_read_bind'      # moteur des lectures en cours (None : principale)
+_DEPTH = 'replica_depth'              # appels routés imbriqués
+_WROTE = 'replica_wrote'              # la transaction en cours a écrit
+_COMMITTED = 'replica_committed'      # une transaction avec écritures a été validée
+
+
+class RoutingSession(Session):
+    """Session de Flask-SQLAlchemy qui envoie les SELECT routés vers un réplica."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            is_select = getattr(clause, 'is_select', False)
+            replica = self.info.get(_READ_BIND)
+            if replica is not None and is_select and not self._flushing and not self.info.get(_WROTE):
+                return replica
+            if not is_select:
+                # flush, insert / update / delete : la suite de la transaction
+                # doit lire ses propres écritures
+                self.info[_WROTE] = True
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _remember_commit(session):
+    if session.info.pop(_WROTE, False):
+        session.info[_COMMITTED] = True
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _forget_writes(session):
+    session.info.pop(_WROTE, None)
+
+
+def _instance_uri(app, uri):
+    # Même règle que Flask-SQLAlchemy : un chemin SQLite relatif part du dossier instance
+    url = make_url(uri)
+    if url.get_backend_name() == 'sqlite' and not storage.is_memory_sqlite(uri) \
+            and not os.path.isabs(url.database):
+        url = url.set(database=os.path.join(app.instance_path, url.database))
+    return url
+
+
+class ReplicaRouter:
+    """Pool de réplicas en lecture, stickiness et contrôle du retard."""
+
+    def __init__(self, clock=time.monotonic, wall_clock=time.time):
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._db = None
+        self._primary = None
+        self.engines = []
+        self._health = {}
+        self._check_lock = threading.Lock()
+        self._monitor_lock = threading.Lock()
+        self._monitor = None
+        self._monitor_pid = None
+        self.monitor = False
+        self._stop = threading.Event()
+        self._counter = itertools.count()
+        self._sticky = None
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def init_app(self, app, db):
+        self.dispose()
+        self._db = db
+        self.sticky_seconds = app.config.get('REPLICA_STICKY_SECONDS', 5)
+        self.max_lag = app.config.get('REPLICA_MAX_LAG_SECONDS', 2.0)
+        self.check_interval = app.config.get('REPLICA_LAG_CHECK_INTERVAL', 1.0)
+        # Battements gardés bien au-delà du retard toléré
+        self.retention = max(60.0, 10 * self.max_lag)
+        self._sticky = LRUCache(app.config.get('REPLICA_STICKY_CACHE_SIZE', 10000), self.sticky_seconds)
+        # Aucune écriture possible par erreur sur un réplica SQLite
+        pragmas = dict(app.config.get('SQLITE_PRAGMAS', storage.DEFAULT_SQLITE_PRAGMAS), query_only='ON')
+        for uri in app.config.get('SQLALCHEMY_REPLICA_URIS') or []:
+            url = _instance_uri(app, uri)
+            options = storage.engine_options({**app.config, 'SQLALCHEMY_DATABASE_URI': url})
+            engine = create_engine(url, **options)
+            storage.install_pragmas(engine, pragmas)
+            self.engines.append(engine)
+        if not self.engines:
+            return
+        with app.app_context():
+            self._primary = db.engine
+        heartbeats.create(self._primary, checkfirst=True)
+
+        # Démarré par read_engine(), dans le processus qui sert les requêtes
+        self.monitor = app.config.get('REPLICA_LAG_MONITOR', True)
+
+        @app.teardown_request
+        def remember_request_writes(exc):
+            if db.session.info.pop(_COMMITTED, False):
+                self.mark_sticky(self._identity())
+
+    def dispose(self):
+        self.stop_monitor()
+        self.monitor = False
+        for engine in self.engines:
+            engine.dispose()
+        self.engines = []
+        self._health = {}
+        self._primary = None
+
+    # ---------- Stickiness ----------
+    def _identity(self):
+        if not has_request_context() or 'Authorization' not in request.headers:
+            return None
+        try:
+            # Déjà vérifié par @jwt_required() le cas échéant ; sinon décodage
+            # optionnel (mis en cache par CachingJWTManager)
+            verify_jwt_in_request(optional=True)
+            return get_jwt_identity()
+        except Exception:
+            return None
+
+    def mark_sticky(self, identity):
+        if identity is not None and self._sticky is not None:
+            self._sticky.set(str(identity), True)
+
+    def is_sticky(self, identity):
+        return identity is not None and self._sticky is not None and self._sticky.get(str(identity)) is not None
+
+    # ---------- Retard ----------
+    def _after_fork(self):
+        # Le thread du parent n'existe pas dans l'enfant, et ses verrous ont
+        # pu être copiés pris
+        self._check_lock = threading.Lock()
+        self._monitor_lock = threading.Lock()
+        self._monitor = None
+        self._monitor_pid = None
+
+    def start_monitor(self):
+        with self._monitor_lock:
+            if self._monitor_pid == os.getpid():
+                return
+            self._stop = threading.Event()
+            self._monitor = threading.Thread(target=self._monitor_loop, name='replica-lag-monitor', daemon=True)
+            self._monitor_pid = os.getpid()
+            self._monitor.start()
+
+    def stop_monitor(self):
+        if self._monitor is not None and self._monitor_pid == os.getpid():
+            self._stop.set()
+            self._monitor.join()
+        self._monitor = None
+        self._monitor_pid = None
+
+    def _monitor_loop(self):
+        while not self._stop.is_set():
+            try:
+                self.check()
+            except Exception:
+                logger.exception("Replica lag check failed")
+            self._stop.wait(max(self.check_interval, 0.01))
+
+    def check(self):
+        """Un battement sur la principale (sauf si un autre worker vient
+        d'en écrire un), puis le retard de chaque réplica."""
+        with self._check_lock:
+            now = self._wall_clock()
+            recent = exists().where(heartbeats.c.beat > now - self.check_interval / 2)
+            try:
+                with self._primary.begin() as conn:
+                    beat = conn.execute(insert(heartbeats).from_select(['beat'], select(literal(now)).where(~recent)))
+                    if beat.rowcount:
+                        conn.execute(delete(heartbeats).where(heartbeats.c.beat < now - self.retention))
+            except SQLAlchemyError:
+                # Sans battement frais, les retards mesurés ne font que croître
+                logger.warning("Heartbeat not written to primary", exc_info=True)
+            for engine in self.engines:
+                self._health[engine] = (self._clock(), self.lag(engine, now))
+
+    def lag(self, engine, now=None):
+        """Retard estimé du réplica en secondes ; infini s'il est illisible."""
+        now = self._wall_clock() if now is None else now
+        beat = heartbeats.c.beat
+        try:
+            with engine.connect() as conn:
+                seen = conn.execute(select(func.max(beat))).scalar()
+            with self._primary.connect() as conn:
+                unseen = select(func.min(beat))
+                if seen is not None:
+                    unseen = unseen.where(beat > seen)
+                missed = conn.execute(unseen).scalar()
+        except SQLAlchemyError:
+            logger.warning("Replica %s unreadable, reads fall back to primary", engine.url, exc_info=True)
+            return float('inf')
+        if missed is None:
+            return 0.0
+        if seen is not None and seen < now - self.retention:
+            # Les battements manqués les plus anciens ont déjà été purgés
+            return float('inf')
+        return max(now - missed, 0.0)
+
+    def is_healthy(self, engine):
+        """Dernier retard mesuré, plus le temps écoulé depuis : un réplica
+        qui ne reçoit plus rien n'est pas gardé au-delà de max_lag."""
+        checked_at, lag = self._health.get(engine, (None, float('inf')))
+        if checked_at is None:
+            return False
+        return lag + (self._clock() - checked_at) <= self.max_lag
+
+    # ---------- Routage ----------
+    def read_engine(self):
+        """Réplica pour les lectures de l'appel en cours, ou None (principale)."""
+        if not self.engines:
+            return None
+        if self.monitor and self._monitor_pid != os.getpid():
+            self.start_monitor()
+        if self.is_sticky(self._identity()):
+            return None
+        healthy = [engine for engine in self.engines if self.is_healthy(engine)]
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+    @contextmanager
+    def routing(self, read=True):
+        """Lectures du bloc sur un réplica (read) ou sur la principale.
+
+        Imbriqué, un bloc de lecture garde le choix du bloc englobant ; un
+        bloc read=False force la principale jusqu'à sa sortie.
+        """
+        if not self.engines:
+            yield
+            return
+        info = self._db.session.info
+        depth = info.get(_DEPTH, 0)
+        previous = info.get(_READ_BIND)
+        if not read:
+            info[_READ_BIND] = None
+        elif depth == 0:
+            # Transaction qui a déjà écrit : lectures sur la principale de toute façon
+            info[_READ_BIND] = None if info.get(_WROTE) else self.read_engine()
+        info[_DEPTH] = depth + 1
+        try:
+            yield
+        finally:
+            info[_DEPTH] = depth
+            info[_READ_BIND] = previous
+
+    def route_reads(self, cls):
+        """Décorateur de classe : méthodes get_* / search_* / iter_* routées en lecture."""
+        for name, method in list(vars(cls).items()):
+            if name.startswith('_') or not callable(method):
+                continue
+            setattr(cls, name, self._routed(method, read=name.startswith(READ_PREFIXES)))
+        return cls
+
+    def _routed(self, method, read):
+        if isgeneratorfunction(method):
+            @wraps(method)
+            def generator(*args, **kwargs):
+                with self.routing(read):
+                    yield from method(*args, **kwargs)
+            return generator
+
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            with self.routing(read):
+                return method(*args, **kwargs)
+        return wrapper
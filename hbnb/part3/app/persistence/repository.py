@@ -11,6 +11,8 @@ class Repository(ABC):
 
     @abstractmethod
     def get_all(self):
+        """Liste de tous les objets, figée à l'appel : les écritures qui
+        suivent (y compris pendant son parcours) ne la modifient pas."""
         pass
 
     @abstractmethod
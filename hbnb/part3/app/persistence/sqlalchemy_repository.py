@@ -1,4 +1,7 @@
+from datetime import datetime
+from sqlalchemy import delete, insert, update
 from app import db
+from app.persistence.unit_of_work import commit
 
 class SQLAlchemyRepository:
     def __init__(self, model):
@@ -6,7 +9,7 @@ class SQLAlchemyRepository:
 
     def add(self, obj):
         db.session.add(obj)
-        db.session.commit()
+        commit()
         return obj
 
     def get(self, obj_id):
@@ -22,16 +25,55 @@ class SQLAlchemyRepository:
         for key, value in data.items():
             if hasattr(obj, key):
                 setattr(obj, key, value)
-        db.session.commit()
+        commit()
         return obj
 
     def delete(self, obj_id):
         obj = self.get(obj_id)
         if obj:
             db.session.delete(obj)
-            db.session.commit()
+            commit()
             return True
         return False
 
     def get_by_attribute(self, attr_name, attr_value):
         return self.model.query.filter(getattr(self.model, attr_name) == attr_value).first()
+
+    # Opérations en lot : une seule instruction SQL, sans passer par les
+    # objets ORM (ni validation, ni événements, ni cascades de relations).
+
+    def add_many(self, rows):
+        """Insère des dicts de colonnes en un INSERT multi-lignes ; retourne les ids."""
+        rows = [dict(row) for row in rows]
+        if not rows:
+            return []
+        ids = db.session.execute(insert(self.model).returning(self.model.id), rows).scalars().all()
+        commit()
+        return ids
+
+    def update_many(self, obj_ids, data):
+        """Applique data à tous les obj_ids en un UPDATE ... WHERE id IN ; retourne le nombre de lignes."""
+        obj_ids = list(obj_ids)
+        if not obj_ids or not data:
+            return 0
+        values = dict(data)
+        if hasattr(self.model, 'updated_at'):
+            values.setdefault('updated_at', datetime.utcnow())
+        count = db.session.execute(
+            update(self.model).where(self.model.id.in_(obj_ids)).values(**values)
+            .execution_options(synchronize_session='fetch')
+        ).rowcount
+        commit()
+        return count
+
+    def delete_many(self, obj_ids):
+        """Supprime obj_ids en un DELETE ... WHERE id IN ; retourne le nombre de lignes."""
+        obj_ids = list(obj_ids)
+        if not obj_ids:
+            return 0
+        count = db.session.execute(
+            delete(self.model).where(self.model.id.in_(obj_ids))
+            .execution_options(synchronize_session='fetch')
+        ).rowcount
+        commit()
+        return count
@@ -0,0 +1,74 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# Profil de stockage : options du moteur SQLAlchemy et pragmas SQLite,
+# calculés d'après la config de l'app (voir Config dans config.py).
+
+DEFAULT_SQLITE_PRAGMAS = {
+    # Les lecteurs ne sont plus bloqués par l'écrivain (et inversement)
+    'journal_mode': 'WAL',
+    # En WAL, NORMAL reste cohérent après un crash ; seul le dernier commit peut être perdu
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -64000,       # 64 Mo de cache de pages
+    'mmap_size': 268435456,     # 256 Mo lus via mmap
+    'temp_store': 'MEMORY',
+}
+
+
+def is_sqlite(uri):
+    return make_url(uri).get_backend_name() == 'sqlite'
+
+
+def is_memory_sqlite(uri):
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS complétées par le profil de stockage.
+
+    Les options déjà présentes dans SQLALCHEMY_ENGINE_OPTIONS sont gardées.
+    """
+    uri = config['SQLALCHEMY_DATABASE_URI']
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    # Cache des requêtes SQL compilées par SQLAlchemy
+    options.setdefault('query_cache_size', config.get('DB_QUERY_CACHE_SIZE', 1200))
+    if is_sqlite(uri):
+        connect_args = dict(options.get('connect_args') or {})
+        # Cache de requêtes préparées de sqlite3, par connexion
+        connect_args.setdefault('cached_statements', config.get('DB_STATEMENT_CACHE_SIZE', 256))
+        options['connect_args'] = connect_args
+        if is_memory_sqlite(uri):
+            # Une seule connexion partagée (StaticPool) : pas de dimensionnement
+            return options
+    options.setdefault('pool_size', config.get('DB_POOL_SIZE', 5))
+    options.setdefault('max_overflow', config.get('DB_MAX_OVERFLOW', 10))
+    options.setdefault('pool_timeout', config.get('DB_POOL_TIMEOUT', 30))
+    if not is_sqlite(uri):
+        # Serveur : connexions coupées côté serveur détectées et recyclées
+        options.setdefault('pool_pre_ping', True)
+        options.setdefault('pool_recycle', config.get('DB_POOL_RECYCLE', 1800))
+    return options
+
+
+def install_pragmas(engine, pragmas):
+    """Applique les pragmas à chaque nouvelle connexion SQLite du moteur."""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+        finally:
+            cursor.close()
+
+
+def init_app(app, db):
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+    db.init_app(app)
+    with app.app_context():
+        install_pragmas(db.engine, app.config.get('SQLITE_PRAGMAS', DEFAULT_SQLITE_PRAGMAS))
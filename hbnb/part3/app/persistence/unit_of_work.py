@@ -0,0 +1,128 @@
+from contextlib import contextmanager
+from flask import current_app, g, request
+from app.extensions import db
+
+# Unité de travail : regroupe plusieurs opérations en une seule transaction.
+#
+# Hors unité de travail, commit() valide immédiatement (comportement
+# historique). Dans une unité de travail, commit() se contente d'un flush
+# (ids, contraintes) et la transaction est validée une seule fois à la
+# sortie du bloc le plus externe, ou annulée s'il lève une exception.
+# Les actions after_commit() (invalidation de cache...) attendent le vrai
+# commit et sont abandonnées en cas de rollback.
+
+_DEPTH = 'uow_depth'
+_CALLBACKS = 'uow_after_commit'
+_OWN_TRANSACTIONS = 'own_transactions'
+
+
+def in_unit_of_work():
+    return db.session.info.get(_DEPTH, 0) > 0
+
+
+def begin():
+    info = db.session.info
+    info[_DEPTH] = info.get(_DEPTH, 0) + 1
+
+
+def end(success=True):
+    """Ferme un niveau ; le plus externe valide (success) ou annule."""
+    info = db.session.info
+    info[_DEPTH] -= 1
+    if info[_DEPTH] == 0:
+        if success:
+            _commit()
+        else:
+            _rollback()
+
+
+@contextmanager
+def unit_of_work():
+    """with unit_of_work(): ... — un seul commit pour tout le bloc (imbricable)."""
+    begin()
+    try:
+        yield db.session
+    except BaseException:
+        end(success=False)
+        raise
+    end()
+
+
+def commit():
+    """Commit immédiat, ou simple flush à l'intérieur d'une unité de travail."""
+    if in_unit_of_work():
+        db.session.flush()
+    else:
+        _commit()
+
+
+def after_commit(callback):
+    """Exécute callback après le commit (tout de suite hors unité de travail)."""
+    if in_unit_of_work():
+        db.session.info.setdefault(_CALLBACKS, []).append(callback)
+    else:
+        callback()
+
+
+def _commit():
+    try:
+        db.session.commit()
+    except BaseException:
+        _rollback()
+        raise
+    for callback in db.session.info.pop(_CALLBACKS, []):
+        callback()
+
+
+def _rollback():
+    db.session.info.pop(_CALLBACKS, None)
+    db.session.rollback()
+
+
+def own_transactions(view):
+    """Vue exclue de l'unité de travail par requête : ses commit() valident
+    immédiatement. Pour les imports par lots, qui committent chaque lot
+    (verrou d'écriture SQLite tenu le temps d'un lot, lots précédents
+    conservés si un suivant échoue).
+    """
+    setattr(view, _OWN_TRANSACTIONS, True)
+    return view
+
+
+def _has_own_transactions():
+    view = current_app.view_functions.get(request.endpoint)
+    # Resource Flask-RESTX / MethodView : la méthode HTTP appelée
+    view_class = getattr(view, 'view_class', None)
+    if view_class is not None:
+        view = getattr(view_class, request.method.lower(), view)
+    return getattr(view, _OWN_TRANSACTIONS, False)
+
+
+def init_app(app):
+    """Une unité de travail par requête si UNIT_OF_WORK_PER_REQUEST est vrai.
+
+    Commit si la réponse est un succès (< 400), rollback sinon : une
+    opération qui échoue à mi-chemin ne laisse rien en base. Les vues
+    marquées own_transactions en sont exclues.
+    """
+    if not app.config.get('UNIT_OF_WORK_PER_REQUEST', False):
+        return
+
+    @app.before_request
+    def begin_request_unit_of_work():
+        if _has_own_transactions():
+            return
+        begin()
+        g.unit_of_work = True
+
+    @app.after_request
+    def end_request_unit_of_work(response):
+        if g.pop('unit_of_work', False):
+            end(success=response.status_code < 400)
+        return response
+
+    @app.teardown_request
+    def abort_request_unit_of_work(exc):
+        # Exception non gérée : after_request n'a pas été appelé
+        if g.pop('unit_of_work', False):
+            end(success=False)
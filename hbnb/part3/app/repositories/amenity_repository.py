@@ -1,4 +1,5 @@
 from app.extensions import db
+from app.persistence.unit_of_work import commit
 from app.models.amenity import Amenity
 
 class AmenityRepository:
@@ -13,15 +14,15 @@ class AmenityRepository:
     @staticmethod
     def create(amenity):
         db.session.add(amenity)
-        db.session.commit()
+        commit()
         return amenity
 
     @staticmethod
     def update(amenity):
-        db.session.commit()
+        commit()
         return amenity
 
     @staticmethod
     def delete(amenity):
         db.session.delete(amenity)
-        db.session.commit()
+        commit()
@@ -1,4 +1,5 @@
 from app.extensions import db
+from app.persistence.unit_of_work import commit
 from app.models.place import Place
 
 class PlaceRepository:
@@ -13,15 +14,15 @@ class PlaceRepository:
     @staticmethod
     def create(place):
         db.session.add(place)
-        db.session.commit()
+        commit()
         return place
 
     @staticmethod
     def update(place):
-        db.session.commit()
+        commit()
         return place
 
     @staticmethod
     def delete(place):
         db.session.delete(place)
-        db.session.commit()
+        commit()
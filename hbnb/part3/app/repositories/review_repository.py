@@ -1,4 +1,5 @@
 from app.extensions import db
+from app.persistence.unit_of_work import commit
 from app.models.review import Review
 
 class ReviewRepository:
@@ -17,15 +18,15 @@ class ReviewRepository:
     @staticmethod
     def create(review):
         db.session.add(review)
-        db.session.commit()
+        commit()
         return review
 
     @staticmethod
     def update(review):
-        db.session.commit()
+        commit()
         return review
 
     @staticmethod
     def delete(review):
         db.session.delete(review)
-        db.session.commit()
+        commit()
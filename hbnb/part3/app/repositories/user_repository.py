@@ -1,4 +1,5 @@
 from app.extensions import db
+from app.persistence.unit_of_work import commit
 from app.models.user import User
 
 class UserRepository:
@@ -13,7 +14,7 @@ class UserRepository:
     @staticmethod
     def create(user):
         db.session.add(user)
-        db.session.commit()
+        commit()
         return user
 
     @staticmethod
@@ -22,10 +23,10 @@ class UserRepository:
 
     @staticmethod
     def update(user):
-        db.session.commit()
+        commit()
         return user
 
     @staticmethod
     def delete(user):
         db.session.delete(user)
-        db.session.commit()
+        commit()
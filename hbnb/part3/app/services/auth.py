@@ -1,7 +1,8 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import create_access_token
 from app.services.facade import HBnBFacade
-from werkzeug.security import check_password_hash
+from app.services.passwords import HashingBusy
+from app.services.tokens import token_claims
 
 api = Namespace('auth', description='Authentication')
 
@@ -11,18 +12,15 @@ login_model = api.model('Login', {
 })
 
 def login_user(email, password):
-    facade = HBnBFacade()
-    user = facade.get_user_by_email(email)
+    """Token d'accès, ou None si les identifiants sont faux.
+
+    Lève HashingBusy si la vérification du mot de passe n'a pas obtenu de
+    place dans le pool de hachage (à rendre en 503).
+    """
+    user = HBnBFacade().authenticate(email, password)
     if not user:
         return None
-    if hasattr(user, "check_password"):
-        if not user.check_password(password):
-            return None
-    else:
-        if not check_password_hash(user.password_hash, password):
-            return None
-    claims = {'is_admin': getattr(user, 'is_admin', False)}
-    token = create_access_token(identity=user.id, additional_claims=claims)
+    token = create_access_token(identity=user.id, additional_claims=token_claims(user))
     return token
 
 @api.route('/login')
@@ -30,9 +28,10 @@ class Login(Resource):
     @api.expect(login_model, validate=True)
     def post(self):
         data = api.payload
-        facade = HBnBFacade()
-        user = facade.get_user_by_email(data['email'])
-        if not user or not user.check_password(data['password']):
+        try:
+            token = login_user(data['email'], data['password'])
+        except HashingBusy:
+            return {'error': 'Too many concurrent logins, retry later'}, 503
+        if not token:
             return {'error': 'Invalid credentials'}, 401
-        token = create_access_token(identity=user.id, additional_claims={'is_admin': user.is_admin})
         return {'access_token': token}, 200
@@ -0,0 +1,228 @@
+import json
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import bindparam, insert, update
+from app.extensions import db, cache
+from app.models.user import User
+from app.models.place import Place, PlaceAmenity
+from app.models.amenity import Amenity
+from app.models.review import Review
+from app.services.cache import place_key
+from app.services.geo import encode_geohash
+from app.persistence.unit_of_work import commit, after_commit
+
+CHUNK_SIZE = 1000
+
+
+def parse_ndjson(lines):
+    """Itère (numéro de ligne, objet) sur un flux NDJSON (str ou bytes).
+
+    Une ligne illisible donne (numéro, ValueError) au lieu d'arrêter l'import.
+    """
+    for line_no, line in enumerate(lines, start=1):
+        try:
+            # UnicodeDecodeError est une ValueError : rapportée comme le JSON invalide
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            line = line.strip()
+            if not line:
+                continue
+            obj = json.loads(line)
+            if not isinstance(obj, dict):
+                raise ValueError("Each line must be a JSON object")
+        except ValueError as e:
+            yield line_no, ValueError(f"Invalid JSON: {e}")
+            continue
+        yield line_no, obj
+
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class BulkImporter:
+    """Import par lots : une transaction et quelques requêtes par lot.
+
+    Chaque ligne est validée avec le validate_data du modèle ; les références
+    (owner, amenities, place, user) d'un lot sont résolues par une requête IN
+    chacune, puis les lignes valides sont insérées en executemany. Les lignes
+    invalides sont listées dans le rapport sans bloquer les autres.
+    """
+
+    def __init__(self, chunk_size=CHUNK_SIZE):
+        self.chunk_size = chunk_size
+
+    def import_amenities(self, rows):
+        return self._run(rows, self._amenity_chunk)
+
+    def import_places(self, rows):
+        return self._run(rows, self._place_chunk)
+
+    def import_reviews(self, rows):
+        return self._run(rows, self._review_chunk)
+
+    def _run(self, rows, handler):
+        report = {'inserted': 0, 'errors': []}
+        for chunk in chunked(rows, self.chunk_size):
+            valid = []
+            for line_no, data in chunk:
+                if isinstance(data, Exception):
+                    report['errors'].append({'line': line_no, 'error': str(data)})
+                else:
+                    valid.append((line_no, data))
+            try:
+                inserted, errors, touched = handler(valid)
+                # Un commit par lot, ou un seul pour tout l'import dans une unité de travail
+                commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            keys = [place_key(place_id) for place_id in touched]
+            after_commit(lambda: cache.delete(*keys))
+            report['inserted'] += inserted
+            report['errors'].extend(errors)
+        report['errors'].sort(key=lambda e: e['line'])
+        return report
+
+    def _validate(self, model, rows, errors, str_fields=(), optional_str_fields=(), list_field=None):
+        # validate_data + types des champs insérés tels quels (clés de lookup,
+        # textes) : une valeur non liable ferait échouer tout l'executemany
+        ok = []
+        for line_no, data in rows:
+            try:
+                model.validate_data(data)
+                for field in str_fields:
+                    if not isinstance(data[field], str):
+                        raise ValueError(f"{field} must be a string")
+                for field in optional_str_fields:
+                    if data.get(field) is not None and not isinstance(data[field], str):
+                        raise ValueError(f"{field} must be a string")
+                if list_field:
+                    values = data.get(list_field) or []
+                    if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+                        raise ValueError(f"{list_field} must be a list of ids")
+            except (ValueError, TypeError, KeyError) as e:
+                errors.append({'line': line_no, 'error': str(e)})
+            else:
+                ok.append((line_no, data))
+        return ok
+
+    def _existing_ids(self, model, ids):
+        if not ids:
+            return set()
+        return {obj_id for obj_id, in db.session.query(model.id).filter(model.id.in_(ids))}
+
+    def _amenity_chunk(self, rows):
+        errors = []
+        rows = self._validate(Amenity, rows, errors, str_fields=('name',))
+        names = {data['name'] for _, data in rows}
+        taken = {name for name, in db.session.query(Amenity.name).filter(Amenity.name.in_(names))}
+        now = datetime.utcnow()
+        values = []
+        for line_no, data in rows:
+            if data['name'] in taken:
+                errors.append({'line': line_no, 'error': f"Amenity already exists: {data['name']}"})
+                continue
+            taken.add(data['name'])
+            values.append({'id': str(uuid.uuid4()), 'name': data['name'],
+                           'created_at': now, 'updated_at': now})
+        if values:
+            db.session.execute(insert(Amenity.__table__), values)
+        return len(values), errors, ()
+
+    def _place_chunk(self, rows):
+        errors = []
+        rows = self._validate(Place, rows, errors, str_fields=('title', 'owner_id'),
+                              optional_str_fields=('description',), list_field='amenities')
+        owners = self._existing_ids(User, {data['owner_id'] for _, data in rows})
+        amenities = self._existing_ids(
+            Amenity, {a for _, data in rows for a in data.get('amenities') or []})
+        now = datetime.utcnow()
+        places, links = [], []
+        for line_no, data in rows:
+            if data['owner_id'] not in owners:
+                errors.append({'line': line_no, 'error': "Owner not found"})
+                continue
+            wanted = list(dict.fromkeys(data.get('amenities') or []))
+            unknown = [a for a in wanted if a not in amenities]
+            if unknown:
+                errors.append({'line': line_no, 'error': f"Amenity not found: {', '.join(unknown)}"})
+                continue
+            place_id = str(uuid.uuid4())
+            latitude, longitude = float(data['latitude']), float(data['longitude'])
+            places.append({
+                'id': place_id,
+                'title': data['title'],
+                'description': data.get('description', ''),
+                'price': float(data['price']),
+                'latitude': latitude,
+                'longitude': longitude,
+                'owner_id': data['owner_id'],
+                # Les événements ORM ne sont pas déclenchés par un insert en lot
+                'geohash': encode_geohash(latitude, longitude),
+                'review_count': 0,
+                'rating_sum': 0,
+                'rating_avg': 0.0,
+                'created_at': now,
+                'updated_at': now,
+            })
+            links.extend({'place_id': place_id, 'amenity_id': a} for a in wanted)
+        if places:
+            db.session.execute(insert(Place.__table__), places)
+        if links:
+            db.session.execute(insert(PlaceAmenity.__table__), links)
+        return len(places), errors, ()
+
+    def _review_chunk(self, rows):
+        errors = []
+        rows = self._validate(Review, rows, errors, str_fields=('text', 'user_id', 'place_id'))
+        users = self._existing_ids(User, {data['user_id'] for _, data in rows})
+        places = self._existing_ids(Place, {data['place_id'] for _, data in rows})
+        now = datetime.utcnow()
+        reviews = []
+        deltas = defaultdict(lambda: [0, 0])
+        for line_no, data in rows:
+            if data['user_id'] not in users:
+                errors.append({'line': line_no, 'error': "User not found"})
+                continue
+            if data['place_id'] not in places:
+                errors.append({'line': line_no, 'error': "Place not found"})
+                continue
+            rating = int(data['rating'])
+            reviews.append({
+                'id': str(uuid.uuid4()),
+                'text': data['text'],
+                'rating': rating,
+                'place_id': data['place_id'],
+                'user_id': data['user_id'],
+                'created_at': now,
+                'updated_at': now,
+            })
+            deltas[data['place_id']][0] += 1
+            deltas[data['place_id']][1] += rating
+        if reviews:
+            db.session.execute(insert(Review.__table__), reviews)
+            self._apply_rating_deltas(deltas, now)
+        return len(reviews), errors, deltas.keys()
+
+    def _apply_rating_deltas(self, deltas, now):
+        # Un seul UPDATE (executemany) pour toutes les places touchées du lot
+        table = Place.__table__
+        new_count = table.c.review_count + bindparam('d_count')
+        new_sum = table.c.rating_sum + bindparam('d_sum')
+        db.session.execute(
+            update(table)
+            .where(table.c.id == bindparam('p_id'))
+            .values(review_count=new_count, rating_sum=new_sum,
+                    rating_avg=new_sum * 1.0 / new_count, updated_at=now),
+            [{'p_id': place_id, 'd_count': count, 'd_sum': total}
+             for place_id, (count, total) in deltas.items()]
+        )
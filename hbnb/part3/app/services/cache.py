@@ -0,0 +1,192 @@
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+
+class CacheBackend(ABC):
+    """Interface commune des backends de cache (valeurs sérialisables en JSON)."""
+
+    @abstractmethod
+    def get(self, key):
+        """Retourne la valeur, ou None si absente / expirée."""
+
+    @abstractmethod
+    def set(self, key, value, ttl=None):
+        pass
+
+    @abstractmethod
+    def delete(self, *keys):
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+
+class NullCache(CacheBackend):
+    """Backend qui ne stocke rien (cache désactivé)."""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl=None):
+        pass
+
+    def delete(self, *keys):
+        pass
+
+    def clear(self):
+        pass
+
+
+class LRUCache(CacheBackend):
+    """Cache en mémoire du process, borné en taille, avec expiration.
+
+    Les valeurs sont partagées entre les requêtes : les appelants ne
+    doivent pas les modifier.
+    """
+
+    def __init__(self, max_size=10000, ttl=300, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= self._clock():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = self._clock() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisCache(CacheBackend):
+    """Backend pour tout client compatible Redis (get / set(ex=) / delete).
+
+    Les valeurs sont stockées en JSON sous un préfixe de clé, ce qui permet
+    de partager le cache entre plusieurs workers.
+    """
+
+    def __init__(self, client, ttl=300, prefix='hbnb:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        import redis  # dépendance optionnelle
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        self.client.set(self.prefix + key, json.dumps(value), ex=ttl or None)
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+
+    def clear(self):
+        keys = list(self.client.scan_iter(self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+
+class Cache:
+    """Extension Flask : choisit le backend d'après la config de l'app.
+
+    CACHE_BACKEND : 'lru' (défaut), 'redis' ou 'null'
+    CACHE_MAX_SIZE, CACHE_TTL (secondes), CACHE_REDIS_URL
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or NullCache()
+
+    def init_app(self, app):
+        kind = app.config.get('CACHE_BACKEND', 'lru')
+        ttl = app.config.get('CACHE_TTL', 300)
+        if kind == 'lru':
+            self.backend = LRUCache(app.config.get('CACHE_MAX_SIZE', 10000), ttl)
+        elif kind == 'redis':
+            self.backend = RedisCache.from_url(app.config['CACHE_REDIS_URL'], ttl=ttl)
+        elif kind == 'null':
+            self.backend = NullCache()
+        else:
+            raise ValueError(f"Unknown CACHE_BACKEND: {kind}")
+
+    def get(self, key):
+        return self.backend.get(key)
+
+    def set(self, key, value, ttl=None):
+        self.backend.set(key, value, ttl)
+
+    def delete(self, *keys):
+        self.backend.delete(*keys)
+
+    def clear(self):
+        self.backend.clear()
+
+    def get_or_set(self, key, loader, ttl=None):
+        """Lecture à travers le cache : loader() n'est appelé qu'en cas d'absence.
+
+        Un résultat None (entité inexistante) n'est pas mis en cache.
+        """
+        value = self.backend.get(key)
+        if value is None:
+            value = loader()
+            if value is not None:
+                self.backend.set(key, value, ttl)
+        return value
+
+
+def place_key(place_id):
+    return f'place:{place_id}'
+
+
+def amenity_key(amenity_id):
+    return f'amenity:{amenity_id}'
+
+
+def review_key(review_id):
+    return f'review:{review_id}'
+
+
+def user_key(user_id):
+    return f'user:{user_id}'
@@ -0,0 +1,117 @@
+import zlib
+from flask import request
+
+try:
+    import brotli  # dépendance optionnelle
+except ImportError:
+    brotli = None
+
+# Compression des réponses selon Accept-Encoding.
+#
+# Algorithmes par ordre de préférence du serveur (COMPRESS_ALGORITHMS) :
+# le client choisit par ses qualités, le serveur départage les égalités.
+# brotli n'est proposé que si le module est installé.
+#
+# Une réponse en mémoire n'est compressée qu'à partir de COMPRESS_MIN_SIZE
+# octets : en dessous, le gain ne compense pas le CPU (un paquet suffit).
+# Une réponse streamée (export NDJSON) est compressée au fil de l'eau,
+# sans être reconstituée en mémoire ; sa taille n'étant pas connue, elle
+# l'est toujours. Seul l'export est streamé : les pages des listes, bornées
+# par leur limite, sont construites en mémoire puis compressées d'un bloc.
+#
+# L'ETag d'une réponse compressée devient faible (W/"...") : le même
+# validateur désigne plusieurs encodages, octets différents.
+
+DEFAULT_MIMETYPES = ('application/json', 'application/x-ndjson', 'text/html', 'text/plain',
+                     'text/css', 'application/javascript')
+
+
+class _Gzip:
+    def __init__(self, level):
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        return self._z.compress(data)
+
+    def flush(self):
+        return self._z.flush()
+
+
+class _Brotli:
+    def __init__(self, level):
+        self._b = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._b.process(data)
+
+    def flush(self):
+        return self._b.finish()
+
+
+CODECS = {'br': _Brotli, 'gzip': _Gzip}
+
+
+class ResponseCompressor:
+    """Compression gzip / brotli des réponses (hook after_request)."""
+
+    def __init__(self):
+        self.algorithms = ()
+
+    def init_app(self, app):
+        self.algorithms = tuple(
+            name for name in app.config.get('COMPRESS_ALGORITHMS', ('br', 'gzip'))
+            if name in CODECS and (name != 'br' or brotli is not None))
+        self.min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+        self.levels = {
+            'gzip': app.config.get('COMPRESS_GZIP_LEVEL', 6),
+            'br': app.config.get('COMPRESS_BROTLI_LEVEL', 4),
+        }
+        self.mimetypes = set(app.config.get('COMPRESS_MIMETYPES', DEFAULT_MIMETYPES))
+        app.after_request(self.compress_response)
+
+    def negotiate(self):
+        """Algorithme accepté par le client, ou None (identité)."""
+        if not self.algorithms:
+            return None
+        return request.accept_encodings.best_match(self.algorithms)
+
+    def compressor(self, algorithm):
+        return CODECS[algorithm](self.levels[algorithm])
+
+    def compress_response(self, response):
+        if response.mimetype not in self.mimetypes or request.method == 'HEAD':
+            return response
+        response.vary.add('Accept-Encoding')
+        if (not 200 <= response.status_code < 300 or response.status_code in (204, 206)
+                or 'Content-Encoding' in response.headers
+                or 'no-transform' in response.headers.get('Cache-Control', '')):
+            return response
+        algorithm = self.negotiate()
+        if algorithm is None:
+            return response
+        if response.is_streamed:
+            original = response.response
+            if hasattr(original, 'close'):
+                # Fermé par werkzeug avec la réponse, même si le client coupe en route
+                response.call_on_close(original.close)
+            response.response = self._stream(response.iter_encoded(), self.compressor(algorithm))
+            response.headers.pop('Content-Length', None)
+        else:
+            body = response.get_data()
+            if len(body) < self.min_size:
+                return response
+            compressor = self.compressor(algorithm)
+            response.set_data(compressor.compress(body) + compressor.flush())
+        response.headers['Content-Encoding'] = algorithm
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    @staticmethod
+    def _stream(chunks, compressor):
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
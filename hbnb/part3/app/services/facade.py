@@ -1,4 +1,4 @@
-from app.extensions import db
+from app.extensions import db, cache, hasher, jwt, replicas
 from app.repositories.user_repository import UserRepository
 from app.repositories.place_repository import PlaceRepository
 from app.repositories.amenity_repository import AmenityRepository
@@ -7,8 +7,32 @@ from app.models.user import User
 from app.models.place import Place, PlaceAmenity
 from app.models.amenity import Amenity
 from app.models.review import Review
-from werkzeug.security import generate_password_hash
+from app.services.query_plans import (apply_plan, load_options, is_row_shape, row_query,
+                                      OwnerRow, PlaceView)
+from app.services.pagination import paginate, clamp_limit, encode_cursor
+from app.services.geo import covering_cells, radius_bboxes, haversine_km
+from app.services import fulltext
+from app.services.place_filters import PlaceFilter, amenity_sets
+from app.persistence.unit_of_work import commit, after_commit
+from app.services.cache import place_key, amenity_key, review_key, user_key
+from sqlalchemy import and_, or_, case, func, update, insert, delete, literal_column, select, union_all
+from datetime import datetime
 
+MAX_SEARCH_RADIUS_KM = 500.0
+EXPORT_BATCH_SIZE = 1000
+# Reviews imbriquées dans le document d'une place (les plus récentes)
+EMBEDDED_REVIEWS = 5
+
+# Ordres des reviews d'une place, du premier au dernier affiché ; servis
+# par ix_reviews_place_id_created_at et ix_reviews_place_id_rating_created_at
+REVIEW_SORTS = {
+    'recent': lambda: [Review.created_at, Review.id],
+    'rating': lambda: [Review.rating, Review.created_at, Review.id],
+}
+
+MODELS = {'user': User, 'amenity': Amenity, 'place': Place, 'review': Review}
+
+@replicas.route_reads
 class HBnBFacade:
     # ---------- USER ----------
     def create_user(self, data):
@@ -21,22 +45,43 @@ class HBnBFacade:
             last_name=data['last_name'],
             email=data['email']
         )
-        if hasattr(user, "set_password"):
-            user.set_password(data['password'])
-        else:
-            user.password_hash = generate_password_hash(data['password'])
+        user.set_password(data['password'])
         db.session.add(user)
-        db.session.commit()
+        commit()
         return user
 
     def get_user(self, user_id):
         return db.session.get(User, user_id)
 
+    def get_user_view(self, user_id, serializer):
+        return self._read_through(user_key(user_id), lambda: self.get_user(user_id), serializer)
+
     def get_user_by_email(self, email):
         return User.query.filter_by(email=email).first()
 
+    def authenticate(self, email, password):
+        """Utilisateur si (email, password) est valide, sinon None.
+
+        Un email inconnu coûte une vérification factice, au même prix qu'un
+        mauvais mot de passe. Un hash aux anciens paramètres est recalculé
+        avec les paramètres courants après un login réussi.
+        """
+        user = self.get_user_by_email(email)
+        if not user:
+            hasher.dummy_verify(password)
+            return None
+        if not user.check_password(password):
+            return None
+        if hasher.needs_rehash(user.password_hash):
+            user.set_password(password)
+            commit()
+        return user
+
     def get_all_users(self):
-        return User.query.all()
+        return apply_plan(User.query, 'user').all()
+
+    def get_users_page(self, limit=None, cursor=None):
+        return paginate(apply_plan(User.query, 'user'), User.page_keys(), limit, cursor)
 
     def update_user(self, user_id, data):
         user = self.get_user(user_id)
@@ -51,27 +96,48 @@ class HBnBFacade:
         if 'last_name' in data:
             user.last_name = data['last_name']
         if 'password' in data:
-            if hasattr(user, "set_password"):
-                user.set_password(data['password'])
-            else:
-                user.password_hash = generate_password_hash(data['password'])
-        db.session.commit()
+            user.set_password(data['password'])
+            # Un changement de mot de passe révoque les tokens déjà émis
+            user.token_version = (user.token_version or 0) + 1
+        # Le propriétaire est imbriqué dans le document de ses places
+        owned = [place_id for place_id, in db.session.query(Place.id).filter_by(owner_id=user.id)]
+        self._touch_places(owned)
+        commit()
+        self._invalidate(user_key(user.id), *[place_key(pid) for pid in owned])
+        after_commit(lambda: jwt.forget_user(user.id))
         return user
 
+    def revoke_tokens(self, user_id):
+        """Invalide tous les tokens émis pour user_id ; False si inconnu."""
+        updated = db.session.execute(
+            update(User).where(User.id == user_id)
+            .values(token_version=User.token_version + 1)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        commit()
+        after_commit(lambda: jwt.forget_user(user_id))
+        return bool(updated)
+
     # ---------- AMENITY ----------
     def create_amenity(self, data):
         if not data.get('name') or len(data['name']) > 50:
             raise ValueError("Amenity name is required and must be <= 50 chars")
         amenity = Amenity(name=data['name'])
         db.session.add(amenity)
-        db.session.commit()
+        commit()
         return amenity
 
     def get_amenity(self, amenity_id):
         return db.session.get(Amenity, amenity_id)
 
+    def get_amenity_view(self, amenity_id, serializer):
+        return self._read_through(amenity_key(amenity_id), lambda: self.get_amenity(amenity_id), serializer)
+
     def get_all_amenities(self):
-        return Amenity.query.all()
+        return apply_plan(Amenity.query, 'amenity').all()
+
+    def get_amenities_page(self, limit=None, cursor=None, shape='amenity'):
+        return paginate(self._shape_query(Amenity, shape), Amenity.page_keys(), limit, cursor)
 
     def update_amenity(self, amenity_id, data):
         amenity = self.get_amenity(amenity_id)
@@ -81,7 +147,11 @@ class HBnBFacade:
             if not data['name'] or len(data['name']) > 50:
                 raise ValueError("Amenity name is required and must be <= 50 chars")
             amenity.name = data['name']
-        db.session.commit()
+        linked = [place_id for place_id, in
+                  db.session.query(PlaceAmenity.place_id).filter_by(amenity_id=amenity.id)]
+        self._touch_places(linked)
+        commit()
+        self._invalidate(amenity_key(amenity.id), *[place_key(pid) for pid in linked])
         return amenity
 
     # ---------- PLACE ----------
@@ -89,12 +159,7 @@ class HBnBFacade:
         owner = db.session.get(User, data['owner_id'])
         if not owner:
             raise ValueError("Owner not found")
-        amenities = []
-        for amenity_id in data.get('amenities', []):
-            amenity = db.session.get(Amenity, amenity_id)
-            if not amenity:
-                raise ValueError(f"Amenity not found: {amenity_id}")
-            amenities.append(amenity)
+        amenity_ids = self._resolve_amenities(data.get('amenities', []))
         place = Place(
             title=data['title'],
             description=data.get('description', ''),
@@ -105,18 +170,226 @@ class HBnBFacade:
         )
         db.session.add(place)
         db.session.flush()  # Pour obtenir l'ID du place
+        self._link_amenities(place.id, amenity_ids)
+        commit()
+        return place
 
-        for amenity in amenities:
-            pa = PlaceAmenity(place_id=place.id, amenity_id=amenity.id)
-            db.session.add(pa)
-        db.session.commit()
+    def get_place(self, place_id, shape=None):
+        if shape is None:
+            return db.session.get(Place, place_id)
+        place = db.session.get(Place, place_id, options=load_options(shape))
+        if place is not None and shape == 'place.document':
+            self._embed_latest_reviews([place])
         return place
 
-    def get_place(self, place_id):
-        return db.session.get(Place, place_id)
+    def get_place_view(self, place_id, serializer):
+        return self._read_through(
+            place_key(place_id), lambda: self.get_place(place_id, shape='place.document'), serializer)
+
+    def get_all_places(self, shape='place.details'):
+        return apply_plan(Place.query, shape).all()
+
+    def get_places_page(self, limit=None, cursor=None, shape='place.details', sort=None,
+                        min_rating=None, q=None, min_price=None, max_price=None, amenity_ids=None,
+                        fields=None, owner_id=None, criteria=None):
+        """Une page de places filtrées.
+
+        sort : 'created_at' (défaut), 'rating', ou 'relevance' (défaut quand q
+        est fourni) ; amenity_ids : places proposant toutes ces amenities ;
+        fields : seuls ces champs (colonnes et relations) sont chargés ;
+        criteria : PlaceFilter (?filter=), combiné aux autres critères ;
+        shape 'place.rows' : PlaceView en lecture seule au lieu d'objets ORM.
+        """
+        criteria = PlaceFilter.combine(criteria, min_price=min_price, max_price=max_price,
+                                       min_rating=min_rating, amenities=amenity_ids, owner_id=owner_id)
+        query = self._shape_query(Place, shape, fields).filter(*criteria.conditions())
+        if criteria.amenities:
+            query = amenity_sets.apply(db.session, query, criteria.amenities)
+            if query is None:
+                return [], None
+        if sort is None:
+            sort = 'relevance' if q else 'created_at'
+        if q:
+            places, next_cursor = self._search_page(query, q, limit, cursor, sort, rows=is_row_shape(shape))
+        elif sort == 'relevance':
+            raise ValueError("sort=relevance requires q")
+        else:
+            places, next_cursor = self._sorted_page(query, limit, cursor, sort)
+        if shape == 'place.rows':
+            places = self._place_views(places, fields)
+        if shape in ('place.document', 'place.rows') and (fields is None or 'reviews' in fields):
+            self._embed_latest_reviews(places)
+        return places, next_cursor
+
+    def _shape_query(self, model, shape, fields=None):
+        # Objets ORM chargés selon le plan de la forme, ou tuples (forme .rows)
+        if is_row_shape(shape):
+            return row_query(db.session, shape, fields)
+        return apply_plan(model.query, shape, fields)
+
+    def _place_views(self, rows, fields=None):
+        """PlaceView des lignes, avec owner et amenities lus en tuples."""
+        views = [PlaceView(row) for row in rows]
+        if fields is None or 'owner' in fields:
+            owners = {}
+            for view, row in zip(views, rows):
+                owner = owners.get(row.owner_id)
+                if owner is None and row.owner_first_name is not None:
+                    owner = owners[row.owner_id] = OwnerRow(
+                        row.owner_id, row.owner_first_name, row.owner_last_name, row.owner_email)
+                view.owner = owner
+        if views and (fields is None or 'amenities' in fields):
+            by_place = {view.id: view for view in views}
+            links = db.session.execute(
+                select(PlaceAmenity.place_id, Amenity.id, Amenity.name)
+                .join(Amenity, Amenity.id == PlaceAmenity.amenity_id)
+                .where(PlaceAmenity.place_id.in_(list(by_place)))
+            )
+            for link in links:
+                by_place[link.place_id].amenity_list.append(link)
+        return views
+
+    def _search_page(self, query, q, limit, cursor, sort, rows=False):
+        if not fulltext.is_supported(db.session.connection()):
+            # Sans FTS5 : tous les mots en sous-chaîne, sans classement
+            for word in fulltext.terms(q):
+                pattern = fulltext.like_pattern(word)
+                query = query.filter(or_(Place.title.ilike(pattern, escape='\\'),
+                                         Place.description.ilike(pattern, escape='\\')))
+            return self._sorted_page(query, limit, cursor, 'created_at' if sort == 'relevance' else sort)
+        matches = fulltext.ranked_matches(q)
+        query = query.join(matches, matches.c.rowid == literal_column('places.rowid'))
+        if sort != 'relevance':
+            return self._sorted_page(query, limit, cursor, sort)
+        if rows:
+            # Tuples : le score n'est qu'une colonne de plus
+            return paginate(query.add_columns(matches.c.score), [matches.c.score, Place.id],
+                            limit, cursor, values=lambda row: [row.score, row.id])
+        found, next_cursor = paginate(query.add_columns(matches.c.score), [matches.c.score, Place.id],
+                                      limit, cursor, values=lambda row: [row.score, row.Place.id])
+        return [row.Place for row in found], next_cursor
+
+    def _sorted_page(self, query, limit, cursor, sort):
+        if sort == 'rating':
+            # Meilleures notes d'abord, via ix_places_rating_avg_id
+            return paginate(query, [Place.rating_avg, Place.id], limit, cursor, descending=True)
+        if sort != 'created_at':
+            raise ValueError(f"Unknown sort: {sort}")
+        return paginate(query, Place.page_keys(), limit, cursor)
+
+    def _embed_latest_reviews(self, places, count=EMBEDDED_REVIEWS):
+        """Dernières reviews de chaque place, en une requête pour toute la liste.
+
+        Renseigne place.latest_reviews (au plus count, les plus récentes
+        d'abord) et place.reviews_cursor, curseur de la page suivante de
+        get_place_reviews_page (sort='recent') ou None s'il n'y en a pas.
+        Une branche LIMIT par place, toutes réunies par UNION ALL : chacune
+        parcourt ix_reviews_place_id_created_at à reculons et s'arrête après
+        count + 1 lignes, quel que soit le nombre de reviews de la place.
+        """
+        for place in places:
+            place.latest_reviews, place.reviews_cursor = [], None
+        keys = REVIEW_SORTS['recent']()
+        order = [col.desc() for col in keys]
+        columns = [Review.id, Review.text, Review.rating, Review.user_id, Review.place_id, Review.created_at]
+        branches = [
+            select(*columns).where(Review.place_id == place.id).order_by(*order).limit(count + 1).subquery()
+            for place in places
+        ]
+        if not branches:
+            return places
+        if len(branches) == 1:
+            union = branches[0]
+        else:
+            union = union_all(*(select(branch) for branch in branches)).subquery()
+        by_place = {place.id: place for place in places}
+        # En tuples : les reviews imbriquées ne sont que lues
+        for row in db.session.execute(select(union)):
+            by_place[row.place_id].latest_reviews.append(row)
+        for place in places:
+            # L'ordre n'est pas garanti après l'union : retri en mémoire
+            place.latest_reviews.sort(key=lambda r: [getattr(r, col.key) for col in keys], reverse=True)
+            if len(place.latest_reviews) > count:
+                del place.latest_reviews[count:]
+                last = place.latest_reviews[-1]
+                place.reviews_cursor = encode_cursor([getattr(last, col.key) for col in keys])
+        return places
+
+    def _resolve_amenities(self, amenity_ids):
+        """Vérifie tous les ids en une requête IN ; les inconnus sont signalés ensemble."""
+        wanted = list(dict.fromkeys(amenity_ids or []))
+        if not wanted:
+            return []
+        found = {amenity_id for amenity_id, in
+                 db.session.query(Amenity.id).filter(Amenity.id.in_(wanted))}
+        unknown = [amenity_id for amenity_id in wanted if amenity_id not in found]
+        if unknown:
+            raise ValueError(f"Amenity not found: {', '.join(unknown)}")
+        return wanted
+
+    def _link_amenities(self, place_id, amenity_ids):
+        if amenity_ids:
+            db.session.execute(
+                insert(PlaceAmenity),
+                [{'place_id': place_id, 'amenity_id': amenity_id} for amenity_id in amenity_ids]
+            )
+
+    def search_places_near(self, latitude, longitude, radius_km, limit=None):
+        """Places à moins de radius_km du point, triées par distance.
+
+        Retourne une liste de (place, distance_km).
+        """
+        if not (-90.0 <= latitude <= 90.0) or not (-180.0 <= longitude <= 180.0):
+            raise ValueError("Invalid coordinates")
+        if radius_km <= 0 or radius_km > MAX_SEARCH_RADIUS_KM:
+            raise ValueError(f"radius_km must be in ]0, {MAX_SEARCH_RADIUS_KM}]")
+        candidates = self._places_in_bboxes(radius_bboxes(latitude, longitude, radius_km))
+        results = []
+        for place in candidates:
+            distance = haversine_km(latitude, longitude, place.latitude, place.longitude)
+            if distance <= radius_km:
+                results.append((place, distance))
+        results.sort(key=lambda r: r[1])
+        return results[:clamp_limit(limit)]
+
+    def search_places_in_bbox(self, min_lat, min_lon, max_lat, max_lon, limit=None):
+        """Places dans la boîte, triées par distance à son centre.
+
+        min_lon > max_lon désigne une boîte qui traverse l'antiméridien.
+        """
+        if not (-90.0 <= min_lat <= max_lat <= 90.0):
+            raise ValueError("Invalid latitude bounds")
+        if not (-180.0 <= min_lon <= 180.0) or not (-180.0 <= max_lon <= 180.0):
+            raise ValueError("Invalid longitude bounds")
+        if min_lon <= max_lon:
+            bboxes = [(min_lat, min_lon, max_lat, max_lon)]
+            center_lon = (min_lon + max_lon) / 2
+        else:
+            bboxes = [(min_lat, min_lon, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lon)]
+            center_lon = (min_lon + max_lon + 360.0) / 2
+            if center_lon > 180.0:
+                center_lon -= 360.0
+        center_lat = (min_lat + max_lat) / 2
+        results = [
+            (place, haversine_km(center_lat, center_lon, place.latitude, place.longitude))
+            for place in self._places_in_bboxes(bboxes)
+        ]
+        results.sort(key=lambda r: r[1])
+        return results[:clamp_limit(limit)]
 
-    def get_all_places(self):
-        return Place.query.all()
+    def _places_in_bboxes(self, bboxes):
+        # Élagage par cellules geohash (intervalles sur l'index), puis filtre
+        # exact sur la boîte ; la distance exacte est calculée par l'appelant.
+        clauses = []
+        for min_lat, min_lon, max_lat, max_lon in bboxes:
+            cells = covering_cells((min_lat, min_lon, max_lat, max_lon))
+            in_cells = or_(*[and_(Place.geohash >= cell, Place.geohash < cell + '{') for cell in cells])
+            clauses.append(and_(
+                in_cells,
+                Place.latitude.between(min_lat, max_lat),
+                Place.longitude.between(min_lon, max_lon)
+            ))
+        return apply_plan(Place.query, 'place.summary').filter(or_(*clauses)).all()
 
     def update_place(self, place_id, data):
         place = self.get_place(place_id)
@@ -132,14 +405,25 @@ class HBnBFacade:
                 raise ValueError("Owner not found")
             place.owner_id = owner.id
         if 'amenities' in data:
-            PlaceAmenity.query.filter_by(place_id=place.id).delete()
-            for amenity_id in data['amenities']:
-                amenity = db.session.get(Amenity, amenity_id)
-                if not amenity:
-                    raise ValueError(f"Amenity not found: {amenity_id}")
-                pa = PlaceAmenity(place_id=place.id, amenity_id=amenity.id)
-                db.session.add(pa)
-        db.session.commit()
+            wanted = set(self._resolve_amenities(data['amenities']))
+            current = {amenity_id for amenity_id, in
+                       db.session.query(PlaceAmenity.amenity_id).filter_by(place_id=place.id)}
+            # Seul le delta est écrit ; rien du tout si l'ensemble est inchangé
+            to_remove = current - wanted
+            missing = wanted - current
+            to_add = [a for a in dict.fromkeys(data['amenities']) if a in missing]
+            if to_remove:
+                db.session.execute(
+                    delete(PlaceAmenity)
+                    .where(PlaceAmenity.place_id == place.id, PlaceAmenity.amenity_id.in_(to_remove))
+                    .execution_options(synchronize_session=False)
+                )
+            self._link_amenities(place.id, to_add)
+            if to_remove or to_add:
+                place.updated_at = datetime.utcnow()
+                db.session.expire(place, ['amenities'])
+        commit()
+        self._invalidate(place_key(place.id))
         return place
 
     # ---------- REVIEW ----------
@@ -152,8 +436,8 @@ class HBnBFacade:
             raise ValueError("User not found")
         if not place:
             raise ValueError("Place not found")
-        rating = data['rating']
-        if not (1 <= int(rating) <= 5):
+        rating = int(data['rating'])
+        if not (1 <= rating <= 5):
             raise ValueError("Rating must be between 1 and 5")
         review = Review(
             text=data['text'],
@@ -162,20 +446,35 @@ class HBnBFacade:
             user=user
         )
         db.session.add(review)
-        db.session.commit()
+        self._apply_rating_delta(place, 1, rating)
+        commit()
+        self._invalidate(place_key(place.id))
         return review
 
     def get_review(self, review_id):
         return db.session.get(Review, review_id)
 
+    def get_review_view(self, review_id, serializer):
+        return self._read_through(review_key(review_id), lambda: self.get_review(review_id), serializer)
+
     def get_all_reviews(self):
-        return Review.query.all()
+        return apply_plan(Review.query, 'review').all()
 
-    def get_reviews_by_place(self, place_id):
-        place = db.session.get(Place, place_id)
-        if not place:
+    def get_reviews_page(self, limit=None, cursor=None, shape='review'):
+        return paginate(self._shape_query(Review, shape), Review.page_keys(), limit, cursor)
+
+    def get_place_reviews_page(self, place_id, limit=None, cursor=None, sort='recent', shape='review'):
+        """Une page des reviews d'une place ; None si la place n'existe pas.
+
+        sort : 'recent' (les plus récentes d'abord, défaut) ou 'rating'
+        (les mieux notées d'abord, puis les plus récentes).
+        """
+        if sort not in REVIEW_SORTS:
+            raise ValueError(f"Unknown sort: {sort}")
+        if self.get_entity_version('place', place_id) is None:
             return None
-        return place.reviews
+        query = self._shape_query(Review, shape).filter(Review.place_id == place_id)
+        return paginate(query, REVIEW_SORTS[sort](), limit, cursor, descending=True)
 
     def update_review(self, review_id, data):
         review = self.get_review(review_id)
@@ -184,17 +483,157 @@ class HBnBFacade:
         if 'text' in data:
             review.text = data['text']
         if 'rating' in data:
-            rating = data['rating']
-            if not (1 <= int(rating) <= 5):
+            rating = int(data['rating'])
+            if not (1 <= rating <= 5):
                 raise ValueError("Rating must be between 1 and 5")
-            review.rating = int(rating)
-        db.session.commit()
+            if rating != review.rating:
+                self._apply_rating_delta(review.place, 0, rating - review.rating)
+            review.rating = rating
+        self._touch_places([review.place_id])
+        commit()
+        self._invalidate(review_key(review.id), place_key(review.place_id))
         return review
 
     def delete_review(self, review_id):
         review = self.get_review(review_id)
         if not review:
             return False
+        self._apply_rating_delta(review.place, -1, -review.rating)
+        keys = (review_key(review.id), place_key(review.place_id))
         db.session.delete(review)
-        db.session.commit()
+        commit()
+        self._invalidate(*keys)
         return True
+
+    # ---------- RATING AGGREGATES ----------
+    def _apply_rating_delta(self, place, count_delta, sum_delta):
+        # UPDATE atomique calculé côté SQL : deux reviews concurrentes ne
+        # peuvent pas écraser le compteur l'une de l'autre. updated_at est
+        # avancé par son onupdate (le document de la place a changé).
+        new_count = Place.review_count + count_delta
+        new_sum = Place.rating_sum + sum_delta
+        db.session.execute(
+            update(Place)
+            .where(Place.id == place.id)
+            .values(
+                review_count=new_count,
+                rating_sum=new_sum,
+                rating_avg=case((new_count > 0, new_sum * 1.0 / new_count), else_=0.0)
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.session.expire(place, ['review_count', 'rating_sum', 'rating_avg', 'updated_at'])
+
+    def _actual_rating_aggregates(self):
+        return (
+            db.session.query(
+                Review.place_id.label('place_id'),
+                func.count(Review.id).label('review_count'),
+                func.sum(Review.rating).label('rating_sum')
+            )
+            .group_by(Review.place_id)
+            .subquery()
+        )
+
+    def rebuild_rating_aggregates(self):
+        """Recalcule review_count / rating_sum / rating_avg de toutes les places."""
+        actual = self._actual_rating_aggregates()
+        count = func.coalesce(
+            db.session.query(actual.c.review_count).filter(actual.c.place_id == Place.id).scalar_subquery(), 0)
+        total = func.coalesce(
+            db.session.query(actual.c.rating_sum).filter(actual.c.place_id == Place.id).scalar_subquery(), 0)
+        result = db.session.execute(
+            update(Place)
+            .values(
+                review_count=count,
+                rating_sum=total,
+                rating_avg=case((count > 0, total * 1.0 / count), else_=0.0)
+            )
+            .execution_options(synchronize_session=False)
+        )
+        commit()
+        # Toutes les places peuvent avoir changé
+        cache.clear()
+        return result.rowcount
+
+    def check_rating_aggregates(self):
+        """Liste les places dont les agrégats stockés ne correspondent pas aux reviews."""
+        actual = self._actual_rating_aggregates()
+        actual_count = func.coalesce(actual.c.review_count, 0)
+        actual_sum = func.coalesce(actual.c.rating_sum, 0)
+        rows = (
+            db.session.query(Place.id, Place.review_count, Place.rating_sum, Place.rating_avg,
+                             actual_count, actual_sum)
+            .outerjoin(actual, actual.c.place_id == Place.id)
+            .filter(or_(
+                Place.review_count != actual_count,
+                Place.rating_sum != actual_sum,
+                func.abs(Place.rating_avg - case(
+                    (actual_count > 0, actual_sum * 1.0 / actual_count), else_=0.0)) > 1e-9
+            ))
+            .all()
+        )
+        return [
+            {
+                'place_id': place_id,
+                'stored': {'review_count': count, 'rating_sum': total, 'rating_avg': avg},
+                'actual': {'review_count': real_count, 'rating_sum': real_sum}
+            }
+            for place_id, count, total, avg, real_count, real_sum in rows
+        ]
+
+    # ---------- EXPORT ----------
+    def iter_all(self, kind, shape=None, batch_size=EXPORT_BATCH_SIZE):
+        """Parcourt toute une collection par lots de batch_size lignes.
+
+        yield_per lit le curseur au fur et à mesure (les relations du plan
+        sont chargées par lot en selectin) ; la carte d'identité de la session
+        ne garde que des références faibles, donc les lignes déjà émises
+        peuvent être libérées : la mémoire ne dépend pas de la taille de la table.
+        """
+        model = MODELS[kind]
+        query = apply_plan(model.query, shape or kind).order_by(*model.page_keys())
+        for obj in query.yield_per(batch_size):
+            yield obj
+
+    # ---------- VERSIONS (requêtes conditionnelles) ----------
+    def _touch_places(self, place_ids):
+        # Le document d'une place imbrique owner, amenities et reviews :
+        # toute modification de ceux-ci avance son updated_at.
+        if place_ids:
+            db.session.execute(
+                update(Place)
+                .where(Place.id.in_(place_ids))
+                .values(updated_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+
+    def get_entity_version(self, kind, obj_id):
+        """updated_at d'une entité (None si elle n'existe pas), sans la charger."""
+        model = MODELS[kind]
+        return db.session.query(model.updated_at).filter(model.id == obj_id).scalar()
+
+    def get_collection_version(self, kind, **filters):
+        """(max(updated_at), count) d'une collection : une seule requête agrégée."""
+        model = MODELS[kind]
+        query = db.session.query(func.max(model.updated_at), func.count(model.id))
+        if filters:
+            query = query.filter_by(**filters)
+        return query.one()
+
+    # ---------- CACHE ----------
+    def _read_through(self, key, loader, serializer):
+        """Sortie sérialisée d'une entité, servie depuis le cache si possible."""
+        def load():
+            # Rempli depuis la principale : un réplica en retard remettrait
+            # en cache l'état d'avant une invalidation
+            with replicas.routing(read=False):
+                obj = loader()
+            return serializer(obj) if obj is not None else None
+        return cache.get_or_set(key, load)
+
+    def _invalidate(self, *keys):
+        # Exécuté après le commit (en fin d'unité de travail le cas échéant),
+        # pour qu'une lecture concurrente ne remette pas en cache l'état
+        # d'avant la mutation entre invalidation et commit.
+        after_commit(lambda: cache.delete(*keys))
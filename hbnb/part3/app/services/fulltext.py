@@ -0,0 +1,122 @@
+import re
+import weakref
+from sqlalchemy import Column, Float, Integer, MetaData, Table, Text, literal_column, select, text
+from sqlalchemy.exc import OperationalError
+
+# Index plein texte des places (SQLite FTS5).
+#
+# Table FTS5 "à contenu externe" : elle ne stocke que l'index inversé et
+# relit title / description dans places via le rowid. Trois triggers la
+# tiennent à jour pour toute écriture sur places, ORM ou insert en lot.
+
+FTS_TABLE = 'places_fts'
+
+# Poids BM25 des colonnes : un terme dans le titre compte 10 fois plus
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+MAX_TERMS = 8
+
+# Table hors de db.metadata : create_all ne doit pas la créer comme une table normale
+places_fts = Table(
+    FTS_TABLE, MetaData(),
+    Column('rowid', Integer, primary_key=True),
+    Column('title', Text),
+    Column('description', Text),
+)
+
+DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description, content='places', content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3')""",
+    f"""CREATE TRIGGER IF NOT EXISTS places_fts_insert AFTER INSERT ON places BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.rowid, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS places_fts_delete AFTER DELETE ON places BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.rowid, old.title, old.description);
+    END""",
+    # Seules les modifications du texte touchent l'index (pas les agrégats de notes)
+    f"""CREATE TRIGGER IF NOT EXISTS places_fts_update AFTER UPDATE OF title, description ON places BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.rowid, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.rowid, new.title, new.description);
+    END""",
+]
+
+
+# Résultat de la sonde FTS5, par engine
+_support = weakref.WeakKeyDictionary()
+
+
+def is_supported(conn):
+    """SQLite compilé (ou étendu) avec FTS5 ; sondé une fois par engine."""
+    if conn.dialect.name != 'sqlite':
+        return False
+    supported = _support.get(conn.engine)
+    if supported is None:
+        supported = _support[conn.engine] = _probe(conn)
+    return supported
+
+
+def _probe(conn):
+    # Une table FTS5 temporaire : détecte aussi un FTS5 chargé en extension,
+    # que pragma_compile_options ne liste pas
+    try:
+        conn.exec_driver_sql('CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)')
+    except OperationalError:
+        return False
+    conn.exec_driver_sql('DROP TABLE temp.fts5_probe')
+    return True
+
+
+def install(conn, rebuild=False):
+    """Crée la table FTS5 et ses triggers ; rebuild réindexe les places existantes."""
+    if not is_supported(conn):
+        return
+    for statement in DDL:
+        conn.execute(text(statement))
+    if rebuild:
+        conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def uninstall(conn):
+    if is_supported(conn):
+        conn.execute(text(f'DROP TABLE IF EXISTS {FTS_TABLE}'))
+
+
+def terms(q):
+    """Mots de la recherche (au plus MAX_TERMS), sans la syntaxe FTS5."""
+    words = re.findall(r'\w+', q or '')
+    if not words:
+        raise ValueError("q must contain at least one word")
+    return words[:MAX_TERMS]
+
+
+def like_pattern(word):
+    """Motif LIKE « contient word » ; _ (gardé par \\w) et % y sont littéraux.
+    À utiliser avec escape='\\'."""
+    escaped = word.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+def match_expression(q):
+    # Chaque mot entre guillemets (pas d'opérateurs venant du client),
+    # en préfixe : "pari" trouve "Paris", "parisien"...
+    return ' '.join(f'"{word}"*' for word in terms(q))
+
+
+def ranked_matches(q):
+    """Sous-requête (rowid, score) des places correspondant à q.
+
+    score est le BM25 de FTS5 : plus il est petit, plus la place est pertinente.
+    """
+    score = literal_column(
+        f'bm25({FTS_TABLE}, {TITLE_WEIGHT}, {DESCRIPTION_WEIGHT})', Float).label('score')
+    return (
+        select(places_fts.c.rowid, score)
+        .where(literal_column(FTS_TABLE).op('MATCH')(match_expression(q)))
+        .subquery('matches')
+    )
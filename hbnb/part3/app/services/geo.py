@@ -0,0 +1,106 @@
+import math
+
+# Geohash : chaque caractère raffine la cellule précédente, donc toutes les
+# places d'une cellule partagent le même préfixe et forment un intervalle
+# contigu dans un index B-tree sur la colonne geohash.
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+PRECISION = 12
+MAX_CELLS = 32
+EARTH_RADIUS_KM = 6371.0088
+# Marge relative des boîtes englobantes : absorbe les erreurs d'arrondi, un
+# point au bord exact du cercle reste dans la boîte
+BBOX_PADDING = 1e-9
+
+
+def encode_geohash(latitude, longitude, precision=PRECISION):
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        rng, value = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits = bits << 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """Hauteur et largeur (en degrés) d'une cellule geohash."""
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def _cells_at(bbox, precision):
+    min_lat, min_lon, max_lat, max_lon = bbox
+    cell_lat, cell_lon = cell_size(precision)
+    lat_start = math.floor((min_lat + 90.0) / cell_lat)
+    lat_end = math.floor((min(max_lat, 90.0 - 1e-9) + 90.0) / cell_lat)
+    lon_start = math.floor((min_lon + 180.0) / cell_lon)
+    lon_end = math.floor((min(max_lon, 180.0 - 1e-9) + 180.0) / cell_lon)
+    return lat_start, lat_end, lon_start, lon_end, cell_lat, cell_lon
+
+
+def covering_cells(bbox, max_cells=MAX_CELLS):
+    """Préfixes geohash couvrant bbox, à la précision la plus fine possible
+    sans dépasser max_cells cellules."""
+    for precision in range(PRECISION, 0, -1):
+        lat_start, lat_end, lon_start, lon_end, cell_lat, cell_lon = _cells_at(bbox, precision)
+        count = (lat_end - lat_start + 1) * (lon_end - lon_start + 1)
+        if count > max_cells:
+            continue
+        cells = set()
+        for i in range(lat_start, lat_end + 1):
+            for j in range(lon_start, lon_end + 1):
+                lat = -90.0 + (i + 0.5) * cell_lat
+                lon = -180.0 + (j + 0.5) * cell_lon
+                cells.add(encode_geohash(lat, lon, precision))
+        return sorted(cells)
+    # Zone trop grande même à la précision 1 : toutes les cellules
+    return list(BASE32)
+
+
+def radius_bboxes(latitude, longitude, radius_km):
+    """Boîte(s) englobant le cercle, découpée(s) sur l'antiméridien.
+
+    Mêmes sphère et rayon terrestre que haversine_km : la demi-largeur en
+    longitude est celle des points de tangence du cercle avec les méridiens
+    (plus au nord ou au sud que le centre), pas celle de sa latitude.
+    """
+    angle = radius_km / EARTH_RADIUS_KM * (1 + BBOX_PADDING)
+    dlat = math.degrees(angle)
+    min_lat = max(latitude - dlat, -90.0)
+    max_lat = min(latitude + dlat, 90.0)
+    if min_lat <= -90.0 or max_lat >= 90.0 or angle >= math.pi / 2:
+        # Le cercle contient un pôle : toutes les longitudes
+        return [(min_lat, -180.0, max_lat, 180.0)]
+    dlon = math.degrees(math.asin(min(1.0, math.sin(angle) / math.cos(math.radians(latitude)))))
+    min_lon = longitude - dlon
+    max_lon = longitude + dlon
+    if min_lon < -180.0:
+        return [(min_lat, min_lon + 360.0, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lon)]
+    if max_lon > 180.0:
+        return [(min_lat, min_lon, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lon - 360.0)]
+    return [(min_lat, min_lon, max_lat, max_lon)]
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
@@ -0,0 +1,76 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import DateTime, Float, Integer, and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def clamp_limit(limit):
+    """Taille de page demandée, bornée par MAX_PAGE_SIZE."""
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    limit = int(limit)
+    if limit < 1:
+        raise ValueError("limit must be >= 1")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def encode_cursor(values):
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, keys):
+    # Le curseur est opaque pour le client : base64(json([valeurs des clés]))
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError
+        return [_load_value(col, v) for col, v in zip(keys, values)]
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def _load_value(col, value):
+    if isinstance(col.type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(col.type, (Float, Integer)):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError
+        return value
+    if not isinstance(value, str):
+        raise ValueError
+    return value
+
+
+def after(keys, values, descending=False):
+    """Condition "ligne strictement après values" dans l'ordre lexicographique des clés."""
+    clauses = []
+    for i, col in enumerate(keys):
+        equal = [keys[j] == values[j] for j in range(i)]
+        clauses.append(and_(*equal, col < values[i] if descending else col > values[i]))
+    return or_(*clauses)
+
+
+def paginate(query, keys, limit=None, cursor=None, descending=False, values=None):
+    """Pagination par curseur (keyset) sur les colonnes keys.
+
+    Retourne (items, next_cursor) ; next_cursor vaut None sur la dernière page.
+    Le coût d'une page ne dépend pas de sa position dans la table,
+    contrairement à OFFSET.
+    """
+    limit = clamp_limit(limit)
+    if cursor:
+        query = query.filter(after(keys, decode_cursor(cursor, keys), descending))
+    order = [col.desc() for col in keys] if descending else keys
+    rows = query.order_by(*order).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    if values is None:
+        return rows, encode_cursor([getattr(last, col.key) for col in keys])
+    return rows, encode_cursor(values(last))
@@ -0,0 +1,125 @@
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+
+
+class HashingBusy(Exception):
+    """Trop de hachages en attente : la requête doit être rejetée (503)."""
+
+
+class PasswordHasher:
+    """Hachage / vérification des mots de passe hors du thread de requête.
+
+    Config :
+      PASSWORD_HASH_METHOD          méthode werkzeug et ses coûts (ex. 'scrypt:32768:8:1')
+      PASSWORD_HASH_WORKERS         taille du pool de process (0 = dans le thread appelant)
+      PASSWORD_HASH_MAX_CONCURRENCY hachages simultanés au maximum
+      PASSWORD_HASH_QUEUE_TIMEOUT   attente max (s) d'une place avant HashingBusy
+    """
+
+    def __init__(self):
+        self.method = DEFAULT_METHOD
+        self.workers = 0
+        self.queue_timeout = 5.0
+        self.max_concurrency = 4
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._pool = None
+        self._dummy_hash = None
+        self._lock = threading.Lock()
+        self._stats = {}
+        self.reset_stats()
+
+    def init_app(self, app):
+        self.method = app.config.get('PASSWORD_HASH_METHOD', DEFAULT_METHOD)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', 0)
+        self.queue_timeout = app.config.get('PASSWORD_HASH_QUEUE_TIMEOUT', 5.0)
+        self.max_concurrency = app.config.get('PASSWORD_HASH_MAX_CONCURRENCY', max(self.workers, 1) * 2)
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self.shutdown()
+        # Calculé au démarrage, pas par la première requête qui en a besoin
+        self._dummy_hash = generate_password_hash('dummy-password', self.method)
+        self.reset_stats()
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {'in_flight': 0, 'waiting': 0, 'completed': 0, 'rejected': 0,
+                           'total_wait_ms': 0.0, 'max_wait_ms': 0.0}
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['max_concurrency'] = self.max_concurrency
+        stats['workers'] = self.workers
+        return stats
+
+    def _run(self, fn, *args):
+        with self._lock:
+            self._stats['waiting'] += 1
+        start = time.perf_counter()
+        acquired = self._slots.acquire(timeout=self.queue_timeout)
+        wait_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._stats['waiting'] -= 1
+            if not acquired:
+                self._stats['rejected'] += 1
+            else:
+                self._stats['in_flight'] += 1
+                self._stats['total_wait_ms'] += wait_ms
+                self._stats['max_wait_ms'] = max(self._stats['max_wait_ms'], wait_ms)
+        if not acquired:
+            raise HashingBusy("Too many concurrent password operations")
+        try:
+            if self.workers:
+                return self._executor().submit(fn, *args).result()
+            return fn(*args)
+        finally:
+            self._slots.release()
+            with self._lock:
+                self._stats['in_flight'] -= 1
+                self._stats['completed'] += 1
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        if not password_hash:
+            self.dummy_verify(password)
+            return False
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        # Préfixe werkzeug "méthode:paramètres$sel$hash", comparé à celui que
+        # werkzeug écrit pour self.method : une méthode abrégée ('scrypt',
+        # 'pbkdf2:sha256') y est développée avec ses paramètres par défaut
+        return _prefix(password_hash) != _prefix(self._reference_hash())
+
+    def _reference_hash(self):
+        # Hash de self.method, calculé une fois (sert aussi à dummy_verify) ;
+        # hors init_app, via le pool comme tout hachage
+        if self._dummy_hash is None:
+            self._dummy_hash = self._run(generate_password_hash, 'dummy-password', self.method)
+        return self._dummy_hash
+
+    def dummy_verify(self, password):
+        """Vérification factice au coût réel, pour un email inconnu : le temps
+        de réponse ne révèle pas l'existence du compte."""
+        self._run(check_password_hash, self._reference_hash(), password)
+        return False
+
+
+def _prefix(password_hash):
+    return password_hash.split('$', 1)[0]
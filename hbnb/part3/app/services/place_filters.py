@@ -0,0 +1,309 @@
+import operator
+import re
+import threading
+import time
+from itertools import islice
+import uuid
+from sqlalchemy import Column, Integer, MetaData, String, Table, event, func, select, text
+from sqlalchemy.exc import OperationalError
+from app.models.amenity import Amenity
+from app.models.place import Place, PlaceAmenity
+
+# Filtre composite des places : ?filter=price<120;amenities=Wifi,Pool;rating>=4;owner=<id>
+#
+# Clauses séparées par des « ; » :
+#   price  <, <=, >, >=, =  nombre
+#   rating <, <=, >, >=, =  note moyenne
+#   amenities = a,b,...     ids ou noms (sans casse) ; toutes requises
+#   owner = <user id>
+#
+# Le tout est compilé en une seule requête SQL : comparaisons sur des
+# colonnes indexées (ix_places_price_id, ix_places_rating_avg_id,
+# ix_places_owner_id) et, pour les amenities, l'intersection des ensembles
+# précalculés de AmenityPlaceSets au lieu d'un semi-join par amenity.
+#
+# Fraîcheur des ensembles : des triggers SQLite incrémentent un compteur
+# (table place_amenity_version) à chaque écriture sur place_amenity ou sur
+# les noms d'amenities, quel qu'en soit l'auteur (autre process, insert en
+# lot, SQL brut). Chaque requête relit ce compteur ; des ensembles d'une
+# autre version ne sont pas utilisés. Hors SQLite, pas de compteur : les
+# amenities sont toujours vérifiées en SQL.
+
+COLUMNS = {'price': Place.price, 'rating': Place.rating_avg}
+
+OPERATORS = {'<=': operator.le, '>=': operator.ge, '<': operator.lt, '>': operator.gt, '=': operator.eq}
+
+_CLAUSE = re.compile(r'^\s*(\w+)\s*(<=|>=|<|>|=)\s*(.*?)\s*$')
+
+INTERSECTION_CHUNK = 4096
+
+VERSION_TABLE = 'place_amenity_version'
+
+# Table hors de db.metadata, comme places_fts : créée avec place_amenity
+# (voir les listeners plus bas) ou par la migration 0011. Une seule ligne ;
+# token distingue deux bases recréées au même numéro de version.
+link_version = Table(
+    VERSION_TABLE, MetaData(),
+    Column('id', Integer, primary_key=True),
+    Column('token', String(36), nullable=False),
+    Column('version', Integer, nullable=False),
+)
+
+_BUMP = f'UPDATE {VERSION_TABLE} SET version = version + 1 WHERE id = 1'
+
+TRIGGERS = {
+    'place_amenity_version_insert': 'AFTER INSERT ON place_amenity',
+    'place_amenity_version_delete': 'AFTER DELETE ON place_amenity',
+    'place_amenity_version_update': 'AFTER UPDATE ON place_amenity',
+    'amenity_name_version_insert': 'AFTER INSERT ON amenities',
+    'amenity_name_version_delete': 'AFTER DELETE ON amenities',
+    'amenity_name_version_update': 'AFTER UPDATE OF name ON amenities',
+}
+
+
+def install(conn):
+    """Crée le compteur de version et ses triggers (SQLite seulement)."""
+    if conn.dialect.name != 'sqlite':
+        return
+    link_version.create(conn, checkfirst=True)
+    conn.execute(text(f'INSERT OR IGNORE INTO {VERSION_TABLE} (id, token, version) VALUES (1, :token, 0)'),
+                 {'token': str(uuid.uuid4())})
+    for name, timing in TRIGGERS.items():
+        conn.execute(text(f'CREATE TRIGGER IF NOT EXISTS {name} {timing} BEGIN {_BUMP}; END'))
+
+
+def uninstall(conn):
+    if conn.dialect.name != 'sqlite':
+        return
+    for name in TRIGGERS:
+        conn.execute(text(f'DROP TRIGGER IF EXISTS {name}'))
+    link_version.drop(conn, checkfirst=True)
+
+
+def read_version(session):
+    """(token, version) des liens place-amenity vus par la session ; None
+    hors SQLite ou sur une base sans compteur."""
+    if session.get_bind().dialect.name != 'sqlite':
+        return None
+    try:
+        row = session.execute(select(link_version.c.token, link_version.c.version)).first()
+    except OperationalError:
+        return None
+    return tuple(row) if row is not None else None
+
+
+class PlaceFilter:
+    """Critères de recherche de places (tous combinés en ET)."""
+
+    def __init__(self):
+        self.comparisons = []  # (champ, opérateur, valeur)
+        self.amenities = []    # ids ou noms d'amenities, toutes requises
+        self.owner_id = None
+
+    @classmethod
+    def parse(cls, expression):
+        """PlaceFilter d'une expression ?filter= ; ValueError si elle est invalide."""
+        criteria = cls()
+        for clause in (c for c in (expression or '').split(';') if c.strip()):
+            match = _CLAUSE.match(clause)
+            if not match:
+                raise ValueError(f"Invalid filter clause: {clause.strip()!r}")
+            name, op, value = match.groups()
+            if name in COLUMNS:
+                try:
+                    number = float(value)
+                except ValueError:
+                    raise ValueError(f"{name} expects a number: {clause.strip()!r}") from None
+                criteria.compare(name, op, number)
+            elif name == 'amenities' and op == '=':
+                criteria.require_amenities(value.split(','))
+            elif name == 'owner' and op == '=' and value:
+                criteria.set_owner(value)
+            else:
+                raise ValueError(f"Unsupported filter clause: {clause.strip()!r}")
+        return criteria
+
+    @classmethod
+    def combine(cls, base=None, min_price=None, max_price=None, min_rating=None,
+                amenities=None, owner_id=None):
+        """Copie de base (ou filtre vide) complétée par les paramètres simples."""
+        criteria = cls()
+        if base is not None:
+            criteria.comparisons = list(base.comparisons)
+            criteria.amenities = list(base.amenities)
+            criteria.owner_id = base.owner_id
+        if min_price is not None:
+            criteria.compare('price', '>=', min_price)
+        if max_price is not None:
+            criteria.compare('price', '<=', max_price)
+        if min_rating is not None:
+            criteria.compare('rating', '>=', min_rating)
+        criteria.require_amenities(amenities or [])
+        if owner_id is not None:
+            criteria.set_owner(owner_id)
+        return criteria
+
+    def compare(self, name, op, value):
+        self.comparisons.append((name, op, value))
+
+    def require_amenities(self, refs):
+        for ref in refs:
+            ref = ref.strip()
+            if ref and ref not in self.amenities:
+                self.amenities.append(ref)
+
+    def set_owner(self, owner_id):
+        if self.owner_id not in (None, owner_id):
+            raise ValueError("Only one owner can be given")
+        self.owner_id = owner_id
+
+    def conditions(self):
+        """Conditions SQL sur les colonnes de places (hors amenities)."""
+        conditions = [OPERATORS[op](COLUMNS[name], value) for name, op, value in self.comparisons]
+        if self.owner_id is not None:
+            conditions.append(Place.owner_id == self.owner_id)
+        return conditions
+
+
+class AmenityPlaceSets:
+    """Ensembles précalculés amenity -> ids des places qui la proposent.
+
+    L'intersection pour N amenities se fait en mémoire, en partant du plus
+    petit ensemble ; la requête SQL ne reçoit plus que le résultat. Les
+    ensembles ne servent que si leur version est celle que la base annonce
+    à la requête en cours ; sinon la requête se rabat sur un sous-comptage
+    SQL, et les ensembles sont rechargés (hors verrou, au plus une fois par
+    `reload_interval` secondes) puis substitués aux anciens.
+    """
+
+    def __init__(self, reload_interval=30, max_in_ids=1000, clock=time.monotonic):
+        self.reload_interval = reload_interval
+        self.max_in_ids = max_in_ids
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = None       # (version, ids par nom, places par amenity)
+        self._loading = False
+        self._loaded_at = None
+
+    def init_app(self, app):
+        self.reload_interval = app.config.get('PLACE_FILTER_RELOAD_INTERVAL', 30)
+        self.max_in_ids = app.config.get('PLACE_FILTER_MAX_IN_IDS', 1000)
+        with self._lock:
+            self._state = None
+            self._loaded_at = None
+
+    def refresh(self, session):
+        """Recharge les ensembles depuis la session ; None si leur version
+        ne peut pas être lue (base sans compteur)."""
+        # Version lue avant les liens : au pire, des ensembles plus récents
+        # que leur version, écartés à la requête suivante
+        version = read_version(session)
+        if version is None:
+            return None
+        ids_by_name = {}
+        for amenity_id, name in session.execute(select(Amenity.id, Amenity.name)):
+            ids_by_name[name.lower()] = amenity_id
+        places = {}
+        for amenity_id, place_id in session.execute(select(PlaceAmenity.amenity_id, PlaceAmenity.place_id)):
+            places.setdefault(amenity_id, set()).add(place_id)
+        state = (version, ids_by_name, places)
+        with self._lock:
+            self._state = state
+            self._loaded_at = self._clock()
+        return state
+
+    def current(self, session):
+        """Ensembles à jour pour la session, ou None si ce n'est pas prouvé."""
+        version = read_version(session)
+        if version is None:
+            return None
+        with self._lock:
+            state = self._state
+            if state is not None and state[0] == version:
+                return state
+            due = self._loaded_at is None or self._clock() - self._loaded_at >= self.reload_interval
+            if self._loading or not due:
+                return None
+            self._loading = True
+        # Rechargement hors verrou : les autres requêtes passent par le SQL
+        try:
+            state = self.refresh(session)
+        finally:
+            with self._lock:
+                self._loading = False
+        return state if state is not None and state[0] == version else None
+
+    @staticmethod
+    def resolve(ids_by_name, known_ids, refs):
+        """Ids des amenities désignées par id ou par nom ; une référence inconnue est gardée telle quelle."""
+        return list(dict.fromkeys(
+            ref if ref in known_ids else ids_by_name.get(ref.lower(), ref) for ref in refs))
+
+    @staticmethod
+    def places_with_all(places, amenity_ids, limit=None):
+        """Ids des places proposant toutes ces amenities (nouvel ensemble).
+
+        limit : on s'arrête dès que l'intersection dépasse limit éléments
+        (il suffit alors de savoir qu'elle est grande).
+        """
+        sets = sorted((places.get(amenity_id, set()) for amenity_id in amenity_ids), key=len)
+        if not sets:
+            return set()
+        smallest, rest = sets[0], sets[1:]
+        if limit is None:
+            return smallest.intersection(*rest)
+        # Par tranches du plus petit ensemble, intersectées en C
+        found, items = set(), iter(smallest)
+        while len(found) <= limit:
+            chunk = set(islice(items, INTERSECTION_CHUNK))
+            if not chunk:
+                break
+            found |= chunk.intersection(*rest)
+        return found
+
+    def apply(self, session, query, refs):
+        """query restreinte aux places proposant toutes ces amenities ; None si aucune."""
+        state = self.current(session)
+        if state is None:
+            # Ensembles périmés ou absents : tout se vérifie en SQL
+            ids_by_name = {name.lower(): amenity_id
+                           for amenity_id, name in session.execute(select(Amenity.id, Amenity.name))}
+            amenity_ids = self.resolve(ids_by_name, set(ids_by_name.values()), refs)
+            return query.filter(_linked_to_all(amenity_ids))
+        _, ids_by_name, places = state
+        amenity_ids = self.resolve(ids_by_name, places, refs)
+        matching = self.places_with_all(places, amenity_ids, limit=self.max_in_ids)
+        if not matching:
+            return None
+        if len(matching) <= self.max_in_ids:
+            # Sélectif : recherches par clé primaire
+            return query.filter(Place.id.in_(sorted(matching)))
+        # Dense : les places sont parcourues dans l'ordre de la page et
+        # chacune est vérifiée par la sous-requête ; le parcours s'arrête dès
+        # la page remplie
+        return query.filter(_linked_to_all(amenity_ids))
+
+
+def _linked_to_all(amenity_ids):
+    # Sous-requête sur la clé primaire de place_amenity, corrélée à la place
+    linked = (
+        select(func.count())
+        .where(PlaceAmenity.place_id == Place.id, PlaceAmenity.amenity_id.in_(amenity_ids))
+        .correlate(Place)
+        .scalar_subquery()
+    )
+    return linked == len(amenity_ids)
+
+
+amenity_sets = AmenityPlaceSets()
+
+
+# Compteur créé / supprimé avec la table place_amenity
+@event.listens_for(PlaceAmenity.__table__, 'after_create')
+def create_link_version(table, connection, **kw):
+    install(connection)
+
+
+@event.listens_for(PlaceAmenity.__table__, 'before_drop')
+def drop_link_version(table, connection, **kw):
+    uninstall(connection)
@@ -0,0 +1,149 @@
+from collections import namedtuple
+from sqlalchemy.orm import joinedload, load_only, selectinload
+from app.models.amenity import Amenity
+from app.models.place import Place, PlaceAmenity
+from app.models.review import Review
+from app.models.user import User
+
+# Plans de chargement des relations, un par "forme" de sérialisation.
+# Chaque plan liste les options SQLAlchemy nécessaires pour que le
+# serializer correspondant ne déclenche aucun lazy load : une liste
+# complète coûte alors un nombre fixe de requêtes, quel que soit N.
+#
+#   place.summary : place_to_dict(place, details=False) -> 1 requête
+#   place.details  : place_to_dict(place)               -> 3 requêtes
+#                    (places + owner, liens amenities + amenity, reviews)
+#   place.document : place_to_dict(place), seules les dernières reviews
+#                    imbriquées (HBnBFacade._embed_latest_reviews) -> 3 requêtes
+#                    (places + owner, liens amenities + amenity, dernières reviews)
+#   place.rows     : même document, lu en tuples (voir ROW_PLANS)   -> 3 requêtes
+PLANS = {
+    'place.summary': lambda: [],
+    'place.details': lambda: [
+        joinedload(Place.owner),
+        selectinload(Place.amenities).joinedload(PlaceAmenity.amenity),
+        selectinload(Place.reviews),
+    ],
+    'place.document': lambda: [
+        joinedload(Place.owner),
+        selectinload(Place.amenities).joinedload(PlaceAmenity.amenity),
+    ],
+    'amenity': lambda: [],
+    'review': lambda: [],
+    'user': lambda: [],
+}
+
+
+# Champs simples d'une place, chargés tels quels depuis leur colonne
+PLACE_COLUMNS = ('id', 'title', 'description', 'price', 'latitude', 'longitude',
+                 'owner_id', 'review_count', 'rating_avg')
+
+
+def place_fieldset_options(fields):
+    """Plan réduit aux champs demandés (sparse fieldset).
+
+    Seules les colonnes demandées sont lues (plus les clés de pagination) et
+    seules les relations demandées sont chargées, elles-mêmes réduites aux
+    colonnes que place_to_dict imbrique. Les reviews ne sont pas chargées
+    ici : seules les dernières sont imbriquées, par le facade.
+    """
+    columns = [getattr(Place, name) for name in PLACE_COLUMNS if name in fields]
+    options = [load_only(*columns, Place.created_at, Place.rating_avg)]
+    if 'owner' in fields:
+        options.append(joinedload(Place.owner).load_only(User.first_name, User.last_name, User.email))
+    if 'amenities' in fields:
+        options.append(selectinload(Place.amenities).joinedload(PlaceAmenity.amenity).load_only(Amenity.name))
+    return options
+
+
+# Plans par type d'entité quand un sous-ensemble de champs est demandé
+FIELDSET_PLANS = {
+    'place': place_fieldset_options,
+}
+
+
+# Formes en lecture seule (suffixe .rows) : seules les colonnes servies
+# sont lues, en tuples (Row) ; aucun objet ORM n'est construit, donc ni
+# carte d'identité, ni état des relations, ni suivi des modifications.
+# Les clés de pagination (created_at, id, tris) en font toujours partie.
+ROW_PLANS = {
+    'amenity.rows': lambda: [Amenity.id, Amenity.name, Amenity.created_at],
+    'review.rows': lambda: [Review.id, Review.text, Review.rating, Review.user_id, Review.place_id,
+                            Review.created_at],
+    'place.rows': lambda: [*(getattr(Place, name) for name in PLACE_COLUMNS), Place.created_at],
+}
+
+# Colonnes d'une place lues même hors du fieldset (pagination, jointure de l'owner)
+PLACE_ROW_KEYS = ('id', 'owner_id', 'created_at', 'rating_avg')
+
+
+def owner_row_columns():
+    # Owner joint aux lignes de places (forme place.rows)
+    return [
+        User.first_name.label('owner_first_name'),
+        User.last_name.label('owner_last_name'),
+        User.email.label('owner_email'),
+    ]
+
+
+class OwnerRow(namedtuple('OwnerRow', 'id first_name last_name email')):
+    """Owner d'une place lue en tuples."""
+    __slots__ = ()
+
+
+class PlaceView:
+    """Place lue en tuples (forme place.rows), avec ses relations.
+
+    Les colonnes sont celles de la ligne ; owner, amenity_list et
+    latest_reviews sont renseignés par le facade, avec des tuples eux aussi.
+    Expose les mêmes attributs que Place pour le serializer.
+    """
+    __slots__ = ('_row', 'owner', 'amenity_list', 'latest_reviews', 'reviews_cursor')
+
+    def __init__(self, row, owner=None):
+        self._row = row
+        self.owner = owner
+        self.amenity_list = []
+        self.latest_reviews = []
+        self.reviews_cursor = None
+
+    def __getattr__(self, name):
+        # Appelé seulement pour les attributs hors __slots__ : les colonnes
+        return getattr(self._row, name)
+
+    @property
+    def embedded_reviews(self):
+        return self.latest_reviews
+
+
+def is_row_shape(shape):
+    return shape in ROW_PLANS
+
+
+def row_query(session, shape, fields=None):
+    """Requête en tuples d'une forme .rows, réduite au fieldset éventuel."""
+    columns = ROW_PLANS[shape]()
+    if fields is not None and shape == 'place.rows':
+        columns = [col for col in columns if col.key in fields or col.key in PLACE_ROW_KEYS]
+    query = session.query(*columns)
+    if shape == 'place.rows' and (fields is None or 'owner' in fields):
+        query = query.outerjoin(User, User.id == Place.owner_id).add_columns(*owner_row_columns())
+    return query
+
+
+def load_options(shape, fields=None):
+    """Retourne les options de chargement déclarées pour une forme.
+
+    fields : champs demandés ; remplace le plan de la forme quand son type
+    d'entité a un plan par champs.
+    """
+    if shape not in PLANS:
+        raise ValueError(f"Unknown serialization shape: {shape}")
+    kind = shape.split('.')[0]
+    if fields is not None and kind in FIELDSET_PLANS:
+        return FIELDSET_PLANS[kind](fields)
+    return PLANS[shape]()
+
+
+def apply_plan(query, shape, fields=None):
+    return query.options(*load_options(shape, fields))
@@ -0,0 +1,153 @@
+import hashlib
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from flask_jwt_extended import JWTManager
+from flask_jwt_extended.config import config as jwt_config
+from app.services.cache import LRUCache
+
+
+class VerifiedTokenCache:
+    """Claims des tokens déjà vérifiés, indexés par empreinte SHA-256.
+
+    Une entrée n'est servie que jusqu'à l'expiration (exp) du token. Quand
+    le cache est plein, les entrées expirées partent en premier (tas trié
+    par exp), puis les moins récemment utilisées.
+    """
+
+    def __init__(self, max_size=10000, clock=time.time):
+        self.max_size = max_size
+        self._clock = clock
+        self._data = OrderedDict()
+        self._expiries = []
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(encoded_token):
+        return hashlib.sha256(encoded_token.encode()).digest()
+
+    def get(self, encoded_token):
+        key = self.digest(encoded_token)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            claims, expires_at = entry
+            if expires_at is not None and expires_at <= self._clock():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return claims
+
+    def set(self, encoded_token, claims):
+        if self.max_size <= 0:
+            return
+        key = self.digest(encoded_token)
+        expires_at = claims.get('exp')
+        with self._lock:
+            self._data[key] = (claims, expires_at)
+            self._data.move_to_end(key)
+            if expires_at is not None:
+                heapq.heappush(self._expiries, (expires_at, key))
+            if len(self._data) > self.max_size:
+                self._evict()
+
+    def _evict(self):
+        now = self._clock()
+        while self._expiries and self._expiries[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiries)
+            entry = self._data.get(key)
+            if entry is not None and entry[1] == expires_at:
+                del self._data[key]
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+        if len(self._expiries) > 2 * self.max_size:
+            # Entrées du tas déjà sorties par LRU
+            self._expiries = [(exp, key) for exp, key in self._expiries if key in self._data]
+            heapq.heapify(self._expiries)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._expiries = []
+
+    def __len__(self):
+        return len(self._data)
+
+
+class CachingJWTManager(JWTManager):
+    """JWTManager qui vérifie chaque token une seule fois par process.
+
+    - Les claims d'un token vérifié sont gardés jusqu'à son exp : les
+      requêtes suivantes avec le même token ne refont ni le décodage ni le
+      HMAC.
+    - Chaque utilisateur a un instantané {id, is_admin, token_version},
+      gardé JWT_SNAPSHOT_TTL secondes en mémoire. Il sert à révoquer sans
+      requête SQL : un token dont la claim 'tv' diffère de token_version,
+      ou qui se dit admin pour un utilisateur qui ne l'est plus, est refusé.
+
+    Config : JWT_VERIFY_CACHE_SIZE, JWT_SNAPSHOT_CACHE_SIZE, JWT_SNAPSHOT_TTL
+    (délai maximal de propagation d'une révocation aux autres workers).
+    """
+
+    def __init__(self, app=None, add_context_processor=False):
+        self.verified = VerifiedTokenCache()
+        self.snapshots = LRUCache()
+        super().__init__(app, add_context_processor)
+        self.token_in_blocklist_loader(self._is_revoked)
+
+    def init_app(self, app, add_context_processor=False):
+        super().init_app(app, add_context_processor)
+        self.verified = VerifiedTokenCache(app.config.get('JWT_VERIFY_CACHE_SIZE', 10000))
+        self.snapshots = LRUCache(app.config.get('JWT_SNAPSHOT_CACHE_SIZE', 10000),
+                                  app.config.get('JWT_SNAPSHOT_TTL', 60))
+
+    # Méthode privée de flask-jwt-extended : version fixée dans requirements.txt
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        # Les tokens en cookie (CSRF) et les décodages "expirés acceptés"
+        # passent toujours par la vérification complète
+        if csrf_value is not None or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+        claims = self.verified.get(encoded_token)
+        if claims is None:
+            claims = super()._decode_jwt_from_config(encoded_token)
+            self.verified.set(encoded_token, claims)
+        return dict(claims)
+
+    def snapshot(self, user_id):
+        """Instantané {id, is_admin, token_version} de l'utilisateur, ou None."""
+        key = f'user:{user_id}'
+        snapshot = self.snapshots.get(key)
+        if snapshot is None:
+            from app.extensions import db
+            from app.models.user import User
+            row = (db.session.query(User.id, User.is_admin, User.token_version)
+                   .filter(User.id == user_id).first())
+            if row is None:
+                return None
+            snapshot = {'id': row.id, 'is_admin': bool(row.is_admin), 'token_version': row.token_version}
+            self.snapshots.set(key, snapshot)
+        return snapshot
+
+    def forget_user(self, user_id):
+        self.snapshots.delete(f'user:{user_id}')
+
+    def _is_revoked(self, jwt_header, jwt_data):
+        snapshot = self.snapshot(jwt_data[jwt_config.identity_claim_key])
+        if snapshot is None:
+            # Utilisateur inconnu : aucun privilège ne peut être revendiqué
+            return bool(jwt_data.get('is_admin'))
+        if jwt_data.get('tv', 0) != snapshot['token_version']:
+            return True
+        return bool(jwt_data.get('is_admin')) and not snapshot['is_admin']
+
+
+def token_claims(user):
+    """Claims additionnelles d'un access token pour user."""
+    return {'is_admin': bool(user.is_admin), 'tv': user.token_version or 0}
@@ -29,3 +29,36 @@ def test_get_amenities(client):
     print("RESPONSE JSON:", response.json)
     assert response.status_code == 200
     assert b'Wifi' in response.data
+
+def test_get_amenities_paginated(client):
+    from app.models.amenity import Amenity
+    with client.application.app_context():
+        db.session.add_all([Amenity(name=f'Amenity {i}') for i in range(5)])
+        db.session.commit()
+    names = []
+    cursor = None
+    while True:
+        url = '/api/v1/amenities/?limit=2' + (f'&cursor={cursor}' if cursor else '')
+        response = client.get(url)
+        assert response.status_code == 200
+        page = response.json
+        assert len(page['items']) <= 2
+        names += [a['name'] for a in page['items']]
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+    assert sorted(names) == [f'Amenity {i}' for i in range(5)]
+
+def test_get_amenities_invalid_cursor(client):
+    response = client.get('/api/v1/amenities/?cursor=not-a-cursor')
+    assert response.status_code == 400
+
+def test_get_amenities_page_size_is_capped(client):
+    from app.models.amenity import Amenity
+    from app.services.pagination import MAX_PAGE_SIZE
+    with client.application.app_context():
+        db.session.add_all([Amenity(name=f'Amenity {i}') for i in range(MAX_PAGE_SIZE + 1)])
+        db.session.commit()
+    response = client.get(f'/api/v1/amenities/?limit={MAX_PAGE_SIZE * 10}')
+    assert len(response.json['items']) == MAX_PAGE_SIZE
+    assert response.json['next_cursor']
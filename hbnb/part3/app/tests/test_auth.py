@@ -0,0 +1,211 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+import threading
+import pytest
+from unittest import mock
+from flask_jwt_extended import create_access_token
+from werkzeug.security import generate_password_hash
+from sqlalchemy import event
+import flask_jwt_extended.jwt_manager as jwt_manager
+from app import create_app, db
+from app.extensions import hasher
+from app.models.user import User
+from app.services.passwords import PasswordHasher, HashingBusy
+from app.services.tokens import VerifiedTokenCache
+from app.services.facade import HBnBFacade
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['JWT_SECRET_KEY'] = 'test'
+    with app.app_context():
+        db.create_all()
+        user = User(first_name='Bob', last_name='Smith', email='bob@example.com', is_admin=True)
+        user.set_password('password')
+        db.session.add(user)
+        db.session.commit()
+        app.user_id = user.id
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+def login(client, email='bob@example.com', password='password'):
+    return client.post('/api/v1/auth/login', json={'email': email, 'password': password})
+
+def test_login_returns_token(app):
+    response = login(app.test_client())
+    assert response.status_code == 200
+    assert response.get_json()['access_token']
+
+def test_wrong_password_and_unknown_email_look_alike(app):
+    client = app.test_client()
+    with mock.patch.object(hasher, 'dummy_verify', wraps=hasher.dummy_verify) as dummy:
+        wrong = login(client, password='nope')
+        unknown = login(client, email='ghost@example.com')
+    assert wrong.status_code == unknown.status_code == 401
+    assert wrong.get_json() == unknown.get_json()
+    # L'email inconnu a quand même payé une vérification
+    dummy.assert_called_once_with('password')
+
+def test_legacy_hash_is_upgraded_on_login(app):
+    with app.app_context():
+        user = db.session.get(User, app.user_id)
+        user.password_hash = generate_password_hash('password', 'pbkdf2:sha256:600')
+        db.session.commit()
+    assert login(app.test_client()).status_code == 200
+    with app.app_context():
+        password_hash = db.session.get(User, app.user_id).password_hash
+        assert password_hash.startswith(hasher.method + '$')
+        assert not hasher.needs_rehash(password_hash)
+        assert hasher.verify(password_hash, 'password')
+
+def test_shorthand_method_does_not_rehash_every_login():
+    # werkzeug développe 'scrypt' en 'scrypt:32768:8:1' dans le hash stocké
+    shorthand = PasswordHasher()
+    shorthand.method = 'scrypt'
+    password_hash = shorthand.hash('password')
+    assert not shorthand.needs_rehash(password_hash)
+    assert shorthand.needs_rehash(generate_password_hash('password', 'scrypt:16384:8:1'))
+
+def test_reference_hash_never_bypasses_the_pool(app):
+    # Calculé par init_app : aucun hachage au premier needs_rehash d'une requête
+    hasher.reset_stats()
+    assert not hasher.needs_rehash(generate_password_hash('password', hasher.method))
+    assert hasher.stats()['completed'] == 0
+    # Hors init_app, il passe par le pool (file bornée, HashingBusy)
+    lazy = PasswordHasher()
+    lazy.method = 'pbkdf2:sha256:1000'
+    lazy.dummy_verify('password')
+    assert lazy.stats()['completed'] == 2
+
+def test_failed_login_does_not_rehash(app):
+    with app.app_context():
+        user = db.session.get(User, app.user_id)
+        user.password_hash = legacy = generate_password_hash('password', 'pbkdf2:sha256:600')
+        db.session.commit()
+    assert login(app.test_client(), password='nope').status_code == 401
+    with app.app_context():
+        assert db.session.get(User, app.user_id).password_hash == legacy
+
+def test_login_is_rejected_when_hashing_is_saturated(app):
+    with mock.patch.object(hasher, 'verify', side_effect=HashingBusy()):
+        response = login(app.test_client())
+    assert response.status_code == 503
+
+def test_hashing_stats_are_admin_only(app):
+    client = app.test_client()
+    login(client)
+    with app.app_context():
+        admin = create_access_token(identity=app.user_id, additional_claims={'is_admin': True})
+        other = create_access_token(identity=app.user_id)
+    response = client.get('/api/v1/auth/hashing-stats', headers={'Authorization': f'Bearer {admin}'})
+    assert response.status_code == 200
+    assert response.get_json()['completed'] >= 1
+    response = client.get('/api/v1/auth/hashing-stats', headers={'Authorization': f'Bearer {other}'})
+    assert response.status_code == 403
+
+def test_concurrency_limit_rejects_after_queue_timeout():
+    passwords = PasswordHasher()
+    passwords.method = 'pbkdf2:sha256:1000'
+    passwords.queue_timeout = 0.05
+    passwords.max_concurrency = 1
+    passwords._slots = threading.BoundedSemaphore(1)
+    started, release = threading.Event(), threading.Event()
+
+    def slow(*args):
+        started.set()
+        release.wait(5)
+        return True
+
+    worker = threading.Thread(target=passwords._run, args=(slow,))
+    worker.start()
+    started.wait(5)
+    with pytest.raises(HashingBusy):
+        passwords.hash('password')
+    release.set()
+    worker.join()
+    stats = passwords.stats()
+    assert stats['rejected'] == 1
+    assert stats['completed'] == 1
+    assert stats['in_flight'] == stats['waiting'] == 0
+
+def test_process_pool_round_trip():
+    app = create_app('testing')
+    app.config.update(PASSWORD_HASH_WORKERS=1)
+    passwords = PasswordHasher()
+    passwords.init_app(app)
+    try:
+        password_hash = passwords.hash('password')
+        assert passwords.verify(password_hash, 'password')
+        assert not passwords.verify(password_hash, 'nope')
+    finally:
+        passwords.shutdown()
+
+def auth_headers(token):
+    return {'Authorization': f'Bearer {token}'}
+
+def test_token_is_verified_once(app):
+    client = app.test_client()
+    token = login(client).get_json()['access_token']
+    jwt = app.extensions['flask-jwt-extended']
+    with mock.patch.object(jwt_manager, '_decode_jwt', wraps=jwt_manager._decode_jwt) as decode:
+        for _ in range(3):
+            assert client.get('/api/v1/auth/hashing-stats', headers=auth_headers(token)).status_code == 200
+    assert decode.call_count == 1
+    assert jwt.verified.hits == 2
+
+def test_authenticated_requests_skip_the_database(app):
+    client = app.test_client()
+    token = login(client).get_json()['access_token']
+    client.get('/api/v1/auth/hashing-stats', headers=auth_headers(token))
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', listener)
+    try:
+        assert client.get('/api/v1/auth/hashing-stats', headers=auth_headers(token)).status_code == 200
+    finally:
+        event.remove(engine, 'before_cursor_execute', listener)
+    assert statements == []
+
+def test_revoke_invalidates_issued_tokens(app):
+    client = app.test_client()
+    token = login(client).get_json()['access_token']
+    assert client.post('/api/v1/auth/revoke', headers=auth_headers(token)).status_code == 204
+    assert client.get('/api/v1/auth/hashing-stats', headers=auth_headers(token)).status_code == 401
+    fresh = login(client).get_json()['access_token']
+    assert client.get('/api/v1/auth/hashing-stats', headers=auth_headers(fresh)).status_code == 200
+
+def test_password_change_revokes_tokens(app):
+    client = app.test_client()
+    token = login(client).get_json()['access_token']
+    with app.app_context():
+        HBnBFacade().update_user(app.user_id, {'password': 'new-password'})
+    assert client.get('/api/v1/auth/hashing-stats', headers=auth_headers(token)).status_code == 401
+
+def test_demoted_admin_loses_admin_claim(app):
+    client = app.test_client()
+    token = login(client).get_json()['access_token']
+    with app.app_context():
+        db.session.get(User, app.user_id).is_admin = False
+        db.session.commit()
+        app.extensions['flask-jwt-extended'].forget_user(app.user_id)
+    assert client.get('/api/v1/auth/hashing-stats', headers=auth_headers(token)).status_code == 401
+
+def test_verified_cache_evicts_expired_tokens_first():
+    now = [1000.0]
+    tokens = VerifiedTokenCache(max_size=2, clock=lambda: now[0])
+    tokens.set('short', {'exp': 1010})
+    tokens.set('long', {'exp': 5000})
+    tokens.get('short')
+    now[0] = 1020
+    tokens.set('other', {'exp': 5000})
+    # 'short' était le plus récemment utilisé mais a expiré
+    assert tokens.get('short') is None
+    assert tokens.get('long') == {'exp': 5000}
+    assert tokens.get('other') == {'exp': 5000}
@@ -0,0 +1,147 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+import json
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models.user import User
+from app.models.place import Place
+from app.models.amenity import Amenity
+from app.models.review import Review
+
+@pytest.fixture
+def client():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['JWT_SECRET_KEY'] = 'test'
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            admin = User(first_name='Admin', last_name='User', email='admin@example.com', is_admin=True)
+            admin.set_password('password')
+            db.session.add(admin)
+            db.session.commit()
+            client.admin_id = admin.id
+            token = create_access_token(identity=admin.id, additional_claims={'is_admin': True})
+            client.headers = {'Authorization': f'Bearer {token}'}
+        yield client
+        with app.app_context():
+            db.drop_all()
+
+def ndjson(rows):
+    return '\n'.join(r if isinstance(r, str) else json.dumps(r) for r in rows) + '\n'
+
+def post_import(client, path, rows, headers=None):
+    return client.post(path, data=ndjson(rows), content_type='application/x-ndjson',
+                       headers=headers if headers is not None else client.headers)
+
+def test_import_requires_admin(client):
+    with client.application.app_context():
+        token = create_access_token(identity='someone')
+    resp = post_import(client, '/api/v1/amenities/import', [{'name': 'Wifi'}],
+                       headers={'Authorization': f'Bearer {token}'})
+    assert resp.status_code == 403
+
+def test_import_amenities_reports_bad_rows(client):
+    resp = post_import(client, '/api/v1/amenities/import', [
+        {'name': 'Wifi'}, {'name': ''}, 'not json', {'name': 'Pool'}, {'name': 'Wifi'},
+    ])
+    assert resp.status_code == 200, resp.data
+    report = resp.get_json()
+    assert report['inserted'] == 2
+    assert [e['line'] for e in report['errors']] == [2, 3, 5]
+    with client.application.app_context():
+        assert sorted(a.name for a in Amenity.query.all()) == ['Pool', 'Wifi']
+
+def test_import_reports_invalid_utf8_lines(client):
+    body = b'{"name": "Wifi"}\n{"name": "\xff"}\n{"name": "Pool"}\n'
+    resp = client.post('/api/v1/amenities/import', data=body, content_type='application/x-ndjson',
+                       headers=client.headers)
+    assert resp.status_code == 200, resp.data
+    report = resp.get_json()
+    assert report['inserted'] == 2
+    assert [e['line'] for e in report['errors']] == [2]
+    assert 'Invalid JSON' in report['errors'][0]['error']
+    with client.application.app_context():
+        assert sorted(a.name for a in Amenity.query.all()) == ['Pool', 'Wifi']
+
+def test_non_string_text_fields_are_row_errors(client):
+    place = {'title': 'Loft', 'price': 80, 'latitude': 48.85, 'longitude': 2.35,
+             'owner_id': client.admin_id, 'description': 'Calme'}
+    resp = post_import(client, '/api/v1/places/import', [
+        place, dict(place, description={'x': 1}), dict(place, title=['Loft']),
+    ])
+    assert resp.status_code == 200, resp.data
+    report = resp.get_json()
+    assert report['inserted'] == 1
+    assert report['errors'] == [{'line': 2, 'error': 'description must be a string'},
+                                {'line': 3, 'error': 'title must be a string'}]
+    with client.application.app_context():
+        place_id = Place.query.one().id
+    review = {'text': 'Bien', 'rating': 4, 'place_id': place_id, 'user_id': client.admin_id}
+    resp = post_import(client, '/api/v1/reviews/import', [review, dict(review, text={'x': 1})])
+    assert resp.get_json() == {'inserted': 1, 'errors': [{'line': 2, 'error': 'text must be a string'}]}
+
+def test_import_places_and_reviews(client):
+    post_import(client, '/api/v1/amenities/import', [{'name': 'Wifi'}])
+    with client.application.app_context():
+        wifi = Amenity.query.filter_by(name='Wifi').first().id
+    place = {'title': 'Loft', 'price': 80, 'latitude': 48.85, 'longitude': 2.35,
+             'owner_id': client.admin_id, 'amenities': [wifi]}
+    resp = post_import(client, '/api/v1/places/import', [
+        place, dict(place, owner_id='ghost'), dict(place, amenities=[wifi, 'nope']),
+    ])
+    report = resp.get_json()
+    assert report['inserted'] == 1
+    assert [e['line'] for e in report['errors']] == [2, 3]
+    assert 'nope' in report['errors'][1]['error']
+    with client.application.app_context():
+        loft = Place.query.one()
+        assert [pa.amenity_id for pa in loft.amenities] == [wifi]
+        assert loft.geohash.startswith('u09')
+        place_id = loft.id
+
+    resp = post_import(client, '/api/v1/reviews/import', [
+        {'text': 'Top', 'rating': 5, 'user_id': client.admin_id, 'place_id': place_id},
+        {'text': 'Bien', 'rating': 4, 'user_id': client.admin_id, 'place_id': place_id},
+        {'text': 'Hors échelle', 'rating': 9, 'user_id': client.admin_id, 'place_id': place_id},
+    ])
+    assert resp.get_json()['inserted'] == 2
+    with client.application.app_context():
+        loft = db.session.get(Place, place_id)
+        assert (loft.review_count, loft.rating_sum, loft.rating_avg) == (2, 9, 4.5)
+        assert Review.query.count() == 2
+
+def test_importer_commits_in_chunks(client):
+    from app.services.bulk_import import BulkImporter
+    rows = [(i, {'name': f'Amenity {i}'}) for i in range(1, 26)]
+    with client.application.app_context():
+        report = BulkImporter(chunk_size=10).import_amenities(iter(rows))
+        assert report == {'inserted': 25, 'errors': []}
+        assert Amenity.query.count() == 25
+
+def test_earlier_chunks_survive_a_failing_chunk(client):
+    from functools import partial
+    from unittest import mock
+    from app.services.bulk_import import BulkImporter
+    assert client.application.config['UNIT_OF_WORK_PER_REQUEST']
+    calls = []
+    chunk = BulkImporter._amenity_chunk
+
+    def third_chunk_fails(self, rows):
+        calls.append(len(rows))
+        if len(calls) == 3:
+            raise RuntimeError('chunk failed')
+        return chunk(self, rows)
+
+    rows = [{'name': f'Amenity {i}'} for i in range(1, 8)]
+    with mock.patch('app.api.v1.bulk.BulkImporter', partial(BulkImporter, chunk_size=2)), \
+            mock.patch.object(BulkImporter, '_amenity_chunk', third_chunk_fails):
+        with pytest.raises(RuntimeError):
+            post_import(client, '/api/v1/amenities/import', rows)
+    # Import hors de l'unité de travail de la requête : un commit par lot
+    with client.application.app_context():
+        assert sorted(a.name for a in Amenity.query.all()) == [f'Amenity {i}' for i in range(1, 5)]
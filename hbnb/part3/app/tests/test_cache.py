@@ -0,0 +1,90 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.extensions import cache
+from app.models.user import User
+from app.models.place import Place, PlaceAmenity
+from app.models.amenity import Amenity
+from app.services.cache import LRUCache, place_key
+
+@pytest.fixture
+def client():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['JWT_SECRET_KEY'] = 'test'
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            owner = User(first_name='Bob', last_name='Smith', email='bob@example.com')
+            owner.set_password('password')
+            amenity = Amenity(name='Wifi')
+            db.session.add_all([owner, amenity])
+            db.session.flush()
+            place = Place(title='Test Place', price=100.0, latitude=0.0, longitude=0.0, owner_id=owner.id)
+            db.session.add(place)
+            db.session.flush()
+            db.session.add(PlaceAmenity(place_id=place.id, amenity_id=amenity.id))
+            db.session.commit()
+            client.ids = {'owner': owner.id, 'amenity': amenity.id, 'place': place.id}
+            token = create_access_token(identity=owner.id)
+            client.headers = {'Authorization': f'Bearer {token}'}
+        yield client
+        with app.app_context():
+            db.drop_all()
+
+def test_lru_evicts_least_recently_used():
+    lru = LRUCache(max_size=2, ttl=0)
+    lru.set('a', 1)
+    lru.set('b', 2)
+    lru.get('a')
+    lru.set('c', 3)
+    assert lru.get('b') is None
+    assert lru.get('a') == 1
+    assert lru.get('c') == 3
+
+def test_lru_entries_expire():
+    now = [0.0]
+    lru = LRUCache(max_size=10, ttl=5, clock=lambda: now[0])
+    lru.set('a', 1)
+    now[0] = 4.9
+    assert lru.get('a') == 1
+    now[0] = 5.0
+    assert lru.get('a') is None
+
+def test_place_detail_is_served_from_cache(client):
+    place_id = client.ids['place']
+    first = client.get(f'/api/v1/places/{place_id}')
+    assert first.status_code == 200
+    assert cache.get(place_key(place_id))['title'] == 'Test Place'
+    with client.application.app_context():
+        # Écriture hors facade : le cache n'est pas invalidé
+        db.session.get(Place, place_id).title = 'Changed behind the facade'
+        db.session.commit()
+    assert client.get(f'/api/v1/places/{place_id}').get_json()['title'] == 'Test Place'
+
+def test_review_creation_invalidates_parent_place(client):
+    place_id = client.ids['place']
+    client.get(f'/api/v1/places/{place_id}')
+    resp = client.post('/api/v1/reviews/', json={
+        'text': 'Top', 'rating': 5, 'user_id': client.ids['owner'], 'place_id': place_id
+    }, headers=client.headers)
+    assert resp.status_code == 201, resp.data
+    assert cache.get(place_key(place_id)) is None
+    data = client.get(f'/api/v1/places/{place_id}').get_json()
+    assert [r['text'] for r in data['reviews']] == ['Top']
+    assert data['review_count'] == 1
+
+def test_amenity_update_invalidates_amenity_and_linked_places(client):
+    place_id, amenity_id = client.ids['place'], client.ids['amenity']
+    client.get(f'/api/v1/places/{place_id}')
+    client.get(f'/api/v1/amenities/{amenity_id}')
+    resp = client.put(f'/api/v1/amenities/{amenity_id}', json={'name': 'Fibre'}, headers=client.headers)
+    assert resp.status_code == 200, resp.data
+    assert client.get(f'/api/v1/amenities/{amenity_id}').get_json()['name'] == 'Fibre'
+    place = client.get(f'/api/v1/places/{place_id}').get_json()
+    assert [a['name'] for a in place['amenities']] == ['Fibre']
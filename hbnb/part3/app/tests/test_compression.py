@@ -0,0 +1,95 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+import gzip
+import json
+import uuid
+from datetime import date, datetime
+import pytest
+from app import create_app, db
+from app.api.v1 import encoding
+from app.models.user import User
+from app.models.place import Place
+
+@pytest.fixture
+def client():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['JWT_SECRET_KEY'] = 'test'
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            owner = User(first_name='Bob', last_name='Smith', email='bob@example.com')
+            owner.set_password('password')
+            db.session.add(owner)
+            db.session.flush()
+            db.session.add_all([
+                Place(title=f'Place {i}', description='Vue sur le lac, très calme. ' * 5,
+                      price=50.0 + i, latitude=0.0, longitude=0.0, owner_id=owner.id)
+                for i in range(20)])
+            db.session.commit()
+        yield client
+        with app.app_context():
+            db.drop_all()
+
+def test_large_json_is_gzipped(client):
+    plain = client.get('/api/v1/places/')
+    assert 'Content-Encoding' not in plain.headers
+    resp = client.get('/api/v1/places/', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert resp.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in resp.headers['Vary']
+    assert int(resp.headers['Content-Length']) == len(resp.data) < len(plain.data)
+    assert json.loads(gzip.decompress(resp.data)) == plain.get_json()
+
+def test_small_or_refused_responses_are_not_compressed(client):
+    resp = client.get('/api/v1/places/?limit=1', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in resp.headers
+    resp = client.get('/api/v1/places/', headers={'Accept-Encoding': 'gzip;q=0, identity'})
+    assert resp.status_code == 200 and 'Content-Encoding' not in resp.headers
+
+def test_compressed_etag_is_weak_and_revalidates(client):
+    resp = client.get('/api/v1/places/', headers={'Accept-Encoding': 'gzip'})
+    etag, weak = resp.get_etag()
+    assert weak and etag
+    resp = client.get('/api/v1/places/', headers={'Accept-Encoding': 'gzip', 'If-None-Match': f'W/"{etag}"'})
+    assert resp.status_code == 304
+    resp = client.get('/api/v1/places/', headers={'If-None-Match': f'W/"{etag}"'})
+    assert resp.status_code == 304
+
+def test_export_is_compressed_while_streaming(client):
+    resp = client.get('/api/v1/places/export', headers={'Accept-Encoding': 'gzip'})
+    assert resp.is_streamed
+    assert resp.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in resp.headers
+    lines = gzip.decompress(resp.get_data()).decode().splitlines()
+    assert sorted(json.loads(line)['title'] for line in lines) == sorted(f'Place {i}' for i in range(20))
+
+def test_orjson_gives_the_same_bytes(client):
+    pytest.importorskip('orjson')
+    plain = client.get('/api/v1/places/')
+    assert plain.mimetype == 'application/json'
+    assert 'très calme' in plain.get_data(as_text=True)
+    client.application.config['API_JSON_ENCODER'] = 'orjson'
+    assert client.get('/api/v1/places/').data == plain.data
+    payload = {'title': 'Péniche « Lac »', 'price': 50.0, 'rating': float('nan'), 'max': float('inf'),
+               'at': datetime(2026, 10, 18, 12, 30, 5, 120), 'day': date(2026, 10, 18),
+               'id': uuid.UUID(int=7), 'tags': [None, True, 1, 0.5, {}], 'empty': []}
+    with client.application.app_context():
+        by_encoder = {}
+        for encoder in ('json', 'orjson'):
+            client.application.config['API_JSON_ENCODER'] = encoder
+            by_encoder[encoder] = (encoding.dumps(payload), encoding.dumps(payload, indent=True))
+    assert by_encoder['json'] == by_encoder['orjson']
+    assert json.loads(by_encoder['json'][0])['rating'] is None
+
+def test_brotli_when_installed(client):
+    brotli = pytest.importorskip('brotli')
+    plain = client.get('/api/v1/places/')
+    resp = client.get('/api/v1/places/', headers={'Accept-Encoding': 'gzip, br'})
+    assert resp.headers['Content-Encoding'] == 'br'
+    assert json.loads(brotli.decompress(resp.data)) == plain.get_json()
+    resp = client.get('/api/v1/places/export', headers={'Accept-Encoding': 'br'})
+    assert resp.is_streamed and resp.headers['Content-Encoding'] == 'br'
+    assert len(brotli.decompress(resp.get_data()).decode().splitlines()) == 20
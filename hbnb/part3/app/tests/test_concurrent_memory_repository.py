@@ -0,0 +1,71 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+import threading
+from types import SimpleNamespace
+from app.persistence.concurrent_memory_repository import ConcurrentMemoryRepository
+
+def test_crud_across_shards():
+    repo = ConcurrentMemoryRepository(shards=4)
+    objs = [repo.add(SimpleNamespace(id=None, name=f'n{i}', city='Paris' if i % 2 else 'Lyon'))
+            for i in range(20)]
+    assert len(repo) == 20
+    assert repo.get(objs[3].id) is objs[3]
+    assert repo.get_by_attribute('name', 'n7') is objs[7]
+    assert len(repo.filter_by_attribute('city', 'Paris')) == 10
+    assert repo.delete(objs[0].id)
+    assert not repo.delete(objs[0].id)
+    assert repo.get(objs[0].id) is None
+    assert repo.update('missing', {'name': 'x'}) is None
+
+def test_get_all_is_a_list_like_the_memory_repository():
+    from app.persistence.memory_repository import MemoryRepository
+    for repo in (ConcurrentMemoryRepository(shards=4), MemoryRepository()):
+        for i in range(10):
+            repo.add(SimpleNamespace(id=None, name=f'n{i}'))
+        everything = repo.get_all()
+        assert isinstance(everything, list) and len(everything) == 10
+        for obj in everything:
+            repo.delete(obj.id)
+        assert repo.get_all() == []
+
+def test_update_publishes_a_new_version():
+    repo = ConcurrentMemoryRepository()
+    before = repo.add(SimpleNamespace(id='a', left=0, right=0))
+    after = repo.update('a', {'left': 1, 'right': 1, 'unknown': 2})
+    # L'objet déjà lu n'est pas modifié sous les pieds du lecteur
+    assert (before.left, before.right) == (0, 0)
+    assert (after.left, after.right) == (1, 1)
+    assert repo.get('a') is after
+    assert not hasattr(after, 'unknown')
+
+def test_readers_never_see_torn_updates():
+    repo = ConcurrentMemoryRepository(shards=2)
+    for i in range(10):
+        repo.add(SimpleNamespace(id=str(i), left=0, right=0))
+    stop = threading.Event()
+    torn = []
+
+    def writer(n):
+        value = 0
+        while not stop.is_set():
+            value += 1
+            repo.update(str(value % 10), {'left': value, 'right': value})
+
+    def reader():
+        while not stop.is_set():
+            for obj in repo.get_all():
+                if obj.left != obj.right:
+                    torn.append(obj)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(3)]
+    threads += [threading.Thread(target=reader) for _ in range(3)]
+    for t in threads:
+        t.start()
+    threading.Event().wait(0.3)
+    stop.set()
+    for t in threads:
+        t.join()
+    assert torn == []
+    assert len(repo) == 10
@@ -0,0 +1,77 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models.user import User
+from app.models.place import Place
+from app.models.amenity import Amenity
+
+@pytest.fixture
+def client():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['JWT_SECRET_KEY'] = 'test'
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            owner = User(first_name='Bob', last_name='Smith', email='bob@example.com')
+            owner.set_password('password')
+            db.session.add(owner)
+            db.session.flush()
+            place = Place(title='Test Place', price=100.0, latitude=0.0, longitude=0.0, owner_id=owner.id)
+            db.session.add(place)
+            db.session.commit()
+            client.ids = {'owner': owner.id, 'place': place.id}
+            token = create_access_token(identity=owner.id)
+            client.headers = {'Authorization': f'Bearer {token}'}
+        yield client
+        with app.app_context():
+            db.drop_all()
+
+def test_place_etag_returns_304(client):
+    url = f"/api/v1/places/{client.ids['place']}"
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert first.headers['Last-Modified']
+    second = client.get(url, headers={'If-None-Match': etag})
+    assert second.status_code == 304
+    assert second.data == b''
+    assert second.headers['ETag'] == etag
+
+def test_place_etag_changes_with_nested_review(client):
+    url = f"/api/v1/places/{client.ids['place']}"
+    etag = client.get(url).headers['ETag']
+    resp = client.post('/api/v1/reviews/', json={
+        'text': 'Top', 'rating': 5, 'user_id': client.ids['owner'], 'place_id': client.ids['place']
+    }, headers=client.headers)
+    assert resp.status_code == 201
+    resp = client.get(url, headers={'If-None-Match': etag})
+    assert resp.status_code == 200
+    assert resp.headers['ETag'] != etag
+
+def test_place_if_modified_since(client):
+    url = f"/api/v1/places/{client.ids['place']}"
+    last_modified = client.get(url).headers['Last-Modified']
+    assert client.get(url, headers={'If-Modified-Since': last_modified}).status_code == 304
+    assert client.get(url, headers={'If-Modified-Since': 'Mon, 01 Jan 2001 00:00:00 GMT'}).status_code == 200
+
+def test_collection_etag_tracks_inserts_and_pages(client):
+    first = client.get('/api/v1/amenities/')
+    etag = first.headers['ETag']
+    assert client.get('/api/v1/amenities/', headers={'If-None-Match': etag}).status_code == 304
+    # Une autre page a son propre validateur
+    assert client.get('/api/v1/amenities/?limit=1', headers={'If-None-Match': etag}).status_code == 200
+    with client.application.app_context():
+        db.session.add(Amenity(name='Wifi'))
+        db.session.commit()
+    assert client.get('/api/v1/amenities/', headers={'If-None-Match': etag}).status_code == 200
+
+def test_missing_resource_has_no_etag(client):
+    resp = client.get('/api/v1/places/unknown')
+    assert resp.status_code == 404
+    assert 'ETag' not in resp.headers
@@ -0,0 +1,118 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+import sqlite3
+import pytest
+from sqlalchemy import event
+from app import create_app, db
+from app.models.user import User
+from app.models.amenity import Amenity
+from app.services.facade import HBnBFacade
+from app.services.fulltext import match_expression
+
+@pytest.fixture
+def client():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['JWT_SECRET_KEY'] = 'test'
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            owner = User(first_name='Bob', last_name='Smith', email='bob@example.com')
+            owner.set_password('password')
+            wifi, pool = Amenity(name='Wifi'), Amenity(name='Pool')
+            db.session.add_all([owner, wifi, pool])
+            db.session.commit()
+            client.ids = {'owner': owner.id, 'wifi': wifi.id, 'pool': pool.id}
+            facade = HBnBFacade()
+            for title, description, price, amenities in [
+                ('Loft parisien', 'Vue sur la Seine', 120.0, [wifi.id]),
+                ('Studio calme', 'A deux pas de Paris, proche du métro', 60.0, [wifi.id, pool.id]),
+                ('Villa à Nice', 'Piscine et vue mer', 300.0, [pool.id]),
+                ('Chalet', 'Au pied des pistes', 200.0, []),
+            ]:
+                place = facade.create_place({
+                    'title': title, 'description': description, 'price': price,
+                    'latitude': 45.0, 'longitude': 5.0, 'owner_id': owner.id, 'amenities': amenities
+                })
+                client.ids[title] = place.id
+        yield client
+        with app.app_context():
+            db.drop_all()
+
+def titles(client, query):
+    resp = client.get(f'/api/v1/places/?{query}')
+    assert resp.status_code == 200, resp.data
+    return [item['title'] for item in resp.get_json()['items']]
+
+def test_match_expression_quotes_words():
+    assert match_expression('vue "mer" OR -x*') == '"vue"* "mer"* "OR"* "x"*'
+
+def test_prefix_match_ranks_title_before_description(client):
+    assert titles(client, 'q=pari') == ['Loft parisien', 'Studio calme']
+
+def test_all_words_must_match_ignoring_accents(client):
+    assert titles(client, 'q=vue+seine') == ['Loft parisien']
+    assert titles(client, 'q=metro') == ['Studio calme']
+
+def test_search_combines_with_price_and_amenities(client):
+    assert titles(client, 'q=vue&max_price=200') == ['Loft parisien']
+    assert titles(client, f"q=pari&amenities={client.ids['wifi']},{client.ids['pool']}") == ['Studio calme']
+    assert titles(client, 'q=pari&min_price=100') == ['Loft parisien']
+
+def test_search_pages_with_cursor(client):
+    first = client.get('/api/v1/places/?q=vue&limit=1').get_json()
+    assert len(first['items']) == 1 and first['next_cursor']
+    second = client.get(f"/api/v1/places/?q=vue&limit=1&cursor={first['next_cursor']}").get_json()
+    assert second['next_cursor'] is None
+    assert {first['items'][0]['title'], second['items'][0]['title']} == {'Loft parisien', 'Villa à Nice'}
+
+def test_index_follows_updates(client):
+    with client.application.app_context():
+        HBnBFacade().update_place(client.ids['Chalet'], {'title': 'Chalet savoyard', 'description': 'Ski'})
+    assert titles(client, 'q=savoy') == ['Chalet savoyard']
+    assert titles(client, 'q=pistes') == []
+
+def test_bulk_imported_places_are_indexed(client):
+    from app.services.bulk_import import BulkImporter
+    with client.application.app_context():
+        report = BulkImporter().import_places([(1, {
+            'title': 'Cabane', 'description': 'Dans les arbres', 'price': 80.0,
+            'latitude': 44.0, 'longitude': 1.0, 'owner_id': client.ids['owner']
+        })])
+    assert report['inserted'] == 1
+    assert titles(client, 'q=arbre') == ['Cabane']
+
+def test_amenity_filter_without_query(client):
+    assert titles(client, f"amenities={client.ids['pool']}") == ['Studio calme', 'Villa à Nice']
+
+def test_invalid_search_is_rejected(client):
+    assert client.get('/api/v1/places/?q=%21%21').status_code == 400
+    assert client.get('/api/v1/places/?sort=relevance').status_code == 400
+
+def test_sqlite_without_fts5_falls_back_to_substring_search():
+    app = create_app('testing')
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.app_context():
+        # Build SQLite sans FTS5 : le module est inconnu
+        @event.listens_for(db.engine, 'before_cursor_execute')
+        def no_fts5(conn, cursor, statement, parameters, context, executemany):
+            if 'fts5' in statement:
+                raise sqlite3.OperationalError('no such module: fts5')
+        db.create_all()
+        owner = User(first_name='Bob', last_name='Smith', email='bob@example.com')
+        owner.set_password('password')
+        db.session.add(owner)
+        db.session.commit()
+        for title, description in [('Loft parisien', 'Vue sur la Seine'), ('Studio', 'Code axb, 100 pour cent')]:
+            HBnBFacade().create_place({'title': title, 'description': description, 'price': 120.0,
+                                       'latitude': 45.0, 'longitude': 5.0, 'owner_id': owner.id, 'amenities': []})
+        client = app.test_client()
+        resp = client.get('/api/v1/places/?q=seine')
+        assert resp.status_code == 200, resp.data
+        assert [item['title'] for item in resp.get_json()['items']] == ['Loft parisien']
+        # _ est gardé dans les mots mais n'est pas un joker LIKE
+        assert client.get('/api/v1/places/?q=a_b').get_json()['items'] == []
+        db.drop_all()
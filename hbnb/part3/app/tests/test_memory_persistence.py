@@ -0,0 +1,109 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+import pytest
+from types import SimpleNamespace
+from app.persistence.memory_persistence import DurableMemoryRepository, OperationLog, PUT
+
+def listing(title, price):
+    return SimpleNamespace(id=None, title=title, price=price)
+
+def reopen(directory, **kwargs):
+    return DurableMemoryRepository(str(directory), indexes={'title': 'unique', 'price': 'sorted'}, **kwargs)
+
+def test_log_is_replayed_after_restart(tmp_path):
+    repo = reopen(tmp_path)
+    loft = repo.add(listing('Loft', 120))
+    studio = repo.add(listing('Studio', 60))
+    repo.update(loft.id, {'price': 150, 'unknown': 'ignored'})
+    repo.delete(studio.id)
+    repo.close()
+
+    repo = reopen(tmp_path)
+    assert [o.title for o in repo.get_all()] == ['Loft']
+    assert repo.get_by_attribute('title', 'Loft').price == 150
+    assert not hasattr(repo.get(loft.id), 'unknown')
+    assert repo.range_by_attribute('price', 100, 200)[0].id == loft.id
+
+def test_snapshot_compacts_the_log(tmp_path):
+    repo = reopen(tmp_path, snapshot_every=3)
+    for i in range(4):
+        repo.add(listing(f'Place {i}', i))
+    # Snapshot au 3e enregistrement, puis un seul enregistrement dans le journal
+    assert os.path.exists(repo.snapshot_path)
+    assert len(list(OperationLog.replay(repo.log_path))) == 1
+    repo.close()
+    repo = reopen(tmp_path)
+    assert sorted(o.title for o in repo.get_all()) == [f'Place {i}' for i in range(4)]
+    assert [o.price for o in repo.range_by_attribute('price')] == [0, 1, 2, 3]
+
+def test_replaying_ops_already_in_snapshot_is_harmless(tmp_path):
+    repo = reopen(tmp_path, snapshot_every=None)
+    loft = repo.add(listing('Loft', 120))
+    repo.update(loft.id, {'price': 90})
+    log = open(repo.log_path, 'rb').read()
+    repo.snapshot()
+    repo.close()
+    # Arrêt entre l'écriture du snapshot et la remise à zéro du journal
+    with open(os.path.join(tmp_path, 'ops.log'), 'wb') as f:
+        f.write(log)
+    repo = reopen(tmp_path)
+    assert [(o.title, o.price) for o in repo.get_all()] == [('Loft', 90)]
+
+def test_log_already_in_snapshot_is_skipped_with_unique_index(tmp_path):
+    repo = reopen(tmp_path, snapshot_every=None)
+    loft = repo.add(listing('Loft', 120))
+    repo.update(loft.id, {'title': 'Loft2'})
+    other = repo.add(listing('Loft', 80))
+    log = open(repo.log_path, 'rb').read()
+    repo.snapshot()
+    repo.close()
+    # Arrêt avant la remise à zéro du journal : rejouer ces opérations
+    # réinsérerait un second 'Loft' avant le renommage
+    with open(os.path.join(tmp_path, 'ops.log'), 'wb') as f:
+        f.write(log)
+    repo = reopen(tmp_path, snapshot_every=None)
+    assert sorted((o.title, o.price) for o in repo.get_all()) == [('Loft', 80), ('Loft2', 120)]
+    # Les écritures suivantes reprennent après les LSN du snapshot
+    repo.delete(other.id)
+    repo.close()
+    repo = reopen(tmp_path)
+    assert [o.title for o in repo.get_all()] == ['Loft2']
+    assert repo.get_by_attribute('title', 'Loft') is None
+
+def test_torn_tail_is_discarded(tmp_path):
+    repo = reopen(tmp_path)
+    repo.add(listing('Loft', 120))
+    repo.add(listing('Studio', 60))
+    repo.close()
+    path = os.path.join(tmp_path, 'ops.log')
+    size = os.path.getsize(path)
+    with open(path, 'r+b') as f:
+        f.truncate(size - 5)
+    records = list(OperationLog.replay(path))
+    assert [(op, data.title) for _, op, _, data in records] == [(PUT, 'Loft')]
+    # Le journal est coupé après le dernier enregistrement valide
+    assert os.path.getsize(path) < size - 5
+    repo = reopen(tmp_path)
+    repo.add(listing('Villa', 300))
+    repo.close()
+    assert sorted(o.title for o in reopen(tmp_path).get_all()) == ['Loft', 'Villa']
+
+def test_fsync_batching(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr(os, 'fsync', lambda fd: synced.append(fd))
+    log = OperationLog(str(tmp_path / 'ops.log'), fsync_every=3)
+    for i in range(7):
+        log.append(PUT, str(i), i)
+    assert len(synced) == 2
+    log.close()
+    assert len(synced) == 3
+
+def test_rejected_write_is_not_logged(tmp_path):
+    repo = reopen(tmp_path)
+    repo.add(listing('Loft', 120))
+    with pytest.raises(ValueError):
+        repo.add(listing('Loft', 80))
+    repo.close()
+    assert len(list(OperationLog.replay(os.path.join(tmp_path, 'ops.log')))) == 1
@@ -0,0 +1,75 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+import pytest
+from types import SimpleNamespace
+from app.persistence.memory_repository import MemoryRepository
+
+def entity(**attrs):
+    return SimpleNamespace(id=None, **attrs)
+
+@pytest.fixture
+def repo():
+    repo = MemoryRepository(indexes={'email': 'unique', 'city': 'multi', 'price': 'sorted'})
+    for email, city, price in [('a@x.fr', 'Paris', 120), ('b@x.fr', 'Lyon', 60),
+                               ('c@x.fr', 'Paris', 80), ('d@x.fr', 'Nice', 300)]:
+        repo.add(entity(email=email, city=city, price=price))
+    return repo
+
+def test_unique_index_lookup(repo):
+    assert repo.get_by_attribute('email', 'c@x.fr').price == 80
+    assert repo.get_by_attribute('email', 'zzz@x.fr') is None
+
+def test_unique_index_rejects_duplicates_without_side_effect(repo):
+    with pytest.raises(ValueError):
+        repo.add(entity(email='a@x.fr', city='Brest', price=1))
+    assert len(repo.get_all()) == 4
+    lyon = repo.get_by_attribute('email', 'b@x.fr')
+    with pytest.raises(ValueError):
+        repo.update(lyon.id, {'email': 'a@x.fr', 'price': 1})
+    assert (lyon.email, lyon.price) == ('b@x.fr', 60)
+
+def test_multi_index_keeps_insertion_order(repo):
+    assert [o.email for o in repo.filter_by_attribute('city', 'Paris')] == ['a@x.fr', 'c@x.fr']
+    assert repo.filter_by_attribute('city', 'Brest') == []
+
+def test_sorted_index_ranges(repo):
+    assert [o.price for o in repo.range_by_attribute('price', 70, 150)] == [80, 120]
+    assert [o.price for o in repo.range_by_attribute('price', low=100, reverse=True)] == [300, 120]
+    with pytest.raises(ValueError):
+        repo.range_by_attribute('city', 'A', 'Z')
+
+def test_indexes_follow_update_and_delete(repo):
+    paris = repo.get_by_attribute('email', 'a@x.fr')
+    repo.update(paris.id, {'email': 'new@x.fr', 'city': 'Lyon', 'price': 10})
+    assert repo.get_by_attribute('email', 'a@x.fr') is None
+    assert repo.get_by_attribute('email', 'new@x.fr') is paris
+    assert [o.price for o in repo.filter_by_attribute('city', 'Lyon')] == [60, 10]
+    assert repo.range_by_attribute('price', high=50) == [paris]
+    assert repo.delete(paris.id)
+    assert repo.get_by_attribute('email', 'new@x.fr') is None
+    assert repo.range_by_attribute('price', high=50) == []
+    # L'adresse libérée peut être reprise
+    repo.add(entity(email='new@x.fr', city='Brest', price=5))
+
+def test_unindexed_attributes_fall_back_to_scan(repo):
+    repo.add(entity(email='e@x.fr', city=None, price=None))
+    assert repo.get_by_attribute('email', 'e@x.fr').city is None
+    assert [o.email for o in repo.filter_by_attribute('city', None)] == ['e@x.fr']
+    assert repo.get_by_attribute('missing', 1) is None
+
+def test_index_added_after_data(repo):
+    repo.add_index('city', 'multi')
+    repo.add_index('id', 'unique')
+    first = next(iter(repo.get_all()))
+    assert repo.get_by_attribute('id', first.id) is first
+
+def test_get_all_is_a_snapshot(repo):
+    everything = repo.get_all()
+    repo.add(entity(email='f@x.fr', city='Paris', price=1))
+    assert len(everything) == 4
+    # Supprimer pendant le parcours est sans danger
+    for obj in repo.get_all():
+        repo.delete(obj.id)
+    assert repo.get_all() == []
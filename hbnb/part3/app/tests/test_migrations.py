@@ -0,0 +1,88 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+import pytest
+from sqlalchemy import create_engine, inspect, select, text
+from app.models.place import Place, PlaceAmenity
+from app.models.review import Review
+from app.persistence.migrations import migrate, pending_migrations, LATEST_VERSION
+
+# Schéma tel que créé par db.create_all() avant les migrations
+BASELINE_DDL = [
+    """CREATE TABLE users (id VARCHAR(60) NOT NULL, first_name VARCHAR(50) NOT NULL,
+        last_name VARCHAR(50) NOT NULL, email VARCHAR(120) NOT NULL, password_hash VARCHAR(128),
+        is_admin BOOLEAN, created_at DATETIME, updated_at DATETIME, PRIMARY KEY (id), UNIQUE (email))""",
+    """CREATE TABLE amenities (id VARCHAR(60) NOT NULL, name VARCHAR(50) NOT NULL,
+        created_at DATETIME, updated_at DATETIME, PRIMARY KEY (id), UNIQUE (name))""",
+    """CREATE TABLE places (id VARCHAR(60) NOT NULL, title VARCHAR(100) NOT NULL, description TEXT,
+        price FLOAT NOT NULL, latitude FLOAT NOT NULL, longitude FLOAT NOT NULL,
+        owner_id VARCHAR(60) NOT NULL, created_at DATETIME, updated_at DATETIME, PRIMARY KEY (id),
+        FOREIGN KEY(owner_id) REFERENCES users (id))""",
+    """CREATE TABLE place_amenity (place_id VARCHAR(60) NOT NULL, amenity_id VARCHAR(60) NOT NULL,
+        PRIMARY KEY (place_id, amenity_id), FOREIGN KEY(place_id) REFERENCES places (id),
+        FOREIGN KEY(amenity_id) REFERENCES amenities (id))""",
+    """CREATE TABLE reviews (id VARCHAR(60) NOT NULL, text TEXT NOT NULL, rating INTEGER NOT NULL,
+        place_id VARCHAR(60) NOT NULL, user_id VARCHAR(60) NOT NULL, created_at DATETIME,
+        updated_at DATETIME, PRIMARY KEY (id), FOREIGN KEY(place_id) REFERENCES places (id),
+        FOREIGN KEY(user_id) REFERENCES users (id))""",
+]
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'hbnb.db'}")
+    yield engine
+    engine.dispose()
+
+def test_new_database_is_created_at_latest_version(engine):
+    applied = migrate(engine)
+    assert [version for version, _, _ in applied][-1] == LATEST_VERSION
+    assert pending_migrations(engine) == []
+    indexes = {i['name'] for i in inspect(engine).get_indexes('reviews')}
+    assert {'ix_reviews_user_id', 'ix_reviews_place_id_created_at'} <= indexes
+
+def test_existing_database_is_upgraded(engine):
+    with engine.begin() as conn:
+        for ddl in BASELINE_DDL:
+            conn.execute(text(ddl))
+        conn.execute(text("INSERT INTO users (id, first_name, last_name, email) VALUES ('u', 'A', 'B', 'a@b.c')"))
+        conn.execute(text("INSERT INTO places (id, title, price, latitude, longitude, owner_id) "
+                          "VALUES ('p', 'Loft', 80, 48.853, 2.3499, 'u')"))
+        conn.execute(text("INSERT INTO reviews (id, text, rating, place_id, user_id) VALUES "
+                          "('r1', 'ok', 5, 'p', 'u'), ('r2', 'bof', 2, 'p', 'u')"))
+    assert len(pending_migrations(engine)) == LATEST_VERSION
+    migrate(engine)
+    assert pending_migrations(engine) == []
+    with engine.connect() as conn:
+        row = conn.execute(text(
+            "SELECT geohash, review_count, rating_sum, rating_avg FROM places WHERE id = 'p'")).one()
+    assert row.geohash.startswith('u09tv')
+    assert (row.review_count, row.rating_sum, row.rating_avg) == (2, 7, 3.5)
+    with engine.connect() as conn:
+        # Places existantes indexées en plein texte
+        assert conn.execute(text("SELECT rowid FROM places_fts WHERE places_fts MATCH 'lof*'")).all()
+    # Une seconde exécution ne fait rien
+    assert migrate(engine) == []
+
+def query_plan(engine, statement):
+    sql = str(statement.compile(dialect=engine.dialect, compile_kwargs={'literal_binds': True}))
+    with engine.connect() as conn:
+        return [row[-1] for row in conn.execute(text('EXPLAIN QUERY PLAN ' + sql))]
+
+@pytest.mark.parametrize('statement', [
+    # ReviewRepository.get_by_place / PlaceReviewList
+    select(Review).where(Review.place_id == 'p'),
+    # Chronologie des reviews d'une place
+    select(Review).where(Review.place_id == 'p').order_by(Review.created_at),
+    select(Review).where(Review.user_id == 'u'),
+    # Places d'un propriétaire
+    select(Place).where(Place.owner_id == 'u'),
+    # Recherche inverse : places proposant une amenity
+    select(PlaceAmenity.place_id).where(PlaceAmenity.amenity_id == 'a'),
+], ids=['reviews_by_place', 'review_timeline', 'reviews_by_user', 'places_by_owner', 'places_by_amenity'])
+def test_hot_queries_use_an_index(engine, statement):
+    migrate(engine)
+    plan = query_plan(engine, statement)
+    assert any('USING INDEX' in step or 'USING COVERING INDEX' in step for step in plan), plan
+    assert not any(step.startswith('SCAN') for step in plan), plan
+    assert not any('TEMP B-TREE' in step for step in plan), plan
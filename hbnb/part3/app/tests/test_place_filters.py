@@ -0,0 +1,130 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from urllib.parse import quote
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import text
+from app import create_app, db
+from app.models.user import User
+from app.models.amenity import Amenity
+from app.services.facade import HBnBFacade
+from app.services.place_filters import PlaceFilter, amenity_sets
+
+@pytest.fixture
+def client():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    app.config['JWT_SECRET_KEY'] = 'test'
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            alice = User(first_name='Alice', last_name='Doe', email='alice@example.com')
+            bob = User(first_name='Bob', last_name='Smith', email='bob@example.com', is_admin=True)
+            alice.set_password('password')
+            bob.set_password('password')
+            wifi, pool, sauna = Amenity(name='Wifi'), Amenity(name='Pool'), Amenity(name='Sauna')
+            db.session.add_all([alice, bob, wifi, pool, sauna])
+            db.session.commit()
+            client.ids = {'alice': alice.id, 'bob': bob.id, 'wifi': wifi.id, 'pool': pool.id}
+            client.token = create_access_token(identity=bob.id, additional_claims={'is_admin': True})
+            facade = HBnBFacade()
+            for title, price, owner, amenities in [
+                ('Loft', 100.0, alice, [wifi.id, pool.id]),
+                ('Studio', 60.0, alice, [wifi.id]),
+                ('Villa', 300.0, bob, [wifi.id, pool.id, sauna.id]),
+                ('Chalet', 110.0, bob, [pool.id]),
+            ]:
+                facade.create_place({'title': title, 'price': price, 'latitude': 45.0, 'longitude': 5.0,
+                                     'owner_id': owner.id, 'amenities': amenities})
+        yield client
+        with client.application.app_context():
+            db.drop_all()
+
+def titles(client, query):
+    resp = client.get(f'/api/v1/places/?{query}')
+    assert resp.status_code == 200, resp.data
+    return sorted(item['title'] for item in resp.get_json()['items'])
+
+def filtered(client, expression):
+    return titles(client, f'filter={quote(expression)}')
+
+def test_parse_filter():
+    criteria = PlaceFilter.parse('price<120; amenities=Wifi, Pool ;rating>=4;owner=u1')
+    assert criteria.comparisons == [('price', '<', 120.0), ('rating', '>=', 4.0)]
+    assert criteria.amenities == ['Wifi', 'Pool']
+    assert criteria.owner_id == 'u1'
+    for invalid in ('price<cheap', 'colour=red', 'amenities>Wifi', 'price'):
+        with pytest.raises(ValueError):
+            PlaceFilter.parse(invalid)
+
+def test_price_and_amenities_by_name(client):
+    assert filtered(client, 'price<120;amenities=wifi,Pool') == ['Loft']
+    assert filtered(client, 'price<=110') == ['Chalet', 'Loft', 'Studio']
+    assert filtered(client, f"amenities={client.ids['pool']}") == ['Chalet', 'Loft', 'Villa']
+    assert filtered(client, 'amenities=Wifi,Pool,Sauna') == ['Villa']
+    assert filtered(client, 'amenities=Wifi,Jacuzzi') == []
+
+def test_owner_and_rating(client):
+    assert filtered(client, f"owner={client.ids['bob']}") == ['Chalet', 'Villa']
+    assert titles(client, f"owner_id={client.ids['alice']}&filter={quote('price>70')}") == ['Loft']
+    assert filtered(client, 'rating>=4') == []
+
+def test_filter_combines_with_simple_parameters(client):
+    assert titles(client, f"max_price=200&amenities={client.ids['wifi']}&filter=amenities%3DPool") == ['Loft']
+
+def test_invalid_filter_is_rejected(client):
+    resp = client.get('/api/v1/places/?filter=' + quote('price<cheap'))
+    assert resp.status_code == 400
+    assert 'price' in resp.get_json()['message']
+
+def test_dense_intersection_uses_grouped_subquery(client):
+    amenity_sets.max_in_ids = 0
+    assert filtered(client, 'amenities=Wifi,Pool') == ['Loft', 'Villa']
+    assert filtered(client, 'price>200;amenities=Pool') == ['Villa']
+
+def test_new_links_are_visible_at_once(client):
+    assert filtered(client, 'amenities=Sauna') == ['Villa']
+    headers = {'Authorization': f'Bearer {client.token}'}
+    resp = client.post('/api/v1/places/', headers=headers, json={
+        'title': 'Spa', 'price': 90.0, 'latitude': 1.0, 'longitude': 1.0,
+        'owner_id': client.ids['bob'], 'amenities': [client.ids['wifi']]})
+    assert resp.status_code == 201
+    place_id = resp.get_json()['id']
+    with client.application.app_context():
+        sauna_id = Amenity.query.filter_by(name='Sauna').one().id
+    resp = client.put(f'/api/v1/places/{place_id}', headers=headers, json={
+        'title': 'Spa', 'price': 90.0, 'latitude': 1.0, 'longitude': 1.0,
+        'owner_id': client.ids['bob'], 'amenities': [sauna_id]})
+    assert resp.status_code == 200, resp.data
+    assert filtered(client, 'amenities=Sauna') == ['Spa', 'Villa']
+    assert filtered(client, 'amenities=Wifi') == ['Loft', 'Studio', 'Villa']
+
+def test_links_written_outside_the_facade_are_seen(client):
+    # Ensembles chargés, puis lien ajouté en SQL brut (autre process, script)
+    assert filtered(client, 'amenities=Sauna') == ['Villa']
+    with client.application.app_context():
+        loaded = amenity_sets.current(db.session)
+        assert loaded is not None
+        db.session.execute(text(
+            "INSERT INTO place_amenity (place_id, amenity_id) "
+            "SELECT p.id, a.id FROM places p, amenities a WHERE p.title = 'Studio' AND a.name = 'Sauna'"))
+        db.session.commit()
+    assert filtered(client, 'amenities=Sauna') == ['Studio', 'Villa']
+    assert filtered(client, 'amenities=Wifi,Sauna') == ['Studio', 'Villa']
+
+def test_stale_sets_fall_back_to_sql_until_reloaded(client, monkeypatch):
+    assert filtered(client, 'amenities=Pool') == ['Chalet', 'Loft', 'Villa']
+    monkeypatch.setattr(amenity_sets, 'reload_interval', 3600)
+    with client.application.app_context():
+        db.session.execute(text(
+            "DELETE FROM place_amenity WHERE place_id = (SELECT id FROM places WHERE title = 'Chalet')"))
+        db.session.commit()
+        # Rechargement pas encore dû : ensembles périmés écartés
+        assert amenity_sets.current(db.session) is None
+    assert filtered(client, 'amenities=Pool') == ['Loft', 'Villa']
+    monkeypatch.setattr(amenity_sets, 'reload_interval', 0)
+    with client.application.app_context():
+        _, _, places = amenity_sets.current(db.session)
+        assert len(places[client.ids['pool']]) == 2
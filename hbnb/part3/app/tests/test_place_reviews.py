@@ -0,0 +1,102 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event
+from app import create_app, db
+from app.models.user import User
+from app.models.place import Place
+from app.models.review import Review
+
+RATINGS = [3, 5, 1, 4, 5, 2, 4]
+
+@pytest.fixture
+def client():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['JWT_SECRET_KEY'] = 'test'
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            owner = User(first_name='Bob', last_name='Smith', email='bob@example.com')
+            owner.set_password('password')
+            db.session.add(owner)
+            db.session.flush()
+            busy = Place(title='Busy', price=80.0, latitude=0.0, longitude=0.0, owner_id=owner.id,
+                         review_count=len(RATINGS), rating_sum=sum(RATINGS),
+                         rating_avg=sum(RATINGS) / len(RATINGS))
+            quiet = Place(title='Quiet', price=50.0, latitude=0.0, longitude=0.0, owner_id=owner.id,
+                          created_at=datetime.utcnow() + timedelta(seconds=1))
+            db.session.add_all([busy, quiet])
+            db.session.flush()
+            start = datetime(2024, 1, 1)
+            db.session.add_all([
+                Review(text=f'review {i}', rating=rating, place_id=busy.id, user_id=owner.id,
+                       created_at=start + timedelta(days=i))
+                for i, rating in enumerate(RATINGS)])
+            db.session.commit()
+            client.ids = {'busy': busy.id, 'quiet': quiet.id}
+        yield client
+        with app.app_context():
+            db.drop_all()
+
+def get_json(client, url):
+    resp = client.get(url)
+    assert resp.status_code == 200, resp.data
+    return resp.get_json()
+
+def test_reviews_are_paginated_most_recent_first(client):
+    url = f"/api/v1/reviews/places/{client.ids['busy']}/reviews?limit=3"
+    texts = []
+    while url:
+        page = get_json(client, url)
+        assert len(page['items']) <= 3
+        texts += [item['text'] for item in page['items']]
+        cursor = page['next_cursor']
+        url = cursor and f"/api/v1/reviews/places/{client.ids['busy']}/reviews?limit=3&cursor={cursor}"
+    assert texts == [f'review {i}' for i in reversed(range(len(RATINGS)))]
+
+def test_reviews_sorted_by_rating(client):
+    page = get_json(client, f"/api/v1/reviews/places/{client.ids['busy']}/reviews?sort=rating&limit=4")
+    assert [(item['rating'], item['text']) for item in page['items']] == [
+        (5, 'review 4'), (5, 'review 1'), (4, 'review 6'), (4, 'review 3')]
+    rest = get_json(client, f"/api/v1/reviews/places/{client.ids['busy']}/reviews"
+                            f"?sort=rating&cursor={page['next_cursor']}")
+    assert [item['rating'] for item in rest['items']] == [3, 2, 1]
+    assert rest['next_cursor'] is None
+
+def test_place_reviews_errors(client):
+    assert client.get('/api/v1/reviews/places/nope/reviews').status_code == 404
+    assert client.get(f"/api/v1/reviews/places/{client.ids['busy']}/reviews?cursor=bad").status_code == 400
+    assert client.get(f"/api/v1/reviews/places/{client.ids['busy']}/reviews?sort=worst").status_code == 400
+
+def test_place_detail_embeds_latest_reviews_and_next_link(client):
+    place = get_json(client, f"/api/v1/places/{client.ids['busy']}")
+    assert place['review_count'] == len(RATINGS)
+    assert [r['text'] for r in place['reviews']] == ['review 6', 'review 5', 'review 4', 'review 3', 'review 2']
+    rest = get_json(client, place['reviews_next'])
+    assert [item['text'] for item in rest['items']] == ['review 1', 'review 0']
+    quiet = get_json(client, f"/api/v1/places/{client.ids['quiet']}")
+    assert quiet['reviews'] == [] and quiet['reviews_next'] is None
+
+def test_places_list_embeds_latest_reviews_in_one_query(client):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with client.application.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        items = get_json(client, '/api/v1/places/')['items']
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    busy, quiet = items
+    assert len(busy['reviews']) == 5 and busy['reviews_next']
+    assert quiet['reviews'] == [] and quiet['reviews_next'] is None
+    # version, places + owner, liens amenities + amenity, dernières reviews
+    assert len(statements) == 4
@@ -109,3 +109,71 @@ def test_create_place_missing_field(client):
         data = None
     assert data is not None, f"Pas de JSON dans la réponse : {resp.data!r}"
     assert "error" in data or "errors" in data, f"Pas de clé 'error' ou 'errors' dans la réponse : {data}"
+
+def seed_places(client):
+    from app.models.place import Place
+    with client.application.app_context():
+        owner = User(first_name='Geo', last_name='Owner', email='geo@example.com')
+        owner.set_password('password')
+        db.session.add(owner)
+        db.session.flush()
+        for title, lat, lon in [
+            ('Notre-Dame', 48.8530, 2.3499),
+            ('Tour Eiffel', 48.8584, 2.2945),
+            ('Versailles', 48.8049, 2.1204),
+            ('Lyon', 45.7640, 4.8357),
+        ]:
+            db.session.add(Place(title=title, price=100.0, latitude=lat, longitude=lon, owner_id=owner.id))
+        db.session.commit()
+
+def test_search_places_by_radius(client):
+    seed_places(client)
+    resp = client.get('/api/v1/places/search?lat=48.8566&lon=2.3522&radius_km=10')
+    assert resp.status_code == 200, resp.data
+    items = resp.get_json()['items']
+    assert [p['title'] for p in items] == ['Notre-Dame', 'Tour Eiffel']
+    assert items[0]['distance_km'] < items[1]['distance_km'] < 10
+
+def test_search_places_at_the_edge_of_the_radius(client):
+    import math
+    from app.models.place import Place
+    from app.services.geo import EARTH_RADIUS_KM, haversine_km
+    # Plein nord de l'équateur, et point de tangence du cercle avec un
+    # méridien (plus au nord que le centre) : juste à l'intérieur du rayon
+    angle = 499.9 / EARTH_RADIUS_KM
+    edge_lat = math.degrees(math.asin(math.sin(math.radians(60.0)) / math.cos(angle)))
+    edge_lon = math.degrees(math.asin(math.sin(angle) / math.cos(math.radians(60.0))))
+    with client.application.app_context():
+        owner = User(first_name='Edge', last_name='Owner', email='edge@example.com')
+        owner.set_password('password')
+        db.session.add(owner)
+        db.session.flush()
+        db.session.add_all([
+            Place(title='Nord', price=10.0, latitude=math.degrees(99.9 / EARTH_RADIUS_KM), longitude=0.0,
+                  owner_id=owner.id),
+            Place(title='Tangente', price=10.0, latitude=edge_lat, longitude=edge_lon, owner_id=owner.id),
+        ])
+        db.session.commit()
+    assert haversine_km(60.0, 0.0, edge_lat, edge_lon) < 500
+    resp = client.get('/api/v1/places/search?lat=0&lon=0&radius_km=100')
+    assert [p['title'] for p in resp.get_json()['items']] == ['Nord']
+    resp = client.get('/api/v1/places/search?lat=60&lon=0&radius_km=500')
+    assert [p['title'] for p in resp.get_json()['items']] == ['Tangente']
+
+def test_search_places_by_bbox(client):
+    seed_places(client)
+    resp = client.get('/api/v1/places/search?min_lat=48.7&min_lon=2.0&max_lat=48.9&max_lon=2.5')
+    assert resp.status_code == 200, resp.data
+    titles = {p['title'] for p in resp.get_json()['items']}
+    assert titles == {'Notre-Dame', 'Tour Eiffel', 'Versailles'}
+
+def test_search_places_requires_area(client):
+    resp = client.get('/api/v1/places/search?lat=48.8')
+    assert resp.status_code == 400
+
+def test_place_geohash_is_indexed(client):
+    from app.models.place import Place
+    seed_places(client)
+    with client.application.app_context():
+        place = Place.query.filter_by(title='Notre-Dame').first()
+        assert place.geohash.startswith('u09tv')
@@ -0,0 +1,227 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+import json
+from contextlib import contextmanager
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from app import create_app, db
+from app.models.user import User
+from app.models.place import Place, PlaceAmenity
+from app.models.amenity import Amenity
+from app.models.review import Review
+from app.services.facade import HBnBFacade
+
+@pytest.fixture
+def client():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['JWT_SECRET_KEY'] = 'test'
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+        yield client
+        with app.app_context():
+            db.drop_all()
+
+@contextmanager
+def count_queries(app):
+    # Compte les requêtes SQL réellement envoyées à la base
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+def seed(app, n, prefix):
+    # n places, chacune avec 2 amenities et 2 reviews
+    with app.app_context():
+        owner = User(first_name='Owner', last_name=prefix, email=f'{prefix}@example.com')
+        owner.set_password('password')
+        db.session.add(owner)
+        amenities = [Amenity(name=f'{prefix}-amenity-{i}') for i in range(2)]
+        db.session.add_all(amenities)
+        db.session.flush()
+        for i in range(n):
+            place = Place(title=f'{prefix} {i}', price=50.0, latitude=0.0,
+                          longitude=0.0, owner_id=owner.id)
+            db.session.add(place)
+            db.session.flush()
+            for amenity in amenities:
+                db.session.add(PlaceAmenity(place_id=place.id, amenity_id=amenity.id))
+            for rating in (4, 5):
+                db.session.add(Review(text='ok', rating=rating, place_id=place.id, user_id=owner.id))
+        db.session.commit()
+        return Place.query.filter(Place.title.like(f'{prefix}%')).first().id
+
+def queries_for(client, url, headers=None):
+    with count_queries(client.application) as statements:
+        resp = client.get(url, headers=headers)
+    assert resp.status_code == 200, resp.data
+    return len(statements)
+
+def admin_headers(client):
+    with client.application.app_context():
+        admin = User(first_name='Admin', last_name='User', email='admin@example.com', is_admin=True)
+        admin.set_password('password')
+        db.session.add(admin)
+        db.session.commit()
+        token = create_access_token(identity=admin.id, additional_claims={'is_admin': True})
+    return {'Authorization': f'Bearer {token}'}
+
+@pytest.mark.parametrize('url', [
+    '/api/v1/places/',
+    '/api/v1/amenities/',
+    '/api/v1/reviews/',
+])
+def test_list_query_count_is_constant(client, url):
+    seed(client.application, 1, 'small')
+    small = queries_for(client, url)
+    seed(client.application, 20, 'large')
+    large = queries_for(client, url)
+    assert large == small
+
+def test_places_list_uses_place_details_plan(client):
+    seed(client.application, 10, 'paris')
+    # version (ETag), places + owner, liens amenities + amenity, reviews
+    assert queries_for(client, '/api/v1/places/') == 4
+
+def test_place_fieldset_is_pushed_down(client):
+    seed(client.application, 5, 'tiles')
+    with count_queries(client.application) as statements:
+        resp = client.get('/api/v1/places/?fields=price,latitude,longitude')
+    assert resp.status_code == 200, resp.data
+    items = resp.get_json()['items']
+    assert len(items) == 5
+    assert all(set(item) == {'id', 'price', 'latitude', 'longitude'} for item in items)
+    # version (ETag) puis une seule requête, sans description ni relations
+    assert len(statements) == 2
+    assert 'description' not in statements[1]
+    assert 'users' not in statements[1] and 'reviews' not in statements[1]
+
+def test_place_include_loads_only_requested_relations(client):
+    seed(client.application, 5, 'inc')
+    with count_queries(client.application) as statements:
+        resp = client.get('/api/v1/places/?include=owner')
+    assert resp.status_code == 200, resp.data
+    item = resp.get_json()['items'][0]
+    assert 'owner' in item and 'title' in item
+    assert 'amenities' not in item and 'reviews' not in item
+    # version, places + owner
+    assert len(statements) == 2
+
+def test_place_detail_fieldset_and_unknown_fields(client):
+    place_id = seed(client.application, 1, 'one')
+    resp = client.get(f'/api/v1/places/{place_id}?fields=title,reviews')
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert set(body) == {'id', 'title', 'reviews', 'reviews_next'} and len(body['reviews']) == 2
+    assert body['reviews_next'] is None
+    resp = client.get('/api/v1/places/?fields=title,secret')
+    assert resp.status_code == 400
+    assert 'secret' in resp.get_json()['message']
+
+def test_place_detail_query_count(client):
+    place_id = seed(client.application, 3, 'lyon')
+    assert queries_for(client, f'/api/v1/places/{place_id}') == 4
+
+def test_place_reviews_query_count(client):
+    place_id = seed(client.application, 3, 'nice')
+    # version (place + reviews), place, reviews
+    assert queries_for(client, f'/api/v1/reviews/places/{place_id}/reviews') == 4
+
+def test_users_list_query_count(client):
+    headers = admin_headers(client)
+    # Le premier appel charge l'instantané de l'admin (révocation), gardé ensuite en mémoire
+    client.get('/api/v1/users/', headers=headers)
+    seed(client.application, 1, 'a')
+    small = queries_for(client, '/api/v1/users/', headers=headers)
+    seed(client.application, 1, 'b')
+    seed(client.application, 1, 'c')
+    assert queries_for(client, '/api/v1/users/', headers=headers) == small == 2
+
+def test_places_export_streams_in_batches(client):
+    seed(client.application, 25, 'export')
+    with count_queries(client.application) as statements:
+        resp = client.get('/api/v1/places/export')
+        assert resp.is_streamed
+        lines = resp.get_data(as_text=True).splitlines()
+    assert resp.mimetype == 'application/x-ndjson'
+    places = [json.loads(line) for line in lines]
+    assert len(places) == 25
+    assert all(len(p['reviews']) == 2 and len(p['amenities']) == 2 for p in places)
+    # un lot : places + owner, liens amenities + amenity, reviews
+    assert len(statements) == 3
+
+    with client.application.app_context():
+        with count_queries(client.application) as statements:
+            exported = list(HBnBFacade().iter_all('place', shape='place.details', batch_size=10))
+        assert len(exported) == 25
+        # 3 lots de 10 : 1 requête de places + 2 selectin par lot
+        assert len(statements) == 1 + 3 * 2
+
+def test_users_export_requires_admin(client):
+    headers = admin_headers(client)
+    resp = client.get('/api/v1/users/export', headers=headers)
+    assert resp.status_code == 200
+    users = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert [u['email'] for u in users] == ['admin@example.com']
+    with client.application.app_context():
+        token = create_access_token(identity='someone')
+    resp = client.get('/api/v1/users/export', headers={'Authorization': f'Bearer {token}'})
+    assert resp.status_code == 403
+
+def writes(statements):
+    return [s.split()[0] for s in statements if s.split()[0] in ('INSERT', 'DELETE')]
+
+def test_place_amenities_are_resolved_in_one_query(client):
+    headers = admin_headers(client)
+    with client.application.app_context():
+        owner_id = User.query.first().id
+        amenities = [Amenity(name=f'Amenity {i}') for i in range(20)]
+        db.session.add_all(amenities)
+        db.session.commit()
+        ids = [a.id for a in amenities]
+    payload = {'title': 'Loft', 'price': 80.0, 'latitude': 1.0, 'longitude': 1.0,
+               'owner_id': owner_id, 'amenities': ids[:10]}
+    with count_queries(client.application) as statements:
+        resp = client.post('/api/v1/places/', json=payload, headers=headers)
+    assert resp.status_code == 201, resp.data
+    selects = [s for s in statements if s.startswith('SELECT') and 'amenities' in s]
+    assert len(selects) == 1
+    # place + tous les liens en un executemany
+    assert writes(statements) == ['INSERT', 'INSERT']
+    place_id = resp.get_json()['id']
+
+    with count_queries(client.application) as statements:
+        resp = client.put(f'/api/v1/places/{place_id}', json=payload, headers=headers)
+    assert resp.status_code == 200, resp.data
+    assert writes(statements) == []
+
+    payload['amenities'] = ids[5:15]
+    with count_queries(client.application) as statements:
+        resp = client.put(f'/api/v1/places/{place_id}', json=payload, headers=headers)
+    assert writes(statements) == ['DELETE', 'INSERT']
+    assert sorted(a['id'] for a in resp.get_json()['amenities']) == sorted(ids[5:15])
+
+def test_unknown_amenities_are_reported_together(client):
+    headers = admin_headers(client)
+    with client.application.app_context():
+        owner_id = User.query.first().id
+    resp = client.post('/api/v1/places/', json={
+        'title': 'Loft', 'price': 80.0, 'latitude': 1.0, 'longitude': 1.0,
+        'owner_id': owner_id, 'amenities': ['ghost-1', 'ghost-2']
+    }, headers=headers)
+    assert resp.status_code == 400
+    assert 'ghost-1, ghost-2' in resp.get_json()['error']
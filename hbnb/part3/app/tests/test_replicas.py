@@ -0,0 +1,189 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+import sqlite3
+import time
+import pytest
+from sqlalchemy import insert, text
+from app import create_app, db
+from app.extensions import replicas
+from app.models.user import User
+from app.persistence.replicas import heartbeats
+from app.persistence.unit_of_work import unit_of_work
+from app.services.facade import HBnBFacade
+
+facade = HBnBFacade()
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    from config import TestingConfig
+    primary, replica = tmp_path / 'primary.db', tmp_path / 'replica.db'
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{primary}')
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_REPLICA_URIS', [f'sqlite:///{replica}'])
+    # Mesures du retard pilotées par les tests (replicas.check())
+    monkeypatch.setattr(TestingConfig, 'REPLICA_LAG_MONITOR', False)
+    app = create_app('testing')
+    app.config['JWT_SECRET_KEY'] = 'test'
+    with app.app_context():
+        db.create_all()
+        user = User(first_name='Alice', last_name='Doe', email='alice@example.com')
+        user.set_password('password')
+        db.session.add(user)
+        db.session.commit()
+        app.user_id = user.id
+
+    def replicate():
+        _copy(primary, replica)
+        replicas.check()
+    app.replicate = replicate
+    app.replicate()
+    yield app
+    replicas.dispose()
+
+
+def _copy(source, target):
+    # Réplication simulée : copie cohérente de la principale
+    with sqlite3.connect(source) as src, sqlite3.connect(target) as dst:
+        src.backup(dst)
+    src.close()
+    dst.close()
+
+
+def _on_primary(app, sql, **params):
+    with app.app_context():
+        db.session.execute(text(sql), params)
+        db.session.commit()
+
+
+def test_reads_go_to_replica_and_writes_to_primary(app):
+    _on_primary(app, "UPDATE users SET first_name = 'Primary' WHERE id = :id", id=app.user_id)
+    with app.app_context():
+        assert facade.get_user(app.user_id).first_name == 'Alice'
+    with app.app_context():
+        # update_user relit l'utilisateur sur la principale avant d'écrire
+        facade.update_user(app.user_id, {'last_name': 'Smith'})
+    with app.app_context():
+        row = db.session.execute(text('SELECT first_name, last_name FROM users')).one()
+        assert tuple(row) == ('Primary', 'Smith')
+
+
+def test_transaction_reads_its_own_writes(app):
+    with app.app_context():
+        with unit_of_work():
+            user = facade.create_user({'first_name': 'Bob', 'last_name': 'Doe',
+                                       'email': 'bob@example.com', 'password': 'password'})
+            assert facade.get_user(user.id) is not None
+
+
+def test_cache_is_filled_from_primary(app):
+    _on_primary(app, "UPDATE users SET first_name = 'Primary' WHERE id = :id", id=app.user_id)
+    with app.app_context():
+        view = facade.get_user_view(app.user_id, lambda user: {'first_name': user.first_name})
+    assert view == {'first_name': 'Primary'}
+
+
+def test_writer_reads_its_writes_for_a_short_window(app):
+    client = app.test_client()
+    token = client.post('/api/v1/auth/login', json={
+        'email': 'alice@example.com', 'password': 'password'}).get_json()['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+    resp = client.post('/api/v1/places/', headers=headers, json={
+        'title': 'Nouveau', 'price': 50, 'latitude': 1.0, 'longitude': 1.0,
+        'owner_id': app.user_id, 'amenities': []})
+    assert resp.status_code == 201
+
+    def titles(headers=None):
+        resp = client.get('/api/v1/places/', headers=headers or {})
+        assert resp.status_code == 200
+        body = resp.get_json()
+        items = body['items'] if isinstance(body, dict) else body
+        return [place['title'] for place in items]
+
+    assert titles(headers) == ['Nouveau']
+    # Les autres clients lisent le réplica, pas encore à jour
+    assert titles() == []
+    app.replicate()
+    assert titles() == ['Nouveau']
+
+
+def test_lagging_replica_falls_back_to_primary(app):
+    _on_primary(app, "UPDATE users SET first_name = 'Primary' WHERE id = :id", id=app.user_id)
+    with app.app_context():
+        assert facade.get_user(app.user_id).first_name == 'Alice'
+    # Un battement vieux de 10 s que le réplica n'a jamais reçu
+    with app.app_context():
+        db.session.execute(insert(heartbeats).values(beat=time.time() - 10))
+        db.session.execute(text('DELETE FROM replica_heartbeats WHERE beat > :t'), {'t': time.time() - 5})
+        db.session.commit()
+    replicas.check()
+    with app.app_context():
+        assert facade.get_user(app.user_id).first_name == 'Primary'
+    app.replicate()
+    with app.app_context():
+        assert facade.get_user(app.user_id).first_name == 'Primary'
+
+
+def test_replica_that_stopped_during_idle_time_is_dropped(app, monkeypatch):
+    # Le réplica cesse de répliquer ; aucune lecture pendant 4 s, mais les
+    # battements continuent (thread de fond, simulé par check())
+    start = time.time()
+    _on_primary(app, "UPDATE users SET first_name = 'Primary' WHERE id = :id", id=app.user_id)
+    for tick in (1, 2, 3, 4):
+        monkeypatch.setattr(replicas, '_wall_clock', lambda: start + tick)
+        replicas.check()
+    with app.app_context():
+        assert facade.get_user(app.user_id).first_name == 'Primary'
+
+
+def test_verdict_ages_between_checks(app, monkeypatch):
+    with app.app_context():
+        assert facade.get_user(app.user_id).first_name == 'Alice'
+    later = time.monotonic() + replicas.max_lag + 1
+    monkeypatch.setattr(replicas, '_clock', lambda: later)
+    _on_primary(app, "UPDATE users SET first_name = 'Primary' WHERE id = :id", id=app.user_id)
+    # Aucune mesure depuis plus de max_lag : le réplica n'est plus présumé à jour
+    with app.app_context():
+        assert facade.get_user(app.user_id).first_name == 'Primary'
+
+
+def test_monitor_beats_without_reads(app):
+    replicas.check_interval = 0.01
+    with app.app_context():
+        before = db.session.execute(text('SELECT COUNT(*) FROM replica_heartbeats')).scalar()
+    replicas.start_monitor()
+    time.sleep(0.2)
+    replicas.stop_monitor()
+    with app.app_context():
+        after = db.session.execute(text('SELECT COUNT(*) FROM replica_heartbeats')).scalar()
+    assert after >= before + 2
+
+
+def test_monitor_starts_on_first_read_in_each_process(app, monkeypatch):
+    replicas.monitor = True
+    assert replicas._monitor is None
+    with app.app_context():
+        facade.get_user(app.user_id)
+    parent, parent_stop = replicas._monitor, replicas._stop
+    assert parent.is_alive()
+    # Worker forké après create_app : son propre thread à la première lecture
+    replicas._after_fork()
+    monkeypatch.setattr(os, 'getpid', lambda: -1)
+    with app.app_context():
+        facade.get_user(app.user_id)
+    assert replicas._monitor is not parent and replicas._monitor.is_alive()
+    replicas.stop_monitor()
+    parent_stop.set()
+    parent.join()
+
+
+def test_workers_share_one_heartbeat_per_period(app):
+    def beats():
+        with app.app_context():
+            return db.session.execute(text('SELECT COUNT(*) FROM replica_heartbeats')).scalar()
+    before = beats()
+    replicas.check_interval = 60.0
+    for _ in range(3):
+        replicas.check()
+    assert beats() == before
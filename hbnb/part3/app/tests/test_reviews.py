@@ -124,3 +124,68 @@ def test_create_review_invalid_rating(client):
         data = None
     assert data is not None, f"Pas de JSON dans la réponse : {resp.data!r}"
     assert "error" in data, f"Pas de clé 'error' dans la réponse : {data}"
+
+def post_review(client, headers, rating):
+    with client.application.app_context():
+        user_id = User.query.filter_by(email='bob@example.com').first().id
+        place_id = Place.query.first().id
+    resp = client.post('/api/v1/reviews/', json={
+        'text': 'Avis', 'rating': rating, 'user_id': user_id, 'place_id': place_id
+    }, headers=headers)
+    assert resp.status_code == 201, resp.data
+    return resp.get_json()['id']
+
+def place_aggregates(client):
+    with client.application.app_context():
+        place = Place.query.first()
+        return place.review_count, place.rating_sum, place.rating_avg
+
+def test_rating_aggregates_follow_review_changes(client):
+    headers = {'Authorization': f'Bearer {get_auth_token(client)}'}
+    first = post_review(client, headers, 5)
+    post_review(client, headers, 2)
+    assert place_aggregates(client) == (2, 7, 3.5)
+
+    resp = client.put(f'/api/v1/reviews/{first}', json={
+        'text': 'Finalement bof', 'rating': 3, 'user_id': 'x', 'place_id': 'x'
+    }, headers=headers)
+    assert resp.status_code == 200, resp.data
+    assert place_aggregates(client) == (2, 5, 2.5)
+
+    resp = client.delete(f'/api/v1/reviews/{first}', headers=headers)
+    assert resp.status_code == 200
+    assert place_aggregates(client) == (1, 2, 2.0)
+
+def test_rebuild_and_check_rating_aggregates(client):
+    from app.services.facade import HBnBFacade
+    headers = {'Authorization': f'Bearer {get_auth_token(client)}'}
+    post_review(client, headers, 4)
+    with client.application.app_context():
+        facade = HBnBFacade()
+        assert facade.check_rating_aggregates() == []
+        place = Place.query.first()
+        place.review_count = 42
+        db.session.commit()
+        mismatches = facade.check_rating_aggregates()
+        assert [m['place_id'] for m in mismatches] == [place.id]
+        assert mismatches[0]['actual'] == {'review_count': 1, 'rating_sum': 4}
+        facade.rebuild_rating_aggregates()
+        assert facade.check_rating_aggregates() == []
+    assert place_aggregates(client) == (1, 4, 4.0)
+
+def test_places_sorted_and_filtered_by_rating(client):
+    headers = {'Authorization': f'Bearer {get_auth_token(client)}'}
+    with client.application.app_context():
+        owner_id = User.query.first().id
+        db.session.add(Place(title='Second', price=50.0, latitude=1.0, longitude=1.0, owner_id=owner_id))
+        db.session.commit()
+    post_review(client, headers, 4)
+    resp = client.get('/api/v1/places/?sort=rating')
+    titles = [p['title'] for p in resp.get_json()['items']]
+    assert titles == ['Test Place', 'Second']
+    resp = client.get('/api/v1/places/?min_rating=3.5')
+    assert [p['title'] for p in resp.get_json()['items']] == ['Test Place']
+    resp = client.get('/api/v1/places/?sort=rating&limit=1')
+    cursor = resp.get_json()['next_cursor']
+    resp = client.get(f'/api/v1/places/?sort=rating&limit=1&cursor={cursor}')
+    assert [p['title'] for p in resp.get_json()['items']] == ['Second']
@@ -0,0 +1,82 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+import pytest
+from app import create_app, db
+from app.api.v1.amenities import amenity_page_model
+from app.api.v1.pagination import page_to_dict
+from app.api.v1.places import place_page_model
+from app.api.v1.reviews import review_page_model
+from app.api.v1.serializers import serializer_for
+from app.models.user import User
+from app.models.place import Place, PlaceAmenity
+from app.models.amenity import Amenity
+from app.models.review import Review
+from app.services.facade import HBnBFacade
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.test_request_context():
+        db.create_all()
+        owner = User(first_name='Bob', last_name='Smith', email='bob@example.com')
+        owner.set_password('password')
+        db.session.add(owner)
+        amenities = [Amenity(name=name) for name in ('Wifi', 'Pool', 'Sauna')]
+        db.session.add_all(amenities)
+        db.session.flush()
+        for i in range(7):
+            place = Place(title=f'Loft {i}', description='Vue sur le lac', price=50.0 + i,
+                          latitude=1.0, longitude=2.0, owner_id=owner.id)
+            db.session.add(place)
+            db.session.flush()
+            db.session.add_all(PlaceAmenity(place_id=place.id, amenity_id=a.id) for a in amenities[:i % 3])
+            db.session.add_all(Review(text=f'avis {j}', rating=1 + j % 5, place_id=place.id, user_id=owner.id)
+                               for j in range(i))
+        db.session.commit()
+        db.session.expunge_all()
+        yield app
+        db.drop_all()
+
+def both_shapes(read, model, orm_shape, **kwargs):
+    # Même page lue en objets ORM puis en tuples, sérialisée par le même serializer
+    serialize = serializer_for(model)
+    orm = serialize(page_to_dict(*read(shape=orm_shape, **kwargs)))
+    db.session.expunge_all()
+    rows = serialize(page_to_dict(*read(shape=f'{orm_shape.split(".")[0]}.rows', **kwargs)))
+    return orm, rows
+
+@pytest.mark.parametrize('read, model, shape', [
+    ('get_amenities_page', amenity_page_model, 'amenity'),
+    ('get_reviews_page', review_page_model, 'review'),
+    ('get_places_page', place_page_model, 'place.document'),
+])
+def test_rows_serialize_like_orm_objects(app, read, model, shape):
+    orm, rows = both_shapes(getattr(HBnBFacade(), read), model, shape, limit=2)
+    assert rows == orm
+    assert len(rows['items']) == 2 and rows['next_cursor']
+
+def test_rows_follow_sorts_fieldsets_and_search(app):
+    facade = HBnBFacade()
+    _, rows = both_shapes(facade.get_places_page, place_page_model, 'place.document', limit=3, sort='rating')
+    assert rows['items'][0]['rating_avg'] >= rows['items'][-1]['rating_avg']
+    orm, rows = both_shapes(facade.get_places_page, place_page_model, 'place.document', q='lac')
+    assert rows == orm and len(rows['items']) == 7
+    places, _ = facade.get_places_page(shape='place.rows', fields=frozenset({'id', 'price', 'owner'}))
+    assert places[0].owner.first_name == 'Bob'
+    assert not hasattr(places[0], 'description')
+
+def test_rows_leave_the_session_empty(app):
+    facade = HBnBFacade()
+    place_id = Place.query.first().id
+    db.session.expunge_all()
+    facade.get_amenities_page(shape='amenity.rows')
+    facade.get_reviews_page(shape='review.rows')
+    facade.get_places_page(shape='place.rows')
+    facade.get_place_reviews_page(place_id, shape='review.rows')
+    assert len(db.session.identity_map) == 0
+    places, _ = facade.get_places_page(shape='place.document')
+    assert len(db.session.identity_map) > 0
@@ -0,0 +1,98 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from types import SimpleNamespace
+import pytest
+from flask_restx import Model, fields, marshal
+from app import create_app, db
+from app.api.v1 import serializers
+from app.api.v1.serializers import compile_serializer, serializer_for
+from app.services.cache import LRUCache
+from app.models.user import User
+from app.models.place import Place
+
+author = Model('Author', {'id': fields.String(), 'name': fields.String(attribute='full_name')})
+
+post = Model('Post', {
+    'id': fields.String(),
+    'views': fields.Integer(),
+    'score': fields.Float(default=0.0),
+    'draft': fields.Boolean(),
+    'author': fields.Nested(author),
+    'editor': fields.Nested(author, allow_null=True),
+    'tags': fields.List(fields.String),
+    'comments': fields.List(fields.Nested(author), attribute=lambda p: p.replies),
+    'city': fields.String(attribute='place.city'),
+})
+
+def sample():
+    writer = SimpleNamespace(id=7, full_name='Ada')
+    return SimpleNamespace(id=1, views='12', score=None, draft=0, author=writer, editor=None,
+                           tags=['a', 2], replies=[writer], place=SimpleNamespace(city='Lyon'))
+
+def test_compiled_matches_marshal_for_objects():
+    obj = sample()
+    assert compile_serializer(post)(obj) == marshal(obj, post)
+    missing = SimpleNamespace(id=2, views=None, author=None, replies=[], place=None)
+    assert compile_serializer(post)(missing) == marshal(missing, post)
+
+def test_dicts_are_read_by_output_name():
+    document = compile_serializer(post)(sample())
+    assert serializer_for(post)(document) == document
+
+def test_fieldset_limits_the_fields_read():
+    class Strict(SimpleNamespace):
+        def __getattr__(self, name):
+            raise AssertionError(f'{name} should not be read')
+    assert serializer_for(post, frozenset({'id', 'views'}))(Strict(id=3, views=4)) == {'id': '3', 'views': 4}
+    page = Model('PostPage', {'items': fields.List(fields.Nested(post)), 'next_cursor': fields.String()})
+    out = serializer_for(page, frozenset({'id'}), items='items')({'items': [Strict(id=5)], 'next_cursor': None})
+    assert out == {'items': [{'id': '5'}], 'next_cursor': None}
+
+def test_compiled_cache_is_canonical_and_bounded(monkeypatch):
+    monkeypatch.setattr(serializers, '_compiled', LRUCache(2, ttl=0))
+    first = serializer_for(post, frozenset({'id', 'views'}))
+    # Même rendu : même serializer, quels que soient l'ordre ou les noms inconnus
+    assert serializer_for(post, ['views', 'id', 'unknown']) is first
+    for names in ({'id'}, {'views'}):
+        serializer_for(post, frozenset(names))
+    assert serializer_for(post, frozenset({'id', 'views'})) is not first
+
+@pytest.fixture
+def client():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            owner = User(first_name='Bob', last_name='Smith', email='bob@example.com')
+            owner.set_password('password')
+            db.session.add(owner)
+            db.session.flush()
+            db.session.add(Place(title='Loft', price=80.0, latitude=1.0, longitude=2.0, owner_id=owner.id))
+            db.session.commit()
+        yield client
+        with app.app_context():
+            db.drop_all()
+
+def test_x_fields_mask_is_still_honoured(client):
+    resp = client.get('/api/v1/amenities/', headers={'X-Fields': 'next_cursor'})
+    assert resp.get_json() == {'next_cursor': None}
+    resp = client.get('/api/v1/places/', headers={'X-Fields': 'items{title,owner{first_name}}'})
+    assert resp.get_json() == {'items': [{'title': 'Loft', 'owner': {'first_name': 'Bob'}}]}
+
+def test_swagger_still_documents_the_models(client):
+    spec = client.get('/swagger.json').get_json()
+    get_amenities = spec['paths']['/api/v1/amenities/']['get']
+    assert get_amenities['responses']['200']['schema']['$ref'] == '#/definitions/AmenityPage'
+    assert any(param['name'] == 'X-Fields' for param in get_amenities['parameters'])
+    assert 'reviews_next' in spec['definitions']['PlaceOut']['properties']
+
+def test_x_fields_mask_on_cached_document(client):
+    with client.application.app_context():
+        place_id = Place.query.one().id
+    client.get(f'/api/v1/places/{place_id}')
+    resp = client.get(f'/api/v1/places/{place_id}', headers={'X-Fields': 'title,amenities'})
+    assert resp.get_json() == {'title': 'Loft', 'amenities': []}
@@ -0,0 +1,38 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from sqlalchemy import text
+from app import create_app, db
+from app.persistence.storage import engine_options
+
+def test_testing_config_database_is_not_overridden():
+    app = create_app('testing')
+    with app.app_context():
+        assert db.engine.url.database in (None, '', ':memory:')
+
+def test_sqlite_file_gets_the_storage_profile(tmp_path, monkeypatch):
+    from config import TestingConfig
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'hbnb.db'}")
+    app = create_app('testing')
+    with app.app_context():
+        assert db.engine.pool.size() == app.config['DB_POOL_SIZE']
+        with db.engine.connect() as conn:
+            pragma = lambda name: conn.execute(text(f'PRAGMA {name}')).scalar()
+            assert pragma('journal_mode') == 'wal'
+            assert pragma('synchronous') == 1  # NORMAL
+            assert pragma('busy_timeout') == 5000
+            assert pragma('cache_size') == -64000
+            assert pragma('mmap_size') == 268435456
+
+def test_engine_options_per_backend():
+    base = {'DB_POOL_SIZE': 7, 'DB_MAX_OVERFLOW': 3, 'DB_STATEMENT_CACHE_SIZE': 64}
+    memory = engine_options({**base, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'})
+    assert 'pool_size' not in memory
+    assert memory['connect_args'] == {'cached_statements': 64}
+    server = engine_options({**base, 'SQLALCHEMY_DATABASE_URI': 'postgresql://u:p@db/hbnb'})
+    assert (server['pool_size'], server['max_overflow'], server['pool_pre_ping']) == (7, 3, True)
+    assert 'connect_args' not in server
+    explicit = engine_options({**base, 'SQLALCHEMY_DATABASE_URI': 'postgresql://db/hbnb',
+                               'SQLALCHEMY_ENGINE_OPTIONS': {'pool_size': 1}})
+    assert explicit['pool_size'] == 1
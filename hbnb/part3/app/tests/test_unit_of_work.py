@@ -0,0 +1,109 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+import pytest
+from contextlib import contextmanager
+from sqlalchemy import event
+from app import create_app, db
+from app.extensions import cache
+from app.models.amenity import Amenity
+from app.models.user import User
+from app.persistence.sqlalchemy_repository import SQLAlchemyRepository
+from app.persistence.unit_of_work import unit_of_work, after_commit
+from app.services.facade import HBnBFacade
+from app.services.cache import amenity_key
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@contextmanager
+def recorded(engine):
+    commits, statements = [], []
+    on_commit = lambda conn: commits.append(conn)
+    on_execute = lambda conn, cursor, statement, *args: statements.append(statement.split()[0])
+    event.listen(engine, 'commit', on_commit)
+    event.listen(engine, 'before_cursor_execute', on_execute)
+    try:
+        yield commits, statements
+    finally:
+        event.remove(engine, 'commit', on_commit)
+        event.remove(engine, 'before_cursor_execute', on_execute)
+
+def names():
+    return sorted(name for name, in db.session.query(Amenity.name))
+
+def test_operations_commit_once_per_unit_of_work(app):
+    facade = HBnBFacade()
+    with recorded(db.engine) as (commits, _):
+        with unit_of_work():
+            wifi = facade.create_amenity({'name': 'Wifi'})
+            facade.create_amenity({'name': 'Pool'})
+            with unit_of_work():
+                facade.update_amenity(wifi.id, {'name': 'Wi-Fi'})
+            assert commits == []
+    assert len(commits) == 1
+    assert names() == ['Pool', 'Wi-Fi']
+
+def test_failure_rolls_back_the_whole_unit(app):
+    facade = HBnBFacade()
+    wifi = facade.create_amenity({'name': 'Wifi'})
+    cache.set(amenity_key(wifi.id), {'name': 'Wifi'})
+    with pytest.raises(ValueError):
+        with unit_of_work():
+            facade.update_amenity(wifi.id, {'name': 'Wi-Fi'})
+            facade.create_amenity({'name': 'Pool'})
+            facade.create_amenity({'name': ''})
+    assert names() == ['Wifi']
+    # Invalidation abandonnée avec la transaction
+    assert cache.get(amenity_key(wifi.id)) == {'name': 'Wifi'}
+
+def test_after_commit_waits_for_the_outer_commit(app):
+    ran = []
+    with unit_of_work():
+        after_commit(lambda: ran.append('done'))
+        assert ran == []
+    assert ran == ['done']
+    after_commit(lambda: ran.append('now'))
+    assert ran == ['done', 'now']
+
+def test_request_is_one_transaction(app):
+    def create_then_fail():
+        HBnBFacade().create_amenity({'name': 'Sauna'})
+        return {'error': 'later failure'}, 400
+
+    def create_two():
+        HBnBFacade().create_amenity({'name': 'Wifi'})
+        HBnBFacade().create_amenity({'name': 'Pool'})
+        return {}, 201
+
+    app.add_url_rule('/test/fail', 'fail', create_then_fail, methods=['POST'])
+    app.add_url_rule('/test/ok', 'ok', create_two, methods=['POST'])
+    client = app.test_client()
+    with recorded(db.engine) as (commits, _):
+        assert client.post('/test/ok').status_code == 201
+    assert len(commits) == 1
+    assert client.post('/test/fail').status_code == 400
+    assert names() == ['Pool', 'Wifi']
+
+def test_bulk_methods_issue_one_statement_each(app):
+    repo = SQLAlchemyRepository(User)
+    with recorded(db.engine) as (_, statements):
+        ids = repo.add_many({'first_name': 'U', 'last_name': str(i), 'email': f'u{i}@x.fr'} for i in range(50))
+    assert statements == ['INSERT']
+    assert len(set(ids)) == 50
+    with recorded(db.engine) as (_, statements):
+        assert repo.update_many(ids[:10], {'is_admin': True}) == 10
+    assert statements == ['UPDATE']
+    with recorded(db.engine) as (_, statements):
+        assert repo.delete_many(ids[10:]) == 40
+    assert statements == ['DELETE']
+    assert [user.is_admin for user in User.query.all()] == [True] * 10
@@ -0,0 +1,112 @@
+"""Latence de la recherche plein texte des places (GET /places/?q=...).
+
+Première page de 20 places, triée par pertinence (BM25) ou par date,
+seule ou combinée à un filtre de prix ; index FTS5 reconstruit après le
+chargement, comme par la migration 0007.
+
+    python benchmarks/fulltext.py --places 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import insert, text
+from app import create_app, db
+from app.models.place import Place
+from app.models.user import User
+from app.persistence.migrations import migrate
+from app.services import fulltext
+from app.services.facade import HBnBFacade
+
+OWNERS = 1000
+RUNS = 30
+
+CITIES = ('Paris Lyon Marseille Nice Bordeaux Lille Nantes Rennes Annecy Biarritz Chamonix Strasbourg '
+          'Toulouse Montpellier Grenoble Dijon').split()
+KINDS = 'Loft Studio Villa Chalet Appartement Maison Cabane Péniche'.split()
+WORDS = ('calme lumineux proche centre gare plage vue jardin terrasse cuisine équipée propre accueil '
+         'parfait spacieux moderne ancien charme montagne lac piscine parking balcon').split()
+
+QUERIES = [
+    ('mot du titre', {'q': 'chalet'}),
+    ('ville', {'q': 'biarritz'}),
+    ('deux mots', {'q': 'villa piscine'}),
+    ('préfixe 3 lettres', {'q': 'par'}),
+    ('mot rare', {'q': 'péniche strasbourg'}),
+    ('par date', {'q': 'loft', 'sort': 'created_at'}),
+    ('+ prix', {'q': 'studio lac', 'max_price': 80.0}),
+]
+
+
+def seed(places):
+    rng = random.Random(13)
+    now = datetime.utcnow()
+    owners = [{'id': str(uuid.uuid4()), 'first_name': 'O', 'last_name': str(i), 'email': f'o{i}@x.io',
+               'password_hash': '-', 'is_admin': False, 'token_version': 0,
+               'created_at': now, 'updated_at': now} for i in range(OWNERS)]
+    db.session.execute(insert(User.__table__), owners)
+    # Triggers coupés pendant le chargement ; index reconstruit en une passe
+    for trigger in ('insert', 'delete', 'update'):
+        db.session.execute(text(f'DROP TRIGGER places_fts_{trigger}'))
+    for start in range(0, places, 10000):
+        db.session.execute(insert(Place.__table__), [{
+            'id': str(uuid.uuid4()),
+            'title': f'{rng.choice(KINDS)} {rng.choice(WORDS)} à {rng.choice(CITIES)}',
+            'description': ' '.join(rng.choices(WORDS, k=30)),
+            'price': float(rng.randint(20, 500)), 'latitude': 0.0, 'longitude': 0.0,
+            'owner_id': owners[i % OWNERS]['id'], 'review_count': 0, 'rating_sum': 0, 'rating_avg': 0.0,
+            'created_at': now + timedelta(seconds=i), 'updated_at': now,
+        } for i in range(start, min(start + 10000, places))])
+    fulltext.install(db.session.connection(), rebuild=True)
+    db.session.commit()
+    db.session.execute(text('ANALYZE'))
+
+
+def timings(fn):
+    samples = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+        db.session.rollback()
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--places', type=int, default=1000000)
+    args = parser.parse_args()
+
+    from config import TestingConfig
+    with tempfile.TemporaryDirectory() as directory:
+        TestingConfig.SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        app = create_app('testing')
+        with app.app_context():
+            migrate(db.engine)
+            if not fulltext.is_supported(db.session.connection()):
+                sys.exit("SQLite sans FTS5 : rien à mesurer")
+            start = time.perf_counter()
+            seed(args.places)
+            print(f"{args.places:,} places indexées en {time.perf_counter() - start:.1f} s")
+
+            facade = HBnBFacade()
+            print(f"{'recherche':<20} {'p50 ms':>8} {'p95 ms':>8} {'résultats':>10}")
+            for label, params in QUERIES:
+                params = {'sort': 'relevance', **params}
+                found, _ = facade.get_places_page(20, shape='place.summary', **params)
+                p50, p95 = timings(lambda: facade.get_places_page(20, shape='place.summary', **params))
+                print(f"{label:<20} {p50:>8.2f} {p95:>8.2f} {len(found):>10}")
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
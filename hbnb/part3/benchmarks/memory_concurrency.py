@@ -0,0 +1,90 @@
+"""Débit (ops/s) du MemoryRepository et du ConcurrentMemoryRepository selon le nombre de threads.
+
+Chaque thread fait un mélange de lectures et d'updates ; un update écrit la
+même valeur dans deux attributs, et chaque lecture vérifie qu'ils sont égaux
+(un écart = lecture d'un objet à moitié modifié).
+
+    python benchmarks/memory_concurrency.py --threads 1 2 4 8 16 --seconds 2
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.persistence.memory_repository import MemoryRepository
+from app.persistence.concurrent_memory_repository import ConcurrentMemoryRepository
+
+
+class Counter:
+    def __init__(self, obj_id):
+        self.id = obj_id
+        self.left = 0
+        self.right = 0
+
+
+class SlowCounter(Counter):
+    # Rend visible la fenêtre entre deux setattr d'un update non atomique
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name == 'left':
+            time.sleep(0)
+
+
+def run(repo, threads, seconds, write_ratio, keys):
+    ids = [f'id-{i}' for i in range(keys)]
+    for obj_id in ids:
+        repo.add(SlowCounter(obj_id))
+    stop = threading.Event()
+    counts = [0] * threads
+    torn = [0] * threads
+
+    def worker(n):
+        rng = random.Random(n)
+        ops = torn_reads = 0
+        while not stop.is_set():
+            obj_id = rng.choice(ids)
+            if rng.random() < write_ratio:
+                value = rng.randrange(1 << 30)
+                repo.update(obj_id, {'left': value, 'right': value})
+            else:
+                obj = repo.get(obj_id)
+                if obj.left != obj.right:
+                    torn_reads += 1
+            ops += 1
+        counts[n] = ops
+        torn[n] = torn_reads
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for w in workers:
+        w.start()
+    time.sleep(seconds)
+    stop.set()
+    for w in workers:
+        w.join()
+    return sum(counts) / seconds, sum(torn)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--seconds', type=float, default=2.0)
+    parser.add_argument('--write-ratio', type=float, default=0.1)
+    parser.add_argument('--keys', type=int, default=10000)
+    parser.add_argument('--shards', type=int, default=16)
+    args = parser.parse_args()
+
+    print(f"{'threads':>7} {'repository':<28} {'ops/s':>12} {'lectures déchirées':>20}")
+    for threads in args.threads:
+        for name, factory in [('MemoryRepository', MemoryRepository),
+                              (f'Concurrent ({args.shards} shards)',
+                               lambda: ConcurrentMemoryRepository(args.shards))]:
+            ops, torn = run(factory(), threads, args.seconds, args.write_ratio, args.keys)
+            print(f"{threads:>7} {name:<28} {ops:>12,.0f} {torn:>20,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""Temps d'écriture et de chargement d'un snapshot du DurableMemoryRepository.
+
+    python benchmarks/memory_snapshot.py --entities 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.persistence.memory_persistence import DurableMemoryRepository
+
+
+class Listing:
+    def __init__(self, title, price, city, owner_id):
+        self.id = str(uuid.uuid4())
+        self.title = title
+        self.price = price
+        self.city = city
+        self.owner_id = owner_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entities', type=int, default=1000000)
+    parser.add_argument('--indexes', action='store_true', help="Déclarer des index (id unique, city, price)")
+    args = parser.parse_args()
+    indexes = {'city': 'multi', 'price': 'sorted'} if args.indexes else None
+
+    with tempfile.TemporaryDirectory() as directory:
+        repo = DurableMemoryRepository(directory, indexes=indexes, fsync_every=0, snapshot_every=None)
+        start = time.perf_counter()
+        for i in range(args.entities):
+            repo.add(Listing(f'Listing {i}', float(i % 500), f'city-{i % 1000}', f'owner-{i % 5000}'))
+        print(f"add (journal)     : {args.entities / (time.perf_counter() - start):,.0f} ops/s")
+        start = time.perf_counter()
+        repo.snapshot()
+        print(f"snapshot          : {time.perf_counter() - start:.2f} s, "
+              f"{os.path.getsize(repo.snapshot_path) / 1e6:.1f} Mo")
+        repo.close()
+        start = time.perf_counter()
+        reloaded = DurableMemoryRepository(directory, indexes=indexes)
+        print(f"chargement        : {time.perf_counter() - start:.2f} s "
+              f"({len(reloaded.get_all()):,} entités)")
+        reloaded.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""Latence du filtre composite des places (GET /places/?filter=...) à 100k places.
+
+Cibles (première page de 20, ensembles d'amenities chargés) :
+    p95 < 20 ms pour chaque requête ci-dessous ; chargement des ensembles < 1 s.
+
+Compare aussi l'intersection d'amenities par ensembles précalculés à
+l'ancienne forme (un semi-join par amenity).
+
+    python benchmarks/place_filters.py --places 100000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import insert
+from app import create_app, db
+from app.models.amenity import Amenity
+from app.models.place import Place, PlaceAmenity
+from app.models.user import User
+from app.persistence.migrations import migrate
+from app.services.facade import HBnBFacade
+from app.services.pagination import paginate
+from app.services.place_filters import PlaceFilter, amenity_sets
+from app.services.query_plans import apply_plan
+
+# Part des places proposant chaque amenity
+AMENITIES = {'Wifi': 0.8, 'Kitchen': 0.6, 'Parking': 0.4, 'Pool': 0.1, 'Sauna': 0.01, 'Helipad': 0.0005}
+OWNERS = 1000
+RUNS = 50
+
+QUERIES = [
+    'price<120',
+    'price>=50;price<=80;rating>=4',
+    'amenities=Wifi,Kitchen',
+    'price<120;amenities=Wifi,Pool',
+    'amenities=Wifi,Pool,Sauna',
+    'amenities=Helipad;rating>=2',
+    'owner={owner};price<200',
+]
+
+
+def seed(places):
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    owners = [{'id': str(uuid.uuid4()), 'first_name': 'O', 'last_name': str(i), 'email': f'o{i}@x.io',
+               'password_hash': '-', 'is_admin': False, 'token_version': 0,
+               'created_at': now, 'updated_at': now} for i in range(OWNERS)]
+    amenities = {name: str(uuid.uuid4()) for name in AMENITIES}
+    db.session.execute(insert(User.__table__), owners)
+    db.session.execute(insert(Amenity.__table__), [
+        {'id': amenity_id, 'name': name, 'created_at': now, 'updated_at': now}
+        for name, amenity_id in amenities.items()])
+    for start in range(0, places, 10000):
+        rows, links = [], []
+        for i in range(start, min(start + 10000, places)):
+            place_id = str(uuid.uuid4())
+            count = rng.randint(0, 20)
+            rating_sum = sum(rng.randint(1, 5) for _ in range(count))
+            rows.append({
+                'id': place_id, 'title': f'Place {i}', 'description': 'Lorem ipsum ' * 20,
+                'price': float(rng.randint(20, 500)), 'latitude': 0.0, 'longitude': 0.0,
+                'owner_id': owners[i % OWNERS]['id'], 'review_count': count, 'rating_sum': rating_sum,
+                'rating_avg': rating_sum / count if count else 0.0,
+                'created_at': now + timedelta(seconds=i), 'updated_at': now,
+            })
+            links.extend({'place_id': place_id, 'amenity_id': amenity_id}
+                         for name, amenity_id in amenities.items() if rng.random() < AMENITIES[name])
+        db.session.execute(insert(Place.__table__), rows)
+        db.session.execute(insert(PlaceAmenity.__table__), links)
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+    return owners[0]['id']
+
+
+def semi_join_page(expression):
+    # Forme précédente : un semi-join IN (...) par amenity
+    criteria = PlaceFilter.parse(expression)
+    ids = {a.name.lower(): a.id for a in Amenity.query}
+    query = apply_plan(Place.query, 'place.summary').filter(*criteria.conditions())
+    for ref in criteria.amenities:
+        query = query.filter(Place.id.in_(
+            db.session.query(PlaceAmenity.place_id).filter(PlaceAmenity.amenity_id == ids[ref.lower()])))
+    return paginate(query, Place.page_keys(), 20)
+
+
+def timings(fn):
+    samples = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+        db.session.rollback()
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--places', type=int, default=100000)
+    args = parser.parse_args()
+
+    from config import TestingConfig
+    with tempfile.TemporaryDirectory() as directory:
+        TestingConfig.SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        app = create_app('testing')
+        with app.app_context():
+            migrate(db.engine)
+            start = time.perf_counter()
+            owner = seed(args.places)
+            print(f"{args.places:,} places créées en {time.perf_counter() - start:.1f} s")
+            start = time.perf_counter()
+            amenity_sets.refresh(db.session)
+            print(f"chargement des ensembles d'amenities : {(time.perf_counter() - start) * 1000:.0f} ms")
+
+            facade = HBnBFacade()
+            print(f"{'filtre':<34} {'p50 ms':>8} {'p95 ms':>8} {'semi-join p50':>14}")
+            for expression in QUERIES:
+                expression = expression.format(owner=owner)
+                criteria = PlaceFilter.parse(expression)
+                p50, p95 = timings(lambda: facade.get_places_page(
+                    20, shape='place.summary', criteria=criteria))
+                baseline = ''
+                if criteria.amenities:
+                    baseline = f'{timings(lambda: semi_join_page(expression))[0]:>14.2f}'
+                print(f"{expression[:34]:<34} {p50:>8.2f} {p95:>8.2f} {baseline}")
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
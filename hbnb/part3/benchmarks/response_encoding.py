@@ -0,0 +1,127 @@
+"""Octets transmis et CPU par requête selon l'encodage JSON et la compression.
+
+Compare json (bibliothèque standard) et orjson sans compression, puis
+json + gzip / brotli, sur des pages de 50 et 200 places (owner,
+amenities, 5 dernières reviews) et sur l'export NDJSON complet. Le CPU
+est celui de toute la requête (lecture, marshal, encodage, compression).
+
+    python benchmarks/response_encoding.py --places 2000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import insert
+from app import create_app, db
+from app.api.v1 import encoding
+from app.extensions import compressor
+from app.models.amenity import Amenity
+from app.models.place import Place, PlaceAmenity
+from app.models.review import Review
+from app.models.user import User
+from app.persistence.migrations import migrate
+
+REVIEWS_PER_PLACE = 8
+RUNS = 30
+
+WORDS = ('calme lumineux proche centre gare plage vue jardin terrasse cuisine équipée '
+         'propre accueil parfait bruyant petit spacieux moderne ancien charme').split()
+
+URLS = [
+    ('page de 50', '/api/v1/places/?limit=50'),
+    ('page de 200', '/api/v1/places/?limit=200'),
+    ('export', '/api/v1/places/export'),
+]
+
+
+def seed(places):
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    users = [{'id': str(uuid.uuid4()), 'first_name': f'User{i}', 'last_name': 'Test', 'email': f'u{i}@x.io',
+              'password_hash': '-', 'is_admin': False, 'token_version': 0,
+              'created_at': now, 'updated_at': now} for i in range(200)]
+    amenities = [{'id': str(uuid.uuid4()), 'name': name, 'created_at': now, 'updated_at': now}
+                 for name in ('Wifi', 'Kitchen', 'Parking', 'Pool', 'Sauna')]
+    db.session.execute(insert(User.__table__), users)
+    db.session.execute(insert(Amenity.__table__), amenities)
+    rows, links, reviews = [], [], []
+    for i in range(places):
+        place_id = str(uuid.uuid4())
+        rows.append({
+            'id': place_id, 'title': f'Appartement {i}', 'description': ' '.join(rng.choices(WORDS, k=40)),
+            'price': float(rng.randint(20, 500)), 'latitude': 45.0, 'longitude': 5.0,
+            'owner_id': users[i % len(users)]['id'], 'review_count': REVIEWS_PER_PLACE,
+            'rating_sum': 4 * REVIEWS_PER_PLACE, 'rating_avg': 4.0,
+            'created_at': now + timedelta(seconds=i), 'updated_at': now,
+        })
+        links.extend({'place_id': place_id, 'amenity_id': a['id']} for a in rng.sample(amenities, 3))
+        reviews.extend({
+            'id': str(uuid.uuid4()), 'text': ' '.join(rng.choices(WORDS, k=25)), 'rating': rng.randint(1, 5),
+            'place_id': place_id, 'user_id': rng.choice(users)['id'],
+            'created_at': now + timedelta(minutes=j), 'updated_at': now,
+        } for j in range(REVIEWS_PER_PLACE))
+    db.session.execute(insert(Place.__table__), rows)
+    db.session.execute(insert(PlaceAmenity.__table__), links)
+    db.session.execute(insert(Review.__table__), reviews)
+    db.session.commit()
+
+
+def measure(client, url, accept_encoding):
+    headers = {'Accept-Encoding': accept_encoding} if accept_encoding else {}
+    client.get(url, headers=headers).close()  # échauffement
+    cpu, size = [], 0
+    for _ in range(RUNS):
+        start = time.process_time()
+        resp = client.get(url, headers=headers)
+        size = len(resp.get_data())  # consomme aussi les réponses streamées
+        cpu.append((time.process_time() - start) * 1000)
+        resp.close()
+    cpu.sort()
+    return size, cpu[len(cpu) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--places', type=int, default=2000)
+    args = parser.parse_args()
+
+    from config import TestingConfig
+    with tempfile.TemporaryDirectory() as directory:
+        TestingConfig.SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        app = create_app('testing')
+        app.debug = False
+        with app.app_context():
+            migrate(db.engine)
+            seed(args.places)
+
+        variants = [('json, identité', 'json', None, None), ('orjson, identité', 'orjson', None, None),
+                    ('json, gzip', 'json', 'gzip', None), ('json, gzip -1', 'json', 'gzip', 1)]
+        if 'br' in compressor.algorithms:
+            variants.append(('json, brotli', 'json', 'br', None))
+        levels = dict(compressor.levels)
+        if encoding.orjson is None:
+            print("orjson absent : l'encodeur de la bibliothèque standard est utilisé partout")
+
+        client = app.test_client()
+        print(f"{'requête':<12} {'variante':<18} {'octets':>10} {'CPU ms':>8} {'ratio':>7}")
+        for label, url in URLS:
+            baseline = None
+            for name, encoder, accept, level in variants:
+                app.config['API_JSON_ENCODER'] = encoder
+                compressor.levels = dict(levels, **({accept: level} if level else {}))
+                size, cpu = measure(client, url, accept)
+                baseline = baseline or size
+                print(f"{label:<12} {name:<18} {size:>10,} {cpu:>8.2f} {size / baseline:>7.2f}")
+        with app.app_context():
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Pages de liste lues en objets ORM ou en tuples (formes .rows).
+
+Pour AmenityList.get, ReviewList.get et PlaceList.get, une page de 200
+éléments est lue par le facade puis sérialisée (serializer compilé), comme
+dans l'endpoint :
+  ORM    : formes amenity / review / place.document (objets, carte d'identité)
+  tuples : formes amenity.rows / review.rows / place.rows
+Mesures : CPU médian par page (lecture + sérialisation) et mémoire allouée
+par élément pendant la lecture (pic tracemalloc / taille de page).
+
+    python benchmarks/row_tuples.py --places 2000
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import insert
+from app import create_app, db
+from app.api.v1.amenities import amenity_page_model
+from app.api.v1.pagination import page_to_dict
+from app.api.v1.places import place_page_model
+from app.api.v1.reviews import review_page_model
+from app.api.v1.serializers import serializer_for
+from app.models.amenity import Amenity
+from app.persistence.migrations import migrate
+from app.services.facade import HBnBFacade
+from response_encoding import seed
+
+PAGE = 200
+RUNS = 30
+
+ENDPOINTS = [
+    ('AmenityList', 'get_amenities_page', amenity_page_model, 'amenity', 'amenity.rows'),
+    ('ReviewList', 'get_reviews_page', review_page_model, 'review', 'review.rows'),
+    ('PlaceList', 'get_places_page', place_page_model, 'place.document', 'place.rows'),
+]
+
+
+def seed_amenities(count):
+    # Le jeu de response_encoding n'a que 5 amenities
+    now = datetime.utcnow()
+    db.session.execute(insert(Amenity.__table__), [
+        {'id': str(uuid.uuid4()), 'name': f'Amenity {i}', 'created_at': now, 'updated_at': now}
+        for i in range(count)])
+    db.session.commit()
+
+
+def request(read, serialize, shape):
+    output = serialize(page_to_dict(*read(limit=PAGE, shape=shape)))
+    # Fin de requête : la session est vidée (teardown de Flask-SQLAlchemy)
+    db.session.remove()
+    return output
+
+
+def cpu(read, serialize, shape):
+    request(read, serialize, shape)  # échauffement
+    samples = []
+    for _ in range(RUNS):
+        start = time.process_time()
+        request(read, serialize, shape)
+        samples.append((time.process_time() - start) * 1000)
+    return statistics.median(samples)
+
+
+def memory_per_row(read, shape):
+    tracemalloc.start()
+    items, _ = read(limit=PAGE, shape=shape)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    size = len(items)
+    del items
+    db.session.remove()
+    return peak / size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--places', type=int, default=2000)
+    args = parser.parse_args()
+
+    from config import TestingConfig
+    with tempfile.TemporaryDirectory() as directory:
+        TestingConfig.SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        app = create_app('testing')
+        with app.test_request_context():
+            migrate(db.engine)
+            seed(args.places)
+            seed_amenities(PAGE)
+            facade = HBnBFacade()
+            print(f"{'endpoint':<12} {'lecture':<8} {'CPU ms':>8} {'octets/ligne':>13}")
+            for label, method, model, orm_shape, row_shape in ENDPOINTS:
+                read = getattr(facade, method)
+                serialize = serializer_for(model)
+                assert request(read, serialize, row_shape) == request(read, serialize, orm_shape)
+                results = [(name, cpu(read, serialize, shape), memory_per_row(read, shape))
+                           for name, shape in (('ORM', orm_shape), ('tuples', row_shape))]
+                for name, ms, per_row in results:
+                    print(f"{label:<12} {name:<8} {ms:>8.2f} {per_row:>13,.0f}")
+                (_, orm_ms, orm_mem), (_, rows_ms, rows_mem) = results
+                print(f"{'':<12} {'gain':<8} {orm_ms / rows_ms:>7.1f}x {orm_mem / rows_mem:>12.1f}x")
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Sérialisation d'une page de places : marshal() contre serializer compilé.
+
+Les places (owner, amenities, 5 dernières reviews) sont chargées une fois ;
+seule la sérialisation est mesurée :
+  avant    : dict écrit à la main puis marshal() du dict (double passe)
+  marshal  : marshal() directement sur les objets ORM (attributs du modèle)
+  compilé  : serializer_for(place_page_model)
+
+    python benchmarks/serializers.py --places 1000
+"""
+import argparse
+import copy
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask_restx import Model, fields, marshal
+from app import create_app, db
+from app.api.v1.places import place_output_model, place_page_model
+from app.api.v1.serializers import serializer_for
+from app.persistence.migrations import migrate
+from app.services.facade import HBnBFacade
+from response_encoding import seed
+
+RUNS = 20
+
+
+def legacy_place_to_dict(place):
+    # Forme du place_to_dict d'avant les serializers compilés
+    return {
+        'id': str(place.id), 'title': place.title, 'description': place.description,
+        'price': place.price, 'latitude': place.latitude, 'longitude': place.longitude,
+        'owner_id': str(place.owner_id), 'review_count': place.review_count, 'rating_avg': place.rating_avg,
+        'owner': {'id': str(place.owner.id), 'first_name': place.owner.first_name,
+                  'last_name': place.owner.last_name, 'email': place.owner.email},
+        'amenities': [{'id': str(pa.amenity.id), 'name': pa.amenity.name} for pa in place.amenities],
+        'reviews': [{'id': str(r.id), 'text': r.text, 'rating': r.rating, 'user_id': str(r.user_id)}
+                    for r in place.latest_reviews],
+    }
+
+
+def legacy_page_model():
+    # Modèle d'avant : sans attribute=, appliqué aux dicts de legacy_place_to_dict
+    place = Model('LegacyPlaceOut', {})
+    for name, field in place_output_model.items():
+        if name != 'reviews_next':
+            place[name] = copy.copy(field)
+            place[name].attribute = None
+    return Model('LegacyPlacePage', {'items': fields.List(fields.Nested(place)), 'next_cursor': fields.String()})
+
+
+def timing(fn):
+    samples = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--places', type=int, default=1000)
+    args = parser.parse_args()
+
+    from config import TestingConfig
+    with tempfile.TemporaryDirectory() as directory:
+        TestingConfig.SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        app = create_app('testing')
+        with app.test_request_context():
+            migrate(db.engine)
+            seed(args.places)
+            # Pages de MAX_PAGE_SIZE mises bout à bout
+            places, cursor = [], None
+            while True:
+                page_places, cursor = HBnBFacade().get_places_page(cursor=cursor, limit=200, shape='place.document')
+                places += page_places
+                if cursor is None:
+                    break
+            page = {'items': places, 'next_cursor': None}
+            compiled = serializer_for(place_page_model)
+            assert compiled(page) == marshal(page, place_page_model)
+
+            legacy = legacy_page_model()
+            before = timing(lambda: marshal(
+                {'items': [legacy_place_to_dict(p) for p in places], 'next_cursor': None}, legacy))
+            direct = timing(lambda: marshal(page, place_page_model))
+            after = timing(lambda: compiled(page))
+            print(f"{len(places)} places")
+            print(f"avant (dict + marshal) : {before:8.1f} ms")
+            print(f"marshal sur l'ORM      : {direct:8.1f} ms")
+            print(f"serializer compilé     : {after:8.1f} ms  (x{before / after:.1f})")
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
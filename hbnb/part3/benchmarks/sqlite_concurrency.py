@@ -0,0 +1,120 @@
+"""Lectures concurrentes pendant des écritures : SQLite par défaut vs profil de stockage.
+
+Un thread écrit en continu (une review par transaction + agrégats de la
+place) pendant que N threads lisent des pages de places.
+
+    python benchmarks/sqlite_concurrency.py --readers 1 4 8 --seconds 3
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from config import Config
+from app.extensions import db
+from app.persistence import storage
+from app.models import amenity, place, review, user  # noqa: F401  (enregistre les tables)
+
+PLACES = 2000
+
+PROFILES = {
+    # Réglages SQLite d'origine : journal "delete", synchronous FULL
+    'défaut': ({'journal_mode': 'DELETE'}, {}),
+    'profil': (Config.SQLITE_PRAGMAS, None),
+}
+
+
+def make_engine(path, pragmas, options):
+    uri = f'sqlite:///{path}'
+    if options is None:
+        options = storage.engine_options({'SQLALCHEMY_DATABASE_URI': uri, **vars(Config)})
+    engine = create_engine(uri, **options)
+    storage.install_pragmas(engine, pragmas)
+    return engine
+
+
+def seed(engine):
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO users (id, first_name, last_name, email, is_admin, token_version) "
+                          "VALUES ('u', 'A', 'B', 'a@b.c', 0, 0)"))
+        conn.execute(text(
+            "INSERT INTO places (id, title, description, price, latitude, longitude, owner_id, "
+            "review_count, rating_sum, rating_avg, created_at, updated_at) "
+            "VALUES (:id, :t, 'desc', :p, 0, 0, 'u', 0, 0, 0, datetime('now'), datetime('now'))"),
+            [{'id': f'p{i}', 't': f'Place {i}', 'p': float(i % 300)} for i in range(PLACES)])
+
+
+def run(engine, readers, seconds):
+    stop = threading.Event()
+    reads, writes, errors = [0] * readers, [0], [0]
+
+    def reader(n):
+        rng = random.Random(n)
+        while not stop.is_set():
+            try:
+                with engine.connect() as conn:
+                    conn.execute(text(
+                        "SELECT * FROM places WHERE price >= :p ORDER BY created_at, id LIMIT 50"),
+                        {'p': rng.randrange(300)}).all()
+                reads[n] += 1
+            except OperationalError:
+                errors[0] += 1
+
+    def writer():
+        rng = random.Random(-1)
+        while not stop.is_set():
+            place = f'p{rng.randrange(PLACES)}'
+            rating = rng.randint(1, 5)
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text(
+                        "INSERT INTO reviews (id, text, rating, place_id, user_id, created_at, updated_at) "
+                        "VALUES (:id, 'ok', :r, :p, 'u', datetime('now'), datetime('now'))"),
+                        {'id': str(uuid.uuid4()), 'r': rating, 'p': place})
+                    conn.execute(text(
+                        "UPDATE places SET review_count = review_count + 1, rating_sum = rating_sum + :r, "
+                        "rating_avg = (rating_sum + :r) * 1.0 / (review_count + 1) WHERE id = :p"),
+                        {'r': rating, 'p': place})
+                writes[0] += 1
+            except OperationalError:
+                errors[0] += 1
+
+    threads = [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return sum(reads) / seconds, writes[0] / seconds, errors[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--readers', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--seconds', type=float, default=3.0)
+    args = parser.parse_args()
+
+    print(f"{'profil':<8} {'lecteurs':>8} {'lectures/s':>12} {'écritures/s':>12} {'erreurs':>8}")
+    for name, (pragmas, options) in PROFILES.items():
+        for readers in args.readers:
+            with tempfile.TemporaryDirectory() as directory:
+                engine = make_engine(os.path.join(directory, 'bench.db'), pragmas, options)
+                seed(engine)
+                read_rate, write_rate, errors = run(engine, readers, args.seconds)
+                engine.dispose()
+            print(f"{name:<8} {readers:>8} {read_rate:>12,.0f} {write_rate:>12,.0f} {errors:>8}")
+
+
+if __name__ == '__main__':
+    main()
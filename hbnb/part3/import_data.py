@@ -0,0 +1,28 @@
+import argparse
+import sys
+import time
+from app import create_app
+from app.services.bulk_import import BulkImporter, CHUNK_SIZE, parse_ndjson
+
+# Usage : python import_data.py {amenities,places,reviews} fichier.ndjson [--chunk-size N]
+#         (fichier "-" = entrée standard)
+parser = argparse.ArgumentParser(description="Import en masse de données NDJSON")
+parser.add_argument('kind', choices=['amenities', 'places', 'reviews'])
+parser.add_argument('path')
+parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+args = parser.parse_args()
+
+app = create_app()
+with app.app_context():
+    importer = BulkImporter(chunk_size=args.chunk_size)
+    source = sys.stdin if args.path == '-' else open(args.path, encoding='utf-8')
+    start = time.perf_counter()
+    with source:
+        report = getattr(importer, f'import_{args.kind}')(parse_ndjson(source))
+    elapsed = time.perf_counter() - start
+    for error in report['errors']:
+        print(f"ligne {error['line']} : {error['error']}", file=sys.stderr)
+    rate = report['inserted'] / elapsed if elapsed else 0
+    print(f"{report['inserted']} ligne(s) importée(s), {len(report['errors'])} erreur(s) "
+          f"en {elapsed:.2f}s ({rate:.0f} lignes/s).")
+    sys.exit(1 if report['errors'] else 0)
@@ -1,10 +1,12 @@
 from app import create_app
 from app.extensions import db
 from app.models.user import User
+from app.persistence.migrations import migrate
 
 app = create_app()
 with app.app_context():
-    db.create_all()
+    # Crée la base ou applique les migrations en attente
+    migrate(db.engine, log=print)
 
     # Vérifie si un admin existe déjà
     admin = User.query.filter_by(email="admin@example.com").first()
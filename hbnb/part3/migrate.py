@@ -0,0 +1,22 @@
+import sys
+from app import create_app
+from app.extensions import db
+from app.persistence.migrations import backup_sqlite, migrate, pending_migrations, LATEST_VERSION
+
+# Usage : python migrate.py [--status] [--no-backup]
+#   --status    : liste les migrations en attente sans rien appliquer
+#   --no-backup : ne copie pas la base SQLite avant de migrer
+app = create_app()
+with app.app_context():
+    pending = pending_migrations(db.engine)
+    if '--status' in sys.argv[1:]:
+        for version, name, _ in pending:
+            print(f"En attente : {version:04d}_{name}")
+        print(f"{len(pending)} migration(s) en attente (dernière version : {LATEST_VERSION}).")
+        sys.exit(0)
+    if pending and '--no-backup' not in sys.argv[1:]:
+        backup = backup_sqlite(db.engine)
+        if backup:
+            print(f"Sauvegarde : {backup}")
+    migrate(db.engine, log=print)
+    print(f"Schéma à jour (version {LATEST_VERSION}).")
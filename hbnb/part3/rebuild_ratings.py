@@ -0,0 +1,20 @@
+import sys
+from app import create_app
+from app.services.facade import HBnBFacade
+
+# Usage : python rebuild_ratings.py [--check]
+#   --check : vérifie seulement la cohérence des agrégats (code 1 si écart)
+app = create_app()
+with app.app_context():
+    facade = HBnBFacade()
+    if '--check' in sys.argv[1:]:
+        mismatches = facade.check_rating_aggregates()
+        for m in mismatches:
+            print(f"{m['place_id']} : stocké {m['stored']} / réel {m['actual']}")
+        if mismatches:
+            print(f"{len(mismatches)} place(s) incohérente(s).")
+            sys.exit(1)
+        print("Agrégats de notes cohérents.")
+    else:
+        count = facade.rebuild_rating_aggregates()
+        print(f"Agrégats recalculés pour {count} place(s).")